@@ -0,0 +1,204 @@
+import argparse
+import contextlib
+import json
+import os
+import pathlib
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Generator, List, Optional, Text, Tuple
+
+from cloudfs import Path
+from cloudfs.base import LocalPath
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+DEFAULT_TOLERANCE = 0.5
+BACKENDS = ("local", "gs")
+GLOB_SIZES = (10_000, 100_000)
+TRANSFER_SIZES = (("1KiB", 1024), ("1MiB", 1024 * 1024), ("32MiB", 32 * 1024 * 1024))
+
+
+class Backend:
+    def __init__(self, name: Text, root: "Path", request_count: Callable[[], int]):
+        self.name = name
+        self.root = root
+        self.request_count = request_count
+        self.seed: Callable[[Text, int], None] = self._seed
+
+    def _seed(self, prefix: Text, count: int) -> None:
+        for i in range(count):
+            (self.root / prefix / f"obj-{i:06d}").write_bytes(b"")
+
+
+@contextlib.contextmanager
+def local_backend() -> Generator[Backend, None, None]:
+    with tempfile.TemporaryDirectory() as directory:
+        backend = Backend(
+            "local", LocalPath(pathlib.Path(directory).as_uri()), lambda: 0
+        )
+
+        def seed(prefix: Text, count: int) -> None:
+            os.makedirs(os.path.join(directory, prefix), exist_ok=True)
+            for i in range(count):
+                open(os.path.join(directory, prefix, f"obj-{i:06d}"), "wb").close()
+
+        backend.seed = seed
+        yield backend
+
+
+@contextlib.contextmanager
+def gs_backend() -> Generator[Backend, None, None]:
+    from tests.fake_gcs import FakeGCSServer, make_client
+
+    server = FakeGCSServer().start()
+    server.create_bucket("cloudfs-bench")
+    root = Path("gs://cloudfs-bench/bench", storage_client=make_client(server))
+    backend = Backend("gs", root, lambda: server.request_count)
+
+    def seed(prefix: Text, count: int) -> None:
+        for i in range(count):
+            server.put_object("cloudfs-bench", f"bench/{prefix}/obj-{i:06d}", b"")
+
+    backend.seed = seed
+    try:
+        yield backend
+    finally:
+        server.stop()
+
+
+def measure(
+    backend: Backend, func: Callable[[], object], iterations: int
+) -> Dict[Text, float]:
+    func()
+    latencies: List[float] = []
+    requests = backend.request_count()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        begin = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - begin)
+    elapsed = time.perf_counter() - started
+    requests = backend.request_count() - requests
+
+    latencies.sort()
+    return {
+        "ops_per_sec": iterations / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "requests_per_op": requests / iterations,
+    }
+
+
+def cases(
+    backend: Backend, quick: bool
+) -> Generator[Tuple[Text, Callable[[], object], int], None, None]:
+    root = backend.root
+    url = str(root / "a" / "b" / "c")
+    options = {} if backend.name == "local" else {"storage_client": root.client}
+
+    yield "construct", lambda: Path(url, **options), 20_000
+    yield "truediv", lambda: root / "a" / "b" / "c", 20_000
+
+    dirpath = root / "meta"
+    dirpath.mkdir(parents=True, exist_ok=True)
+    filepath = dirpath / "file"
+    filepath.write_bytes(b"meta")
+    yield "stat", filepath.stat, 500
+    yield "exists", filepath.exists, 500
+    yield "exists_missing", (root / "meta" / "missing").exists, 500
+    yield "is_dir", dirpath.is_dir, 500
+
+    for count in GLOB_SIZES[:1] if quick else GLOB_SIZES:
+        prefix = f"glob-{count}"
+        backend.seed(prefix, count)
+        label = f"glob_{count // 1000}k"
+        yield label, lambda prefix=prefix: sum(1 for _ in (root / prefix).glob("*")), 3
+
+    (root / "transfer").mkdir(parents=True, exist_ok=True)
+    for label, size in TRANSFER_SIZES[:2] if quick else TRANSFER_SIZES:
+        data = os.urandom(size)
+        path = root / "transfer" / label
+        iterations = max(3, min(200, (64 * 1024 * 1024) // size))
+        yield f"write_{label}", lambda path=path, data=data: path.write_bytes(
+            data
+        ), iterations
+        yield f"read_{label}", path.read_bytes, iterations
+
+
+def run(backend: Backend, quick: bool, only: Optional[Text]) -> Dict[Text, Dict]:
+    results = {}
+    for name, func, iterations in cases(backend, quick):
+        if only and only not in name:
+            continue
+        results[name] = measure(backend, func, iterations)
+        print(format_row(backend.name, name, results[name]), flush=True)
+    return results
+
+
+def format_row(backend: Text, name: Text, result: Dict[Text, float]) -> Text:
+    return (
+        f"{backend:<6} {name:<16} {result['ops_per_sec']:>12.1f} ops/s"
+        f"  p50 {result['p50_ms']:>9.3f} ms  p99 {result['p99_ms']:>9.3f} ms"
+        f"  {result['requests_per_op']:>8.2f} req/op"
+    )
+
+
+def compare(
+    backend: Text, results: Dict[Text, Dict], baseline: Dict[Text, Dict], tolerance
+) -> List[Text]:
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        # Request counts are deterministic, any increase is a regression
+        if result["requests_per_op"] > expected["requests_per_op"] + 1e-9:
+            regressions.append(
+                f"{backend}/{name}: {result['requests_per_op']:.2f} req/op, "
+                f"baseline {expected['requests_per_op']:.2f}"
+            )
+        if result["ops_per_sec"] < expected["ops_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{backend}/{name}: {result['ops_per_sec']:.1f} ops/s, "
+                f"baseline {expected['ops_per_sec']:.1f}"
+            )
+    return regressions
+
+
+def baseline_path(backend: Text) -> Text:
+    return os.path.join(BASELINE_DIR, f"{backend}.json")
+
+
+def main(argv: Optional[List[Text]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline cloudfs benchmarks")
+    parser.add_argument("--backend", choices=BACKENDS, action="append")
+    parser.add_argument("--only", help="only run cases whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="skip the largest cases")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    factories = {"local": local_backend, "gs": gs_backend}
+    regressions = []
+    for name in args.backend or BACKENDS:
+        with factories[name]() as backend:
+            results = run(backend, args.quick, args.only)
+        if args.save_baseline:
+            os.makedirs(BASELINE_DIR, exist_ok=True)
+            with open(baseline_path(name), "w") as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+                f.write("\n")
+        if args.compare and os.path.exists(baseline_path(name)):
+            with open(baseline_path(name)) as f:
+                baseline = json.load(f)
+            regressions.extend(compare(name, results, baseline, args.tolerance))
+
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,853 @@
+import asyncio
+import functools
+import io
+import json
+import random
+import threading
+import time
+import warnings
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import (
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Text,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+from urllib.parse import quote
+
+from cloudfs.base import DEFAULT_CHUNK_SIZE, LocalPath, Path
+from cloudfs.manifest import MANIFEST_FILENAME
+from cloudfs.metrics import wrap_context
+from cloudfs.pattern import GlobPattern, aiter_glob
+from cloudfs.retry import RetryPolicy
+
+try:
+    import aiohttp
+except ImportError:
+    warnings.warn(
+        "Required 'aiohttp' is not installed, please install it with "
+        "'pip install aiohttp'"
+    )
+
+DEFAULT_LOCAL_WORKERS = 64
+DEFAULT_CONNECTION_LIMIT = 1000
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+UPLOAD_CHUNK_MULTIPLE = 256 * 1024
+ITERATE_BATCH_SIZE = 256
+RETRYABLE_STATUS = frozenset((408, 429, 500, 502, 503, 504))
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=DEFAULT_LOCAL_WORKERS, thread_name_prefix="cloudfs-aio"
+            )
+        return _executor
+
+
+async def run_sync(func: Callable, *args, **kwargs) -> Any:
+    loop = asyncio.get_running_loop()
+    call = functools.partial(func, *args, **kwargs)
+    return await loop.run_in_executor(get_executor(), wrap_context(call))
+
+
+def _take(iterator: Iterator, count: int) -> List[Any]:
+    items = []
+    for item in iterator:
+        items.append(item)
+        if len(items) >= count:
+            break
+    return items
+
+
+async def _iterate(iterator: Iterator) -> AsyncGenerator[Any, None]:
+    # Each batch is one executor round trip instead of one per item
+    while True:
+        items = await run_sync(_take, iterator, ITERATE_BATCH_SIZE)
+        for item in items:
+            yield item
+        if len(items) < ITERATE_BATCH_SIZE:
+            return
+
+
+def _timestamp(value: Text) -> float:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def _check(status: int, body: bytes, path: "AsyncPath") -> None:
+    if status == 404:
+        raise FileNotFoundError(f"No such file or directory: {path}")
+    if status >= 400:
+        raise OSError(f"Request for {path} failed with {status}: {body[:200]!r}")
+
+
+class AsyncPath:
+    __slots__ = ("_path",)
+
+    def __new__(cls: Type["AsyncPath"], *args, **kwargs) -> "AsyncPath":
+        path = args[0] if args else kwargs.get("path")
+        if not path:
+            raise ValueError("Paramter 'path' is required")
+        if cls is AsyncPath:
+            scheme = str(path).partition("://")[0].lower()
+            if scheme not in async_path_classes:
+                raise ValueError(
+                    f"Unsupported scheme: {tuple(async_path_classes)}, got {scheme}"
+                )
+            return object.__new__(async_path_classes[scheme])
+        return object.__new__(cls)
+
+    def __init__(self, path: Union[Text, Path], **kwargs):
+        self._path = path if isinstance(path, Path) else Path(path, **kwargs)
+
+    @property
+    def sync_path(self) -> Path:
+        return self._path
+
+    def __str__(self):
+        return str(self._path)
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __eq__(self, other_path: "AsyncPath") -> bool:
+        if not isinstance(other_path, AsyncPath):
+            return False
+        return self._path == other_path._path
+
+    def __truediv__(self, name: Text) -> "AsyncPath":
+        return self._wrap(self._path / name)
+
+    async def __aenter__(self) -> "AsyncPath":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
+
+    def _wrap(self, path: Path) -> "AsyncPath":
+        new_path = object.__new__(type(self))
+        new_path._path = path
+        return new_path
+
+    async def stat(self) -> Dict[Text, Union[int, float]]:
+        raise NotImplementedError
+
+    async def exists(self) -> bool:
+        raise NotImplementedError
+
+    async def is_dir(self) -> bool:
+        raise NotImplementedError
+
+    async def is_file(self) -> bool:
+        raise NotImplementedError
+
+    async def read_bytes(self) -> bytes:
+        raise NotImplementedError
+
+    async def read_text(self, encoding=None, errors=None) -> Text:
+        data = await self.read_bytes()
+        return data.decode(encoding or "utf-8", errors or "strict")
+
+    async def write_bytes(self, data) -> int:
+        raise NotImplementedError
+
+    async def write_text(self, data, encoding=None, errors=None) -> int:
+        await self.write_bytes(data.encode(encoding or "utf-8", errors or "strict"))
+        return len(data)
+
+    async def touch(self, exist_ok=True) -> None:
+        raise NotImplementedError
+
+    async def mkdir(self, parents=False, exist_ok=False) -> None:
+        raise NotImplementedError
+
+    async def unlink(self, missing_ok=False) -> None:
+        raise NotImplementedError
+
+    def open(self, mode: Text = "rb", **kwargs) -> Any:
+        raise NotImplementedError
+
+    def glob(self, pattern: Text, **kwargs) -> AsyncGenerator["AsyncPath", None]:
+        raise NotImplementedError
+
+    def iterdir(self) -> AsyncGenerator["AsyncPath", None]:
+        raise NotImplementedError
+
+
+class AsyncLocalFile:
+    def __init__(self, path: LocalPath, mode: Text, **kwargs):
+        self._path = path
+        self._mode = mode
+        self._kwargs = kwargs
+        self._file: Optional[io.IOBase] = None
+
+    async def _open(self) -> io.IOBase:
+        if self._file is None:
+            self._file = await run_sync(
+                self._path.open, mode=self._mode, **self._kwargs
+            )
+        return self._file
+
+    async def __aenter__(self) -> "AsyncLocalFile":
+        await self._open()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def read(self, size: int = -1) -> Union[bytes, Text]:
+        return await run_sync((await self._open()).read, size)
+
+    async def write(self, data: Union[bytes, Text]) -> int:
+        return await run_sync((await self._open()).write, data)
+
+    async def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return await run_sync((await self._open()).seek, offset, whence)
+
+    async def tell(self) -> int:
+        return (await self._open()).tell()
+
+    async def close(self) -> None:
+        if self._file is not None:
+            await run_sync(self._file.close)
+
+
+class AsyncLocalPath(AsyncPath):
+    __slots__ = ()
+
+    def __init__(self, path: Union[Text, Path], **kwargs):
+        super().__init__(path, **kwargs)
+        if not isinstance(self._path, LocalPath):
+            raise ValueError(f"Expected a local path, got {self._path}")
+
+    async def stat(self) -> Dict[Text, Union[int, float]]:
+        return await run_sync(self._path.stat)
+
+    async def exists(self) -> bool:
+        return await run_sync(self._path.exists)
+
+    async def is_dir(self) -> bool:
+        return await run_sync(self._path.is_dir)
+
+    async def is_file(self) -> bool:
+        return await run_sync(self._path.is_file)
+
+    async def read_bytes(self) -> bytes:
+        return await run_sync(self._path.read_bytes)
+
+    async def read_text(self, encoding=None, errors=None) -> Text:
+        return await run_sync(self._path.read_text, encoding=encoding, errors=errors)
+
+    async def write_bytes(self, data) -> int:
+        return await run_sync(self._path.write_bytes, data)
+
+    async def write_text(self, data, encoding=None, errors=None) -> int:
+        return await run_sync(
+            self._path.write_text, data, encoding=encoding, errors=errors
+        )
+
+    async def touch(self, exist_ok=True) -> None:
+        await run_sync(self._path.touch, exist_ok=exist_ok)
+
+    async def mkdir(self, parents=False, exist_ok=False) -> None:
+        await run_sync(self._path.mkdir, parents=parents, exist_ok=exist_ok)
+
+    async def unlink(self, missing_ok=False) -> None:
+        await run_sync(self._path.unlink, missing_ok=missing_ok)
+
+    def open(self, mode: Text = "rb", **kwargs) -> AsyncLocalFile:
+        return AsyncLocalFile(self._path, mode, **kwargs)
+
+    async def glob(self, pattern: Text, **kwargs) -> AsyncGenerator["AsyncPath", None]:
+        async for path in _iterate(self._path.glob(pattern, **kwargs)):
+            yield self._wrap(path)
+
+    async def iterdir(self) -> AsyncGenerator["AsyncPath", None]:
+        async for path in _iterate(self._path.iterdir()):
+            yield self._wrap(path)
+
+
+class GSSession:
+    def __init__(
+        self,
+        client: Any,
+        *,
+        limit: int = DEFAULT_CONNECTION_LIMIT,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
+        self.client = client
+        self.base_url = client._connection.API_BASE_URL.rstrip("/")
+        self.limit = limit
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.users = 0
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._refresh_lock: Optional[asyncio.Lock] = None
+
+    def __repr__(self) -> Text:
+        return f"GSSession({self.base_url!r}, limit={self.limit})"
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.limit, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=self.retry_policy.timeout),
+            )
+        return self._session
+
+    async def _auth_headers(self) -> Dict[Text, Text]:
+        credentials = self.client._credentials
+        if not credentials.valid:
+            if self._refresh_lock is None:
+                self._refresh_lock = asyncio.Lock()
+            async with self._refresh_lock:
+                if not credentials.valid:
+                    from google.auth.transport.requests import Request
+
+                    await run_sync(credentials.refresh, Request())
+        headers: Dict[Text, Text] = {}
+        credentials.apply(headers)
+        return headers
+
+    async def request(
+        self,
+        method: Text,
+        url: Text,
+        *,
+        params: Optional[Dict[Text, Text]] = None,
+        data: Optional[bytes] = None,
+        headers: Optional[Dict[Text, Text]] = None,
+        retry: bool = True,
+    ) -> Tuple[int, Mapping[Text, Text], bytes]:
+        policy = self.retry_policy
+        deadline = time.monotonic() + policy.deadline
+        delay = policy.initial_backoff
+        session = self._get_session()
+        while True:
+            request_headers = await self._auth_headers()
+            request_headers.update(headers or {})
+            try:
+                async with session.request(
+                    method, url, params=params, data=data, headers=request_headers
+                ) as response:
+                    result = response.status, response.headers, await response.read()
+                if not retry or result[0] not in RETRYABLE_STATUS:
+                    return result
+                if time.monotonic() + delay > deadline:
+                    return result
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if not retry or time.monotonic() + delay > deadline:
+                    raise
+            # Full jitter keeps thousands of concurrent retries from aligning
+            await asyncio.sleep(random.uniform(0, delay))
+            delay = min(delay * policy.multiplier, policy.max_backoff)
+
+    async def hedge(self, func: Callable[[], Awaitable[T]]) -> T:
+        policy = self.retry_policy
+        if not policy.hedging:
+            return await func()
+        delay = policy.hedge_delay()
+        if delay is None:
+            return await self._timed(func)
+
+        first = asyncio.ensure_future(self._timed(func))
+        done, _ = await asyncio.wait([first], timeout=delay)
+        if done:
+            return first.result()
+
+        policy.record_hedge()
+        second = asyncio.ensure_future(self._timed(func))
+        done, pending = await asyncio.wait(
+            [first, second], return_when=asyncio.FIRST_COMPLETED
+        )
+        succeeded = [t for t in (first, second) if t in done and not t.exception()]
+        winner = succeeded[0] if succeeded else (pending or done).pop()
+        if winner is second:
+            policy.record_hedge(won=True)
+        # Unlike threads, the slower request can be abandoned outright
+        for task in pending - {winner}:
+            task.cancel()
+        return await winner
+
+    async def _timed(self, func: Callable[[], Awaitable[T]]) -> T:
+        start = time.perf_counter()
+        result = await func()
+        self.retry_policy.record_latency(time.perf_counter() - start)
+        return result
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+
+
+LoopSessions = Dict[Tuple[int, int], GSSession]
+_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, LoopSessions]"
+_sessions = weakref.WeakKeyDictionary()
+
+
+def get_session(client: Any, retry_policy: Optional[RetryPolicy] = None) -> GSSession:
+    # aiohttp sessions are bound to the loop they were created in
+    sessions = _sessions.setdefault(asyncio.get_running_loop(), {})
+    key = (id(client), id(retry_policy))
+    session = sessions.get(key)
+    if (
+        session is None
+        or session.client is not client
+        or (retry_policy is not None and session.retry_policy is not retry_policy)
+    ):
+        session = sessions[key] = GSSession(client, retry_policy=retry_policy)
+    return session
+
+
+async def release_session(session: GSSession) -> None:
+    session.users -= 1
+    if session.users > 0:
+        return
+    sessions = _sessions.get(asyncio.get_running_loop(), {})
+    for key, value in list(sessions.items()):
+        if value is session:
+            del sessions[key]
+    await session.close()
+
+
+async def close_sessions() -> None:
+    for session in _sessions.pop(asyncio.get_running_loop(), {}).values():
+        await session.close()
+
+
+class AsyncGSReader:
+    def __init__(self, path: "AsyncGSPath", chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self._path = path
+        self._chunk_size = chunk_size
+        self._position = 0
+        self._size: Optional[int] = None
+        self._generation: Optional[Text] = None
+        self._buffer = b""
+        self._buffer_start = 0
+
+    async def _load(self) -> int:
+        if self._size is None:
+            resource = await self._path._metadata(strict=True)
+            self._size = int(resource.get("size") or 0)
+            self._generation = resource.get("generation")
+        return self._size
+
+    async def __aenter__(self) -> "AsyncGSReader":
+        await self._load()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def read(self, size: int = -1) -> bytes:
+        total = await self._load()
+        end = total if size < 0 else min(total, self._position + size)
+        chunks = []
+        while self._position < end:
+            offset = self._position - self._buffer_start
+            if 0 <= offset < len(self._buffer):
+                chunk = self._buffer[offset : offset + end - self._position]
+                chunks.append(chunk)
+                self._position += len(chunk)
+                continue
+            fetch_end = min(total, max(end, self._position + self._chunk_size))
+            self._buffer = await self._path._read_range(
+                self._position, fetch_end, self._generation
+            )
+            self._buffer_start = self._position
+            if not self._buffer:
+                break
+        return b"".join(chunks)
+
+    async def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = await self._load() + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+        self._position = position
+        return position
+
+    async def tell(self) -> int:
+        return self._position
+
+    async def close(self) -> None:
+        self._buffer = b""
+
+
+class AsyncGSWriter:
+    def __init__(
+        self, path: "AsyncGSPath", chunk_size: int = DEFAULT_UPLOAD_CHUNK_SIZE
+    ):
+        if chunk_size <= 0 or chunk_size % UPLOAD_CHUNK_MULTIPLE:
+            raise ValueError(
+                f"Chunk size must be a multiple of {UPLOAD_CHUNK_MULTIPLE}"
+            )
+        self._path = path
+        self._chunk_size = chunk_size
+        self._buffer = bytearray()
+        self._upload_url: Optional[Text] = None
+        self._offset = 0
+        self._closed = False
+
+    async def __aenter__(self) -> "AsyncGSWriter":
+        return self
+
+    async def __aexit__(self, exc_type, *exc_info) -> None:
+        if exc_type is None:
+            await self.close()
+
+    async def write(self, data: bytes) -> int:
+        if self._closed:
+            raise ValueError("I/O operation on closed file")
+        self._buffer += data
+        # Keep at least one byte back so the final request is never empty
+        while len(self._buffer) > self._chunk_size:
+            await self._upload_chunk(bytes(self._buffer[: self._chunk_size]), None)
+            del self._buffer[: self._chunk_size]
+        return len(data)
+
+    async def tell(self) -> int:
+        return self._offset + len(self._buffer)
+
+    async def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        data = bytes(self._buffer)
+        self._buffer = bytearray()
+        if self._upload_url is None:
+            await self._path.write_bytes(data)
+        else:
+            await self._upload_chunk(data, self._offset + len(data))
+
+    async def _upload_chunk(self, data: bytes, total: Optional[int]) -> None:
+        session = self._path.session
+        if self._upload_url is None:
+            status, headers, body = await session.request(
+                "POST",
+                self._path._upload_url(),
+                params={"uploadType": "resumable", "name": self._path.blob_name},
+                data=json.dumps({"name": self._path.blob_name}).encode(),
+                headers={"Content-Type": "application/json"},
+            )
+            _check(status, body, self._path)
+            self._upload_url = headers["Location"]
+
+        end = self._offset + len(data) - 1
+        status, _, body = await session.request(
+            "PUT",
+            self._upload_url,
+            data=data,
+            headers={
+                "Content-Range": f"bytes {self._offset}-{end}/{total or '*'}",
+            },
+            retry=False,
+        )
+        if status != 308:
+            _check(status, body, self._path)
+        self._offset += len(data)
+
+
+class AsyncGSPath(AsyncPath):
+    __slots__ = ("_session", "_listed")
+
+    def __init__(
+        self,
+        path: Union[Text, Path],
+        *,
+        session: Optional[GSSession] = None,
+        **kwargs,
+    ):
+        super().__init__(path, **kwargs)
+        if self._path._scheme != "gs":
+            raise ValueError(f"Expected a gs path, got {self._path}")
+        self._session = session
+        self._listed: Optional[Dict[Text, Any]] = None
+
+    async def __aenter__(self) -> "AsyncGSPath":
+        # Paths sharing a pooled session keep it open until the last one exits
+        self.session.users += 1
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await release_session(self.session)
+
+    @property
+    def session(self) -> GSSession:
+        if self._session is not None:
+            return self._session
+        return get_session(self._path.client, self._path.retry_policy)
+
+    @property
+    def bucket_name(self) -> Text:
+        return self._path.bucket_name
+
+    @property
+    def blob_name(self) -> Text:
+        return self._path.blob_name
+
+    def _wrap(
+        self, path: Path, resource: Optional[Dict[Text, Any]] = None
+    ) -> "AsyncGSPath":
+        new_path = super()._wrap(path)
+        new_path._session = self._session
+        new_path._listed = resource
+        return new_path
+
+    def _wrap_name(
+        self, name: Text, resource: Optional[Dict[Text, Any]] = None
+    ) -> "AsyncGSPath":
+        return self._wrap(
+            self._path._new_path(self._path._with_path("/" + name)), resource
+        )
+
+    def _object_url(self, download: bool = False) -> Text:
+        name = quote(self.blob_name, safe="")
+        prefix = "/download" if download else ""
+        return (
+            f"{self.session.base_url}{prefix}/storage/v1/b/{self.bucket_name}/o/{name}"
+        )
+
+    def _upload_url(self) -> Text:
+        return f"{self.session.base_url}/upload/storage/v1/b/{self.bucket_name}/o"
+
+    async def _metadata(self, strict: bool = False) -> Optional[Dict[Text, Any]]:
+        if self._listed is not None:
+            return self._listed
+        status, _, body = await self.session.request("GET", self._object_url())
+        if status == 404 and not strict:
+            return None
+        _check(status, body, self)
+        return json.loads(body)
+
+    async def _read_range(
+        self, start: int, end: int, generation: Optional[Text]
+    ) -> bytes:
+        params = {"alt": "media"}
+        if generation is not None:
+            params["ifGenerationMatch"] = str(generation)
+        session = self.session
+        status, _, body = await session.hedge(
+            lambda: session.request(
+                "GET",
+                self._object_url(download=True),
+                params=params,
+                headers={"Range": f"bytes={start}-{end - 1}"},
+            )
+        )
+        if status == 412:
+            raise OSError(f"Object changed while reading: {self}")
+        _check(status, body, self)
+        return body
+
+    async def _list_entries(
+        self, prefix: Text, delimiter: bool, *, page_size: int = DEFAULT_PAGE_SIZE
+    ) -> AsyncGenerator[Tuple[Text, Optional[Dict[Text, Any]]], None]:
+        url = f"{self.session.base_url}/storage/v1/b/{self.bucket_name}/o"
+        params = {"prefix": prefix, "maxResults": str(page_size)}
+        if delimiter:
+            params["delimiter"] = "/"
+        while True:
+            status, _, body = await self.session.request("GET", url, params=params)
+            _check(status, body, self)
+            page = json.loads(body)
+            for dirname in sorted(page.get("prefixes", [])):
+                yield dirname, None
+            for item in page.get("items", []):
+                yield item["name"], item
+            if not page.get("nextPageToken"):
+                return
+            params["pageToken"] = page["nextPageToken"]
+
+    async def _lookup_entry(
+        self, name: Text
+    ) -> Optional[Tuple[Text, Optional[Dict[Text, Any]]]]:
+        path = self._wrap_name(name)
+        resource = None
+        if name and not name.endswith("/"):
+            resource = await path._metadata()
+        if resource is not None:
+            return name, resource
+        if await path.is_dir():
+            return path._path._dir_prefix(), None
+        return None
+
+    async def stat(self) -> Dict[Text, Union[int, float]]:
+        resource = await self._metadata(strict=True)
+        return {
+            "size": int(resource.get("size") or 0),
+            "mtime": _timestamp(resource["updated"]),
+            "ctime": _timestamp(resource["timeCreated"]),
+        }
+
+    async def exists(self) -> bool:
+        if self._path._urlpath.endswith("/"):
+            return await self.is_dir()
+        return await self.is_file()
+
+    async def is_dir(self) -> bool:
+        async for _ in self._list_entries(self._path._dir_prefix(), True, page_size=1):
+            return True
+        return False
+
+    async def is_file(self) -> bool:
+        if self._path._urlpath.endswith("/"):
+            return False
+        return await self._metadata() is not None
+
+    async def read_bytes(self) -> bytes:
+        session = self.session
+        status, _, body = await session.hedge(
+            lambda: session.request(
+                "GET", self._object_url(download=True), params={"alt": "media"}
+            )
+        )
+        _check(status, body, self)
+        return body
+
+    async def write_bytes(self, data) -> int:
+        data = bytes(data)
+        session = self.session
+        params = {"uploadType": "media", "name": self.blob_name}
+        guarded = session.retry_policy.precondition_writes
+        if guarded:
+            # Pinned to the generation seen now, so a retried upload is idempotent
+            self._listed = None
+            resource = await self._metadata()
+            params["ifGenerationMatch"] = str(resource["generation"] if resource else 0)
+        status, _, body = await session.request(
+            "POST",
+            self._upload_url(),
+            params=params,
+            data=data,
+            headers={"Content-Type": "application/octet-stream"},
+            retry=guarded,
+        )
+        _check(status, body, self)
+        self._listed = None
+        return len(data)
+
+    async def touch(self, exist_ok=True) -> None:
+        if self._path._urlpath.endswith("/"):
+            raise IsADirectoryError(f"Is a directory: {self}")
+        if await self.is_file():
+            if not exist_ok:
+                raise FileExistsError(f"File already exists: {self}")
+            return
+        await self.write_bytes(b"")
+
+    async def mkdir(self, parents=False, exist_ok=False) -> None:
+        path = self
+        if not self._path._urlpath.endswith("/"):
+            path = self._wrap(
+                self._path._new_path(self._path._with_path(self._path._urlpath + "/"))
+            )
+        if await path.is_dir():
+            if not exist_ok:
+                raise FileExistsError(f"Directory already exists: {path}")
+            return
+        await (path / self._path.empty_filename).write_bytes(b"")
+
+    async def unlink(self, missing_ok=False) -> None:
+        if self._path._urlpath.endswith("/"):
+            raise IsADirectoryError(f"Is a directory: {self}")
+        status, _, body = await self.session.request(
+            "DELETE", self._object_url(), retry=False
+        )
+        self._listed = None
+        if status == 404 and missing_ok:
+            return
+        _check(status, body, self)
+
+    def open(
+        self, mode: Text = "rb", *, chunk_size: Optional[int] = None, **kwargs
+    ) -> Union[AsyncGSReader, AsyncGSWriter]:
+        if mode not in ("r", "rb", "w", "wb"):
+            raise ValueError(f"Invalid mode: {mode}, only binary streams are supported")
+        if self._path._urlpath.endswith("/"):
+            raise IsADirectoryError(f"Is a directory: {self}")
+        if "r" in mode:
+            return AsyncGSReader(self, chunk_size or DEFAULT_CHUNK_SIZE)
+        return AsyncGSWriter(self, chunk_size or DEFAULT_UPLOAD_CHUNK_SIZE)
+
+    async def glob(
+        self,
+        pattern: Text,
+        *,
+        return_file: bool = True,
+        return_dir: bool = True,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        **kwargs,
+    ) -> AsyncGenerator["AsyncGSPath", None]:
+        pattern = pattern.strip()
+        prefix = self._path._dir_prefix()
+        bucket_url = f"gs://{self.bucket_name}"
+        if pattern.startswith(bucket_url):
+            pattern = pattern[len(bucket_url) :]
+        if pattern.startswith("/"):
+            prefix = ""
+            pattern = pattern.lstrip("/")
+
+        paths: Set[Text] = set()
+
+        for alternative in GlobPattern(pattern).alternatives:
+            async for name, resource in aiter_glob(
+                prefix,
+                alternative.split("/"),
+                list_entries=functools.partial(self._list_entries, page_size=page_size),
+                lookup=self._lookup_entry,
+                hidden_names={self._path.empty_filename, MANIFEST_FILENAME},
+            ):
+                if name in paths:
+                    continue
+                paths.add(name)
+                if name.endswith("/"):
+                    if not return_dir:
+                        continue
+                elif not return_file:
+                    continue
+                yield self._wrap_name(name, resource)
+
+    async def iterdir(
+        self, *, page_size: int = DEFAULT_PAGE_SIZE
+    ) -> AsyncGenerator["AsyncGSPath", None]:
+        prefix = self._path._dir_prefix()
+        hidden = ("", self._path.empty_filename, MANIFEST_FILENAME)
+        async for name, resource in self._list_entries(
+            prefix, True, page_size=page_size
+        ):
+            if resource is not None and name[len(prefix) :] in hidden:
+                continue
+            yield self._wrap_name(name, resource)
+
+
+async_path_classes: Dict[Text, Type[AsyncPath]] = {
+    "file": AsyncLocalPath,
+    "gs": AsyncGSPath,
+}
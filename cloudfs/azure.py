@@ -1,5 +1,692 @@
-from cloudfs.base import Path
+import hashlib
+import io
+import os
+import threading
+import time
+import uuid
+import warnings
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Generator, Hashable, List, Optional, Text, Tuple, Union
 
+from yarl import URL
 
-class AzurePath(Path):
-    pass
+from cloudfs.base import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_PAGE_SIZE,
+    EMPTY_FILENAME,
+    FileInfo,
+    ObjectStorePath,
+    Path,
+    RangeReader,
+    file_checksum,
+)
+from cloudfs.cache import ReadCache
+
+try:
+    import requests
+    from azure.core import MatchConditions
+    from azure.core.exceptions import ResourceNotFoundError
+    from azure.core.pipeline.transport import RequestsTransport
+    from azure.storage.blob import (
+        BlobBlock,
+        BlobProperties,
+        BlobServiceClient,
+        ContainerClient,
+        ContentSettings,
+    )
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    warnings.warn(
+        "Required 'azure-storage-blob' is not installed, "
+        "please install it with 'pip install azure-storage-blob'"
+    )
+
+DEFAULT_BLOCK_SIZE = 8 * 1024 * 1024
+DEFAULT_MAX_CONCURRENCY = 8
+MAX_DELETE_BATCH_SIZE = 256  # Blob batch accepts up to 256 sub-requests
+COPY_POLL_INTERVAL = 0.2
+COPY_POLL_MAX_INTERVAL = 5.0
+
+
+class AzureClientRegistry:
+    def __init__(self, *, pool_connections: int = 10, pool_maxsize: int = 10):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+
+        self._clients: Dict[Hashable, "BlobServiceClient"] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def configure(
+        self,
+        *,
+        pool_connections: Optional[int] = None,
+        pool_maxsize: Optional[int] = None,
+    ) -> None:
+        with self._lock:
+            if pool_connections is not None:
+                self.pool_connections = pool_connections
+            if pool_maxsize is not None:
+                self.pool_maxsize = pool_maxsize
+            self._clients.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clients.clear()
+
+    def reset(self) -> None:
+        # Clients inherited through fork share their sockets with the parent
+        self._lock = threading.Lock()
+        self._clients = {}
+
+    def get_client(
+        self,
+        *,
+        account_url: Optional[Text] = None,
+        credential: Any = None,
+        connection_string: Optional[Text] = None,
+    ) -> "BlobServiceClient":
+        if account_url is None and connection_string is None:
+            connection_string = os.environ.get("AZURE_STORAGE_CONNECTION_STRING")
+            account_url = os.environ.get("AZURE_STORAGE_ACCOUNT_URL")
+        if account_url is None and connection_string is None:
+            raise ValueError(
+                "Missing Azure account, please provide 'account_url' or "
+                "'connection_string', or set AZURE_STORAGE_CONNECTION_STRING"
+            )
+
+        key = (
+            account_url,
+            self._secret_key(connection_string),
+            self._credential_key(credential),
+        )
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._create_client(
+                    account_url=account_url,
+                    credential=credential,
+                    connection_string=connection_string,
+                )
+                spec = dict(
+                    account_url=account_url,
+                    credential=credential,
+                    connection_string=connection_string,
+                )
+                client.__dict__["_cloudfs_spec"] = {
+                    name: value for name, value in spec.items() if value
+                }
+                self._clients[key] = client
+        return client
+
+    def _create_client(
+        self,
+        *,
+        account_url: Optional[Text],
+        credential: Any,
+        connection_string: Optional[Text],
+    ) -> "BlobServiceClient":
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        transport = RequestsTransport(session=session, session_owner=False)
+
+        if connection_string is not None:
+            return BlobServiceClient.from_connection_string(
+                connection_string, credential=credential, transport=transport
+            )
+        return BlobServiceClient(
+            account_url, credential=credential, transport=transport
+        )
+
+    @staticmethod
+    def _secret_key(value: Optional[Text]) -> Optional[Text]:
+        if value is None:
+            return None
+        return hashlib.sha256(value.encode()).hexdigest()
+
+    @classmethod
+    def _credential_key(cls, credential: Any) -> Hashable:
+        if credential is None or isinstance(credential, Text):
+            return cls._secret_key(credential)
+        if isinstance(credential, dict):
+            return cls._secret_key(repr(sorted(credential.items())))
+        return ("object", id(credential))
+
+
+client_registry = AzureClientRegistry()
+
+
+def client_spec(client: "BlobServiceClient") -> Dict[Text, Any]:
+    spec = client.__dict__.get("_cloudfs_spec")
+    if spec is not None:
+        return spec
+    # Clients built by the caller are rebuilt from their account and credential
+    return {"account_url": client.url, "credential": client.credential}
+
+
+def restore_path(
+    path: Text, spec: Dict[Text, Any], options: Dict[Text, Any]
+) -> "AzurePath":
+    client = client_registry.get_client(**spec)
+    return AzurePath(path, blob_service_client=client, **options)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=client_registry.reset)
+
+
+class AzureRawReader(RangeReader):
+    def __init__(
+        self,
+        container_client: "ContainerClient",
+        blob_name: Text,
+        *,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        read_ahead: bool = True,
+    ):
+        blob_client = container_client.get_blob_client(blob_name)
+        try:
+            properties = blob_client.get_blob_properties()
+        except ResourceNotFoundError:
+            raise FileNotFoundError(f"No such file or directory: {blob_name}")
+        super().__init__(properties.size, chunk_size=chunk_size, read_ahead=read_ahead)
+
+        self._container_name = container_client.container_name
+        self._blob_client = blob_client
+        self._etag: Text = properties.etag
+
+    @property
+    def name(self) -> Text:
+        return f"azure://{self._container_name}/{self._blob_client.blob_name}"
+
+    @property
+    def cache_key(self) -> Text:
+        etag = self._etag.strip('"')
+        return f"{self.name}#{etag}"
+
+    def _read_range(self, start: int, end: int) -> bytes:
+        return self._blob_client.download_blob(
+            offset=start,
+            length=end - start + 1,
+            etag=self._etag,
+            match_condition=MatchConditions.IfNotModified,
+        ).readall()
+
+
+class AzureWriter(io.BufferedIOBase):
+    def __init__(
+        self,
+        container_client: "ContainerClient",
+        blob_name: Text,
+        *,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ):
+        self._container_name = container_client.container_name
+        self._blob_client = container_client.get_blob_client(blob_name)
+        self._block_size = block_size
+        self._max_concurrency = max_concurrency
+
+        self._buffer = bytearray()
+        self._md5 = hashlib.md5()
+        self._upload_token = uuid.uuid4().hex
+        self._blocks: List[Tuple[Text, Future]] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def name(self) -> Text:
+        return f"azure://{self._container_name}/{self._blob_client.blob_name}"
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._checkClosed()
+        self._buffer += data
+        self._md5.update(data)
+        while len(self._buffer) >= self._block_size:
+            self._submit_block(bytes(self._buffer[: self._block_size]))
+            del self._buffer[: self._block_size]
+        return len(data) if isinstance(data, bytes) else memoryview(data).nbytes
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            if not self._blocks:
+                self._blob_client.upload_blob(bytes(self._buffer), overwrite=True)
+            else:
+                if self._buffer:
+                    self._submit_block(bytes(self._buffer))
+                block_list = []
+                for block_id, future in self._blocks:
+                    future.result()
+                    block_list.append(BlobBlock(block_id=block_id))
+                self._blob_client.commit_block_list(
+                    block_list,
+                    content_settings=ContentSettings(
+                        content_md5=bytearray(self._md5.digest())
+                    ),
+                )
+        except BaseException:
+            for _, future in self._blocks:
+                future.cancel()
+            raise
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+            self._buffer = bytearray()
+            super().close()
+
+    def _submit_block(self, data: bytes) -> None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._max_concurrency)
+
+        pending = [future for _, future in self._blocks if not future.done()]
+        if len(pending) >= self._max_concurrency:
+            wait(pending, return_when=FIRST_COMPLETED)
+
+        # Block ids must have the same length within a blob
+        block_id = f"{self._upload_token}-{len(self._blocks):06d}"
+        future = self._executor.submit(self._blob_client.stage_block, block_id, data)
+        self._blocks.append((block_id, future))
+
+
+class AzurePath(ObjectStorePath):
+    __slots__ = (
+        "_blob_service_client",
+        "empty_filename",
+        "block_size",
+        "max_concurrency",
+        "read_cache",
+        "_listed_blob",
+    )
+
+    delete_batch_size = MAX_DELETE_BATCH_SIZE
+
+    def __init__(
+        self,
+        path: Union[Text, URL],
+        *,
+        blob_service_client: Optional["BlobServiceClient"] = None,
+        account_url: Optional[Text] = None,
+        credential: Any = None,
+        connection_string: Optional[Text] = None,
+        empty_filename: Text = EMPTY_FILENAME,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        read_cache: Optional[ReadCache] = None,
+        **kwargs,
+    ):
+        super().__init__(path, **kwargs)
+
+        if self._scheme != "azure":
+            raise ValueError(f"Unsupported scheme: azure, got {self._scheme}")
+        if not self.container_name:
+            raise ValueError(f"Missing container name in {self}")
+
+        if blob_service_client is None:
+            blob_service_client = client_registry.get_client(
+                account_url=account_url,
+                credential=credential,
+                connection_string=connection_string,
+            )
+        self._blob_service_client = blob_service_client
+
+        self.empty_filename = empty_filename
+        self.block_size = block_size
+        self.max_concurrency = max_concurrency
+        self.read_cache = read_cache
+        self._listed_blob: Optional["BlobProperties"] = None
+
+    @property
+    def client(self) -> "BlobServiceClient":
+        return self._blob_service_client
+
+    @property
+    def container_client(self) -> "ContainerClient":
+        return self.client.get_container_client(self.container_name)
+
+    @property
+    def container_name(self) -> Text:
+        return self._host
+
+    @property
+    def blob_name(self) -> Text:
+        return self._urlpath.lstrip("/")
+
+    def __eq__(self, other_path: "AzurePath") -> bool:
+        if not isinstance(other_path, AzurePath):
+            return False
+        return (self._host, self._urlpath) == (other_path._host, other_path._urlpath)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        options = {
+            "empty_filename": self.empty_filename,
+            "block_size": self.block_size,
+            "max_concurrency": self.max_concurrency,
+        }
+        return (restore_path, (self._str, client_spec(self.client), options))
+
+    def __truediv__(self, name: Text) -> "AzurePath":
+        if not isinstance(name, Text):
+            raise ValueError(f"Expected str, got {type(name)}")
+        return self._new_path(self._join(name))
+
+    def ping(self) -> bool:
+        return self.container_client.exists()
+
+    def samefile(self, other_path: Union[Text, "AzurePath"]) -> bool:
+        if isinstance(other_path, Text):
+            other_path = self._new_path(other_path)
+        if not isinstance(other_path, AzurePath):
+            if isinstance(other_path, Path):
+                return self._same_content(other_path)
+            return False
+        if self == other_path:
+            return True
+        properties = self._load_blob(strict=True)
+        other_properties = other_path._load_blob(strict=True)
+        if properties.size != other_properties.size:
+            return False
+        return self.checksum() == other_path.checksum()
+
+    def list_files(
+        self, *, page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Generator[FileInfo, None, None]:
+        prefix = self._dir_prefix()
+        for name, properties in self._list_entries(prefix, False, page_size=page_size):
+            relative = name[len(prefix) :]
+            if properties is None or relative.rpartition("/")[2] in (
+                "",
+                self.empty_filename,
+            ):
+                continue
+            content_md5 = properties.content_settings.content_md5
+            yield FileInfo(
+                relative,
+                properties.size,
+                properties.last_modified.timestamp(),
+                properties.etag.strip('"'),
+                bytes(content_md5).hex() if content_md5 else None,
+            )
+
+    def stat(self) -> Dict[Text, Union[int, float]]:
+        properties = self._load_blob(strict=True)
+        mtime = properties.last_modified.timestamp()
+        ctime = (
+            properties.creation_time.timestamp() if properties.creation_time else mtime
+        )
+        return {"size": properties.size, "mtime": mtime, "ctime": ctime}
+
+    def owner(self) -> Text:
+        # Blob storage has no per-blob owner, the storage account owns every blob
+        self._load_blob(strict=True)
+        return self.client.account_name
+
+    def group(self) -> Text:
+        return self.owner()
+
+    def open(
+        self,
+        mode: Text = "r",
+        buffering: int = -1,
+        encoding: Optional[Text] = None,
+        errors: Optional[Text] = None,
+        newline: Optional[Text] = None,
+        *,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        read_ahead: bool = True,
+        **kwargs,
+    ) -> io.IOBase:
+        if set(mode) - set("rwbt") or len(set(mode) & set("rw")) != 1:
+            raise ValueError(f"Invalid mode: {mode}")
+        if "b" in mode and "t" in mode:
+            raise ValueError(f"Invalid mode: {mode}")
+        if self._urlpath.endswith("/"):
+            raise IsADirectoryError(f"Is a directory: {self}")
+
+        stream: io.IOBase
+        if "r" in mode and self.read_cache is not None and buffering != 0:
+            stream = self.read_cache.open(self)
+        elif "r" in mode:
+            raw = AzureRawReader(
+                self.container_client,
+                self.blob_name,
+                chunk_size=chunk_size,
+                read_ahead=read_ahead,
+            )
+            if buffering == 0:
+                if "b" not in mode:
+                    raise ValueError("Can't have unbuffered text I/O")
+                return raw
+            stream = io.BufferedReader(
+                raw, buffer_size=buffering if buffering > 1 else io.DEFAULT_BUFFER_SIZE
+            )
+        else:
+            self._invalidate_metadata()
+            stream = AzureWriter(
+                self.container_client,
+                self.blob_name,
+                block_size=self.block_size,
+                max_concurrency=self.max_concurrency,
+            )
+
+        if "b" in mode:
+            return stream
+        return io.TextIOWrapper(
+            stream, encoding=encoding, errors=errors, newline=newline
+        )
+
+    def read_bytes(self) -> bytes:
+        if self.read_cache is not None:
+            return self.read_cache.read_bytes(self)
+        blob_client = self.container_client.get_blob_client(self.blob_name)
+        try:
+            downloader = blob_client.download_blob(max_concurrency=self.max_concurrency)
+        except ResourceNotFoundError:
+            raise FileNotFoundError(f"No such file or directory: {self}")
+        return downloader.readall()
+
+    def read_text(self, encoding=None, errors=None) -> Text:
+        return self.read_bytes().decode(encoding or "utf-8", errors or "strict")
+
+    def write_bytes(self, data: bytes) -> int:
+        with self.open("wb") as f:
+            f.write(data)
+        return len(data)
+
+    def write_text(self, data, encoding=None, errors=None) -> int:
+        self.write_bytes(data.encode(encoding or "utf-8", errors or "strict"))
+        return len(data)
+
+    def touch(self, mode=None, exist_ok=True) -> None:
+        if self._urlpath.endswith("/"):
+            raise IsADirectoryError(f"Is a directory: {self}")
+        if self.is_file():
+            if not exist_ok:
+                raise FileExistsError(f"File already exists: {self}")
+            return
+        self.container_client.upload_blob(self.blob_name, b"", overwrite=True)
+        self._invalidate_metadata()
+
+    def mkdir(self, mode=None, parents: bool = False, exist_ok: bool = False) -> None:
+        if not self._urlpath.endswith("/"):
+            path = self._new_path(self._with_path(self._urlpath + "/"))
+        else:
+            path = self
+
+        if path.is_dir():
+            if not exist_ok:
+                raise FileExistsError(f"Directory already exists: {path}")
+            return
+        (path / self.empty_filename).touch()
+
+    def unlink(self, missing_ok=False) -> None:
+        if self._urlpath.endswith("/"):
+            raise IsADirectoryError(f"Is a directory: {self}")
+        self._invalidate_metadata()
+        try:
+            self.container_client.delete_blob(self.blob_name)
+        except ResourceNotFoundError:
+            if not missing_ok:
+                raise FileNotFoundError(f"No such file or directory: {self}")
+
+    def rmdir(self) -> None:
+        prefix = self._dir_prefix()
+        names = [
+            properties.name
+            for _, properties in zip(
+                range(3),
+                self.container_client.list_blobs(
+                    name_starts_with=prefix, results_per_page=3
+                ),
+            )
+        ]
+        if not names:
+            raise FileNotFoundError(f"No such file or directory: {self}")
+        if any(name not in (prefix, prefix + self.empty_filename) for name in names):
+            raise OSError(f"Directory not empty: {self}")
+        self._delete_batch(names)
+
+    def exists(self) -> bool:
+        if self._urlpath.endswith("/"):
+            return self.is_dir()
+        return self.is_file()
+
+    def is_dir(self) -> bool:
+        for _ in self.container_client.list_blobs(
+            name_starts_with=self._dir_prefix(), results_per_page=1
+        ):
+            return True
+        return False
+
+    def is_file(self) -> bool:
+        if self._urlpath.endswith("/"):
+            return False
+        return self._load_blob() is not None
+
+    def md5(self) -> Text:
+        return self.checksum("md5")
+
+    def checksum(self, algo: Text = "md5") -> Text:
+        if algo != "md5":
+            raise ValueError(f"Unsupported checksum for Azure: {algo}")
+        content_md5 = self._load_blob(strict=True).content_settings.content_md5
+        if content_md5:
+            return bytes(content_md5).hex()
+        # Blobs committed without a Content-MD5, hash the content itself
+        with self.open("rb") as f:
+            return file_checksum(f, "md5")
+
+    def _new_path(
+        self,
+        path: Union[Text, URL],
+        properties: Optional["BlobProperties"] = None,
+    ) -> "AzurePath":
+        new_path = AzurePath(
+            path,
+            blob_service_client=self.client,
+            empty_filename=self.empty_filename,
+            block_size=self.block_size,
+            max_concurrency=self.max_concurrency,
+            read_cache=self.read_cache,
+        )
+        new_path._listed_blob = properties
+        return new_path
+
+    def _invalidate_metadata(self) -> None:
+        self._listed_blob = None
+
+    def _cache_key(self) -> Text:
+        etag = self._load_blob(strict=True).etag.strip('"')
+        return f"azure://{self.container_name}/{self.blob_name}#{etag}"
+
+    def _load_blob(self, strict: bool = False) -> Optional["BlobProperties"]:
+        if self._listed_blob is not None:
+            return self._listed_blob
+
+        blob_client = self.container_client.get_blob_client(self.blob_name)
+        try:
+            return blob_client.get_blob_properties()
+        except ResourceNotFoundError:
+            if strict:
+                raise FileNotFoundError(f"No such file or directory: {self}")
+            return None
+
+    def _list_entries(
+        self, prefix: Text, delimiter: bool, *, page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Generator[Tuple[Text, Optional["BlobProperties"]], None, None]:
+        if delimiter:
+            items = self.container_client.walk_blobs(
+                name_starts_with=prefix, delimiter="/", results_per_page=page_size
+            )
+        else:
+            items = self.container_client.list_blobs(
+                name_starts_with=prefix, results_per_page=page_size
+            )
+        for item in items:
+            if isinstance(item, BlobProperties):
+                yield item.name, item
+            else:
+                yield item.name, None
+
+    def _lookup_entry(
+        self, name: Text
+    ) -> Optional[Tuple[Text, Optional["BlobProperties"]]]:
+        path = self._new_path(self._with_path("/" + name))
+        properties = path._load_blob() if name and not name.endswith("/") else None
+        if properties is not None:
+            return name, properties
+        if path.is_dir():
+            return path._dir_prefix(), None
+        return None
+
+    def _delete_batch(self, names: List[Text]) -> None:
+        responses = self.container_client.delete_blobs(
+            *names, raise_on_any_failure=False
+        )
+        for name, response in zip(names, responses):
+            if response.status_code < 300 or response.status_code == 404:
+                continue
+            raise OSError(
+                f"Failed to delete azure://{self.container_name}/{name}: "
+                f"{response.status_code} {response.reason}"
+            )
+
+    def _copy_object(
+        self, blob_name: Text, target: "AzurePath", *, delete_source: bool
+    ) -> None:
+        source_client = self.container_client.get_blob_client(blob_name)
+        target_client = target.container_client.get_blob_client(target.blob_name)
+        target._invalidate_metadata()
+        try:
+            copy = target_client.start_copy_from_url(source_client.url)
+            status = copy["copy_status"]
+            interval = COPY_POLL_INTERVAL
+            while status == "pending":
+                time.sleep(interval)
+                interval = min(interval * 2, COPY_POLL_MAX_INTERVAL)
+                status = target_client.get_blob_properties().copy.status
+            if status != "success":
+                raise OSError(f"Failed to copy {source_client.url}: {status}")
+            if delete_source:
+                source_client.delete_blob()
+        except ResourceNotFoundError:
+            raise FileNotFoundError(
+                f"No such file or directory: azure://{self.container_name}/{blob_name}"
+            )
@@ -1,44 +1,384 @@
+import contextlib
+import functools
+import hashlib
+import importlib
 import io
+import mmap
+import os
+import re
+import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path as _Path
-from typing import Dict, Generator, Text, Type, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Text,
+    Tuple,
+    Type,
+    Union,
+)
 
-from yarl import URL
+from cloudfs.metrics import instrument, wrap_context
+from cloudfs.pattern import GlobPattern, iter_glob
 
-support_schemes = ("file", "gs", "s3", "azure")
+if TYPE_CHECKING:
+    from yarl import URL
+
+path_classes: Dict[Text, Tuple[Text, Text]] = {
+    "file": ("cloudfs.base", "LocalPath"),
+    "gs": ("cloudfs.gs", "GSPath"),
+    "s3": ("cloudfs.s3", "S3Path"),
+    "azure": ("cloudfs.azure", "AzurePath"),
+}
+support_schemes = tuple(path_classes)
+
+# URLs made of these characters are the same before and after yarl parsing
+SIMPLE_URL_PATTERN = re.compile(
+    r"([a-z]+)://([a-z0-9._-]*)(/[\w.~!$&'()*+,;=:@/-]*)?", re.ASCII
+)
+SIMPLE_PATH_PATTERN = re.compile(r"[\w.~!$&'()*+,;=:@/-]*", re.ASCII)
+
+EMPTY_FILENAME = "__empty__"
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_PAGE_SIZE = 1000
+CHECKSUM_ALGORITHMS = ("md5", "crc32c")
+CHECKSUM_CHUNK_SIZE = 1024 * 1024
+SCANDIR_THRESHOLD = 16
+
+
+class FileInfo(NamedTuple):
+    name: Text
+    size: int
+    mtime: float
+    version: Optional[Text]
+    md5: Optional[Text]
+
+
+def run_bounded(
+    func: Callable[[Any], Any], items: Iterable[Any], *, max_workers: int
+) -> int:
+    count = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures: Set[Future] = set()
+        for item in items:
+            if len(futures) >= max_workers * 2:
+                done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            futures.add(executor.submit(wrap_context(func), item))
+            count += 1
+        for future in futures:
+            future.result()
+    return count
+
+
+def readinto_full(f: io.IOBase, view: memoryview) -> int:
+    total = 0
+    while total < len(view):
+        size = f.readinto(view[total:])
+        if not size:
+            break
+        total += size
+    return total
+
+
+def new_hasher(algo: Text) -> Any:
+    if algo == "md5":
+        return hashlib.md5()
+    if algo == "crc32c":
+        import google_crc32c
+
+        return google_crc32c.Checksum()
+    raise ValueError(f"Invalid checksum: {algo}, expected one of {CHECKSUM_ALGORITHMS}")
+
+
+def file_checksum(f: io.IOBase, algo: Text) -> Text:
+    hasher = new_hasher(algo)
+    # google_crc32c only accepts bytes, not writable buffers
+    for chunk in iter(functools.partial(f.read, CHECKSUM_CHUNK_SIZE), b""):
+        hasher.update(chunk)
+    return hasher.digest().hex()
+
+
+class ChecksumCache:
+    def __init__(self, maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Tuple, Text]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Tuple) -> Optional[Text]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Tuple, value: Text) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+checksum_cache = ChecksumCache()
+
+
+def checksum_key(stat_info: os.stat_result, algo: Text) -> Tuple:
+    return (
+        stat_info.st_dev,
+        stat_info.st_ino,
+        stat_info.st_size,
+        stat_info.st_mtime_ns,
+        algo,
+    )
+
+
+def remember_checksum(
+    filename: Union[Text, os.PathLike], algo: Text, value: Text
+) -> None:
+    checksum_cache.set(checksum_key(os.stat(filename), algo), value)
+
+
+class MemoryWriter(io.RawIOBase):
+    def __init__(self, view: memoryview):
+        self._view = view
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def write(self, data) -> int:
+        data = memoryview(data).cast("B")
+        end = self._pos + len(data)
+        if end > len(self._view):
+            raise ValueError(f"Buffer too small, needs at least {end} bytes")
+        self._view[self._pos : end] = data
+        self._pos = end
+        return len(data)
+
+
+class RangeReader(io.RawIOBase):
+    def __init__(
+        self,
+        size: int,
+        *,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        read_ahead: bool = True,
+    ):
+        self._size = size
+        self._chunk_size = chunk_size
+        self._pos = 0
+
+        self._chunk_start = 0
+        self._chunk = b""
+        self._executor = ThreadPoolExecutor(max_workers=1) if read_ahead else None
+        self._prefetch: Optional[Tuple[int, Future]] = None
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def cache_key(self) -> Optional[Text]:
+        return None
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self._checkClosed()
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self._size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if pos < 0:
+            raise ValueError(f"Negative seek position {pos}")
+        self._pos = pos
+        return self._pos
+
+    def readinto(self, buffer) -> int:
+        self._checkClosed()
+        if self._pos >= self._size:
+            return 0
+        if not (self._chunk_start <= self._pos < self._chunk_start + len(self._chunk)):
+            chunk_start = self._pos - self._pos % self._chunk_size
+            self._chunk = self._take_chunk(chunk_start)
+            self._chunk_start = chunk_start
+            self._schedule_prefetch(chunk_start + self._chunk_size)
+
+        offset = self._pos - self._chunk_start
+        view = memoryview(buffer).cast("B")
+        size = min(len(view), len(self._chunk) - offset)
+        view[:size] = self._chunk[offset : offset + size]
+        self._pos += size
+        return size
+
+    def readall(self) -> bytes:
+        data = bytearray()
+        buffer = bytearray(self._chunk_size)
+        while True:
+            size = self.readinto(buffer)
+            if not size:
+                break
+            data += buffer[:size]
+        return bytes(data)
+
+    def close(self) -> None:
+        if self._prefetch is not None:
+            self._prefetch[1].cancel()
+            self._prefetch = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self._chunk = b""
+        super().close()
+
+    def _read_range(self, start: int, end: int) -> bytes:
+        raise NotImplementedError
+
+    def _fetch(self, start: int) -> bytes:
+        return self._read_range(start, min(start + self._chunk_size, self._size) - 1)
+
+    def _take_chunk(self, start: int) -> bytes:
+        if self._prefetch is not None:
+            prefetch_start, future = self._prefetch
+            self._prefetch = None
+            if prefetch_start == start:
+                return future.result()
+            future.cancel()
+        return self._fetch(start)
+
+    def _schedule_prefetch(self, start: int) -> None:
+        if self._executor is None or start >= self._size:
+            return
+        fetch = wrap_context(self._fetch)
+        self._prefetch = (start, self._executor.submit(fetch, start))
+
+
+_resolved_path_classes: Dict[Text, Type["Path"]] = {}
+
+
+def get_path_class(scheme: Text) -> Type["Path"]:
+    path_class = _resolved_path_classes.get(scheme)
+    if path_class is None:
+        module_name, class_name = path_classes[scheme]
+        path_class = getattr(importlib.import_module(module_name), class_name)
+        _resolved_path_classes[scheme] = path_class
+    return path_class
+
+
+def is_simple_path(path: Text) -> bool:
+    return SIMPLE_PATH_PATTERN.fullmatch(path) is not None and "/." not in path
+
+
+def local_uri(path: Text) -> Text:
+    if path.startswith("/") and is_simple_path(path):
+        return "file://" + path
+    return _Path(path).as_uri()
+
+
+def as_path(path: Union[Text, "Path"]) -> "Path":
+    if isinstance(path, Path):
+        return path
+    if "://" not in path:
+        return LocalPath(local_uri(os.path.abspath(path)))
+    return Path(path)
 
 
 class Path:
+    __slots__ = ("_str", "_scheme", "_host", "_urlpath", "_url_cache")
+
     def __new__(cls: Type["Path"], *args, **kwargs) -> "Path":
         path = args[0] if args else kwargs.get("path")
         if not path:
             raise ValueError("Paramter 'path' is required")
-        if cls == Path:
-            if str(path).startswith("file://"):
-                return object.__new__(LocalPath)
-            elif str(path).startswith("gs://"):
-                from cloudfs.gs import GSPath
-
-                return object.__new__(GSPath)
-            elif str(path).startswith("s3://"):
-                from cloudfs.s3 import S3Path
-
-                return object.__new__(S3Path)
-            elif str(path).startswith("azure://"):
-                from cloudfs.azure import AzurePath
-
-                return object.__new__(AzurePath)
+        if cls is Path:
+            scheme = str(path).partition("://")[0].lower()
+            if scheme in path_classes:
+                return object.__new__(get_path_class(scheme))
         return object.__new__(cls)
 
     def __init__(self, path: Union[Text, "URL"], **kwargs):
-        self._url = URL(path)
+        match = None
+        if isinstance(path, str):
+            match = SIMPLE_URL_PATTERN.fullmatch(path)
+        if match is not None and "/." not in path:
+            self._str = path
+            self._scheme, self._host, self._urlpath = match.group(1, 2, 3)
+            self._urlpath = self._urlpath or "/"
+            self._url_cache: Optional["URL"] = None
+        else:
+            from yarl import URL
 
-        if self._url.scheme not in support_schemes:
+            url = URL(path)
+            self._str = str(url)
+            self._scheme, self._host, self._urlpath = url.scheme, url.host, url.path
+            self._host = self._host or ""
+            self._url_cache = url
+
+        if self._scheme not in support_schemes:
             raise ValueError(
-                f"Unsupported scheme: {support_schemes}, got {self._url.scheme}"
+                f"Unsupported scheme: {support_schemes}, got {self._scheme}"
             )
 
+    @property
+    def _url(self) -> "URL":
+        if self._url_cache is None:
+            from yarl import URL
+
+            self._url_cache = URL(self._str)
+        return self._url_cache
+
+    def _join(self, name: Text) -> Union[Text, "URL"]:
+        if (
+            is_simple_path(name)
+            and not name.startswith((".", "/"))
+            and "?" not in self._str
+            and "#" not in self._str
+        ):
+            separator = "" if self._str.endswith("/") else "/"
+            return self._str + separator + name
+        return self._url / name
+
+    def _with_path(self, path: Text) -> Union[Text, "URL"]:
+        if is_simple_path(path):
+            return f"{self._scheme}://{self._host}{path}"
+        return self._url.with_path(path)
+
     def __str__(self):
-        return str(self._url)
+        return self._str
 
     def __repr__(self):
         return self.__str__()
@@ -46,6 +386,9 @@ class Path:
     def __eq__(self, other_path: "Path") -> bool:
         raise NotImplementedError
 
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (type(self), (self._str,))
+
     def __truediv__(self, name: Text) -> "Path":
         raise NotImplementedError
 
@@ -55,6 +398,9 @@ class Path:
     def samefile(self, other_path) -> bool:
         raise NotImplementedError
 
+    def checksum(self, algo: Text = "md5") -> Text:
+        raise NotImplementedError
+
     def glob(
         self,
         pattern: Text,
@@ -65,6 +411,17 @@ class Path:
     ) -> Generator["Path", None, None]:
         raise NotImplementedError
 
+    def iterdir(self) -> Generator["Path", None, None]:
+        raise NotImplementedError
+
+    def walk(
+        self, top_down: bool = True
+    ) -> Generator[Tuple["Path", List[Text], List[Text]], None, None]:
+        raise NotImplementedError
+
+    def list_files(self) -> Generator[FileInfo, None, None]:
+        raise NotImplementedError
+
     def stat(self) -> Dict[Text, Union[int, float]]:
         raise NotImplementedError
 
@@ -83,6 +440,14 @@ class Path:
     def read_text(self, encoding=None, errors=None) -> Text:
         raise NotImplementedError
 
+    def read_into(self, buffer, offset: int = 0) -> int:
+        with self.open(mode="rb") as f:
+            f.seek(offset)
+            return readinto_full(f, memoryview(buffer).cast("B"))
+
+    def read_memoryview(self) -> memoryview:
+        return memoryview(self.read_bytes())
+
     def write_bytes(self, data) -> int:
         raise NotImplementedError
 
@@ -101,12 +466,110 @@ class Path:
     def rmdir(self) -> None:
         raise NotImplementedError
 
+    def rmtree(self, missing_ok=False) -> None:
+        raise NotImplementedError
+
     def rename(self, target) -> "Path":
         raise NotImplementedError
 
     def replace(self, target) -> "Path":
         raise NotImplementedError
 
+    def copy(self, target) -> "Path":
+        raise NotImplementedError
+
+    def copytree(
+        self,
+        target: Union[Text, "Path"],
+        *,
+        max_workers: int = 16,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        progress: Optional[Callable[[Any], Any]] = None,
+    ) -> int:
+        from cloudfs.transfer import copytree
+
+        return copytree(
+            self,
+            target,
+            max_workers=max_workers,
+            chunk_size=chunk_size,
+            progress=progress,
+        )
+
+    @staticmethod
+    def read_many(
+        paths: Iterable[Union[Text, "Path"]],
+        *,
+        max_workers: int = 32,
+        ordered: bool = True,
+        max_bytes: int = 256 * 1024 * 1024,
+    ) -> Generator[Any, None, None]:
+        from cloudfs.bulk import read_many
+
+        return read_many(
+            paths, max_workers=max_workers, ordered=ordered, max_bytes=max_bytes
+        )
+
+    @staticmethod
+    def write_many(
+        items: Iterable[Tuple[Union[Text, "Path"], bytes]],
+        *,
+        max_workers: int = 32,
+        max_bytes: int = 256 * 1024 * 1024,
+    ) -> List[Any]:
+        from cloudfs.bulk import write_many
+
+        return write_many(items, max_workers=max_workers, max_bytes=max_bytes)
+
+    @staticmethod
+    def process_map(
+        func: Callable[["Path"], Any],
+        paths: Iterable[Union[Text, "Path"]],
+        *,
+        max_workers: Optional[int] = None,
+        chunksize: int = 1,
+    ) -> Generator[Any, None, None]:
+        from cloudfs.bulk import process_map
+
+        return process_map(func, paths, max_workers=max_workers, chunksize=chunksize)
+
+    @staticmethod
+    def stat_many(
+        paths: Iterable[Union[Text, "Path"]], *, max_workers: int = 32
+    ) -> List[Optional[Dict[Text, Union[int, float]]]]:
+        from cloudfs.bulk import stat_many
+
+        return stat_many(paths, max_workers=max_workers)
+
+    @staticmethod
+    def exists_many(
+        paths: Iterable[Union[Text, "Path"]], *, max_workers: int = 32
+    ) -> List[bool]:
+        from cloudfs.bulk import exists_many
+
+        return exists_many(paths, max_workers=max_workers)
+
+    @classmethod
+    def _stat_many(
+        cls, paths: List["Path"], *, max_workers: int
+    ) -> List[Optional[Dict[Text, Union[int, float]]]]:
+        def stat(path: "Path") -> Optional[Dict[Text, Union[int, float]]]:
+            try:
+                return path.stat()
+            except (FileNotFoundError, NotADirectoryError):
+                return None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(wrap_context(stat), paths))
+
+    @classmethod
+    def _exists_many(cls, paths: List["Path"], *, max_workers: int) -> List[bool]:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(wrap_context(cls.exists), paths))
+
+    def _reserve_connections(self, count: int) -> None:
+        pass
+
     def exists(self) -> bool:
         raise NotImplementedError
 
@@ -116,34 +579,67 @@ class Path:
     def is_file(self) -> bool:
         raise NotImplementedError
 
+    def _same_content(self, other_path: "Path", algo: Text = "md5") -> bool:
+        # Both sides are usually remote, so fetch them concurrently
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            other = executor.submit(wrap_context(other_path.checksum), algo)
+            return self.checksum(algo) == other.result()
+
+    def _cache_key(self) -> Optional[Text]:
+        return None
+
+    def _instrument_transport(self) -> None:
+        pass
+
 
 class LocalPath(Path):
-    def __init__(self, path: Union[Text, URL], **kwargs):
+    __slots__ = ("_entry",)
+
+    def __init__(self, path: Union[Text, "URL"], **kwargs):
         super().__init__(path, **kwargs)
+        self._entry: Optional[os.DirEntry] = None
 
     def __eq__(self, other_path: "LocalPath") -> bool:
         if not isinstance(other_path, LocalPath):
             return False
-        return self._url == other_path._url
+        return (self._host, self._urlpath) == (other_path._host, other_path._urlpath)
 
     def __truediv__(self, name: Text) -> "LocalPath":
         if not isinstance(name, Text):
             raise ValueError(f"Expected str, got {type(name)}")
-        return LocalPath(self._url / name)
+        return LocalPath(self._join(name))
 
     @property
     def _path(self) -> _Path:
-        return _Path((self._url.host or "") + (self._url.path or ""))
+        return _Path(self._host + self._urlpath)
 
+    @instrument("ping")
     def ping(self) -> bool:
         return True
 
-    def samefile(self, other_path: "LocalPath") -> bool:
-        if not isinstance(other_path, LocalPath):
-            return False
-        other_ = _Path((other_path._url.host or "") + (other_path._url.path or ""))
-        return self._path.samefile(other_)
+    @instrument("samefile")
+    def samefile(self, other_path: Union[Text, Path]) -> bool:
+        if isinstance(other_path, Text):
+            other_path = as_path(other_path)
+        if isinstance(other_path, LocalPath):
+            return self._path.samefile(other_path._path)
+        if isinstance(other_path, Path):
+            return self._same_content(other_path)
+        return False
 
+    @instrument("checksum")
+    def checksum(self, algo: Text = "md5") -> Text:
+        if algo not in CHECKSUM_ALGORITHMS:
+            raise ValueError(f"Invalid checksum: {algo}")
+        with open(self._path, "rb", buffering=0) as f:
+            key = checksum_key(os.fstat(f.fileno()), algo)
+            value = checksum_cache.get(key)
+            if value is None:
+                value = file_checksum(f, algo)
+                checksum_cache.set(key, value)
+        return value
+
+    @instrument("glob")
     def glob(
         self,
         pattern: Text,
@@ -152,15 +648,59 @@ class LocalPath(Path):
         return_dir: bool = True,
         **kwargs,
     ) -> Generator["LocalPath", None, None]:
-        for i in self._path.glob(pattern):
-            if not return_file and i.is_file():
-                continue
-            if not return_dir and i.is_dir():
-                continue
-            yield LocalPath(i.as_uri())
+        paths: Set[_Path] = set()
 
+        for alternative in GlobPattern(pattern).alternatives:
+            for i in self._path.glob(alternative):
+                if i in paths:
+                    continue
+                paths.add(i)
+                if not return_file and i.is_file():
+                    continue
+                if not return_dir and i.is_dir():
+                    continue
+                yield LocalPath(local_uri(str(i)))
+
+    @instrument("iterdir")
+    def iterdir(self) -> Generator["LocalPath", None, None]:
+        with os.scandir(self._path) as entries:
+            for entry in entries:
+                path = LocalPath(local_uri(entry.path))
+                path._entry = entry
+                yield path
+
+    @instrument("walk")
+    def walk(
+        self, top_down: bool = True
+    ) -> Generator[Tuple["LocalPath", List[Text], List[Text]], None, None]:
+        for dirpath, dirnames, filenames in os.walk(self._path, topdown=top_down):
+            yield LocalPath(local_uri(dirpath)), dirnames, filenames
+
+    @instrument("list_files")
+    def list_files(self) -> Generator[FileInfo, None, None]:
+        root = str(self._path)
+        for dirpath, _, filenames in os.walk(root):
+            relative = os.path.relpath(dirpath, root).replace(os.sep, "/")
+            for filename in filenames:
+                try:
+                    stat_info = os.stat(os.path.join(dirpath, filename))
+                except FileNotFoundError:
+                    continue
+                name = filename if relative == "." else f"{relative}/{filename}"
+                yield FileInfo(
+                    name,
+                    stat_info.st_size,
+                    stat_info.st_mtime,
+                    f"{stat_info.st_ino}:{stat_info.st_mtime_ns}",
+                    None,
+                )
+
+    @instrument("stat")
     def stat(self) -> Dict[Text, Union[int, float]]:
-        stat_info = self._path.stat()
+        if self._entry is not None:
+            stat_info = self._entry.stat()
+        else:
+            stat_info = self._path.stat()
         stat_dict = {
             "st_mode": stat_info.st_mode,
             "st_ino": stat_info.st_ino,
@@ -175,56 +715,383 @@ class LocalPath(Path):
         }
         return stat_dict
 
+    @instrument("owner")
     def owner(self) -> Text:
         return self._path.owner()
 
+    @instrument("group")
     def group(self) -> Text:
         return self._path.group()
 
+    @instrument("open")
     def open(self, **kwargs) -> io.IOBase:
         return self._path.open(**kwargs)
 
+    @instrument("read_bytes", io="read")
     def read_bytes(self) -> bytes:
         return self._path.read_bytes()
 
+    @instrument("read_text", io="read")
     def read_text(self, encoding=None, errors=None) -> Text:
         return self._path.read_text(encoding=encoding, errors=errors)
 
+    @instrument("read_into", io="read")
+    def read_into(self, buffer, offset: int = 0) -> int:
+        with open(self._path, "rb", buffering=0) as f:
+            f.seek(offset)
+            return readinto_full(f, memoryview(buffer).cast("B"))
+
+    @instrument("read_memoryview", io="read")
+    def read_memoryview(self) -> memoryview:
+        with open(self._path, "rb", buffering=0) as f:
+            buffer = bytearray(os.fstat(f.fileno()).st_size)
+            size = readinto_full(f, memoryview(buffer))
+        return memoryview(buffer)[:size]
+
+    @contextlib.contextmanager
+    def open_mmap(self) -> Generator[Union[mmap.mmap, bytes], None, None]:
+        with open(self._path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield b""
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+
+    @instrument("write_bytes", io="write")
     def write_bytes(self, data: bytes) -> int:
+        self._entry = None
         return self._path.write_bytes(data)
 
+    @instrument("write_text", io="write")
     def write_text(self, data, encoding=None, errors=None) -> int:
+        self._entry = None
         return self._path.write_text(data, encoding=encoding, errors=errors)
 
+    @instrument("touch")
     def touch(self, mode=438, exist_ok=True) -> None:
+        self._entry = None
         self._path.touch(mode=mode, exist_ok=exist_ok)
 
+    @instrument("mkdir")
     def mkdir(self, mode=511, parents=False, exist_ok=False):
+        self._entry = None
         self._path.mkdir(mode=mode, parents=parents, exist_ok=exist_ok)
 
+    @instrument("unlink")
     def unlink(self, missing_ok=False) -> None:
+        self._entry = None
         self._path.unlink(missing_ok=missing_ok)
 
+    @instrument("rmdir")
     def rmdir(self) -> None:
+        self._entry = None
         self._path.rmdir()
 
+    @instrument("rmtree")
+    def rmtree(self, missing_ok=False) -> None:
+        self._entry = None
+        try:
+            shutil.rmtree(self._path)
+        except FileNotFoundError:
+            if not missing_ok:
+                raise
+
+    @instrument("rename")
     def rename(self, target: Union[Text, Path]) -> "LocalPath":
+        self._entry = None
         if not isinstance(target, LocalPath):
             target = LocalPath(target)
         target_path = self._path.rename(target._path)
         return LocalPath(target_path.as_uri())
 
+    @instrument("replace")
     def replace(self, target: Union[Text, Path]) -> "LocalPath":
+        self._entry = None
         if not isinstance(target, LocalPath):
             target = LocalPath(target)
         target_path = self._path.replace(target._path)
         return LocalPath(target_path.as_uri())
 
+    @instrument("copy")
+    def copy(
+        self,
+        target: Union[Text, Path],
+        *,
+        max_workers: int = 16,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        progress: Optional[Callable[[Any], Any]] = None,
+    ) -> Path:
+        from cloudfs.transfer import copy_path
+
+        self._entry = None
+        return copy_path(
+            self,
+            target,
+            max_workers=max_workers,
+            chunk_size=chunk_size,
+            progress=progress,
+        )
+
+    @instrument("exists")
     def exists(self) -> bool:
         return self._path.exists()
 
+    @classmethod
+    def _exists_many(cls, paths: List["Path"], *, max_workers: int) -> List[bool]:
+        groups: Dict[_Path, List[int]] = {}
+        for index, path in enumerate(paths):
+            groups.setdefault(path._path.parent, []).append(index)
+        results = [False] * len(paths)
+
+        def check(item: Tuple[_Path, List[int]]) -> None:
+            parent, indices = item
+            if len(indices) < SCANDIR_THRESHOLD:
+                for index in indices:
+                    results[index] = paths[index]._path.exists()
+                return
+            # One directory read answers every sibling at once
+            try:
+                with os.scandir(parent) as entries:
+                    found = {entry.name: entry for entry in entries}
+            except (FileNotFoundError, NotADirectoryError):
+                return
+            for index in indices:
+                name = paths[index]._path.name
+                entry = found.get(name)
+                if not name or (entry is not None and entry.is_symlink()):
+                    results[index] = paths[index]._path.exists()
+                else:
+                    results[index] = entry is not None
+
+        run_bounded(check, groups.items(), max_workers=max_workers)
+        return results
+
+    @instrument("is_dir")
     def is_dir(self) -> bool:
+        if self._entry is not None:
+            return self._entry.is_dir()
         return self._path.is_dir()
 
+    @instrument("is_file")
     def is_file(self) -> bool:
+        if self._entry is not None:
+            return self._entry.is_file()
         return self._path.is_file()
+
+
+class ObjectStorePath(Path):
+    __slots__ = ()
+
+    delete_batch_size = 1000
+
+    @property
+    def _object_name(self) -> Text:
+        return self._urlpath.lstrip("/")
+
+    @instrument("glob")
+    def glob(
+        self,
+        pattern: Text,
+        *,
+        return_file: bool = True,
+        return_dir: bool = True,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        **kwargs,
+    ) -> Generator["ObjectStorePath", None, None]:
+        pattern = pattern.strip()
+        prefix = self._dir_prefix()
+        bucket_url = f"{self._scheme}://{self._host}"
+        if pattern.startswith(bucket_url):
+            pattern = pattern[len(bucket_url) :]
+        if pattern.startswith("/"):
+            prefix = ""
+            pattern = pattern.lstrip("/")
+
+        paths: Set[Text] = set()
+
+        for alternative in GlobPattern(pattern).alternatives:
+            for name, entry in iter_glob(
+                prefix,
+                alternative.split("/"),
+                list_entries=functools.partial(self._list_entries, page_size=page_size),
+                lookup=self._lookup_entry,
+                hidden_names=set(self._hidden_names()),
+            ):
+                if name in paths:
+                    continue
+                paths.add(name)
+                if name.endswith("/"):
+                    if not return_dir:
+                        continue
+                elif not return_file:
+                    continue
+                yield self._new_path(self._with_path("/" + name), entry)
+
+    @instrument("iterdir")
+    def iterdir(
+        self, *, page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Generator["ObjectStorePath", None, None]:
+        for name, entry in self._list_dir(page_size=page_size):
+            yield self._new_path(self._with_path("/" + name), entry)
+
+    @instrument("walk")
+    def walk(
+        self, top_down: bool = True, *, page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Generator[Tuple["ObjectStorePath", List[Text], List[Text]], None, None]:
+        prefix = self._dir_prefix()
+        dirnames: List[Text] = []
+        filenames: List[Text] = []
+        for name, _ in self._list_dir(page_size=page_size):
+            if name.endswith("/"):
+                dirnames.append(name[len(prefix) : -1])
+            else:
+                filenames.append(name[len(prefix) :])
+
+        if top_down:
+            yield self, dirnames, filenames
+        for dirname in dirnames:
+            path = self._new_path(self._with_path("/" + prefix + dirname + "/"))
+            yield from path.walk(top_down=top_down, page_size=page_size)
+        if not top_down:
+            yield self, dirnames, filenames
+
+    @instrument("rmtree")
+    def rmtree(self, missing_ok: bool = False, *, max_workers: int = 4) -> None:
+        def batches() -> Generator[List[Text], None, None]:
+            names: List[Text] = []
+            for name in self._list_names(self._dir_prefix()):
+                names.append(name)
+                if len(names) >= self.delete_batch_size:
+                    yield names
+                    names = []
+            if names:
+                yield names
+
+        found = run_bounded(self._delete_batch, batches(), max_workers=max_workers)
+        if not found and not missing_ok:
+            raise FileNotFoundError(f"No such file or directory: {self}")
+
+    @instrument("rename")
+    def rename(
+        self,
+        target: Union[Text, "ObjectStorePath"],
+        *,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> "ObjectStorePath":
+        return self._copy(target, delete_source=True, max_workers=max_workers)
+
+    @instrument("replace")
+    def replace(
+        self,
+        target: Union[Text, "ObjectStorePath"],
+        *,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> "ObjectStorePath":
+        return self._copy(target, delete_source=True, max_workers=max_workers)
+
+    @instrument("copy")
+    def copy(
+        self,
+        target: Union[Text, Path],
+        *,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> Path:
+        if isinstance(target, Text) and not target.startswith(f"{self._scheme}://"):
+            target = as_path(target)
+        if isinstance(target, Path) and not isinstance(target, type(self)):
+            from cloudfs.transfer import copy_path
+
+            return copy_path(self, target, max_workers=max_workers)
+        return self._copy(target, delete_source=False, max_workers=max_workers)
+
+    def _new_path(
+        self, path: Union[Text, "URL"], entry: Any = None
+    ) -> "ObjectStorePath":
+        raise NotImplementedError
+
+    def _hidden_names(self) -> Tuple[Text, ...]:
+        return (self.empty_filename,)
+
+    def _dir_prefix(self) -> Text:
+        prefix = self._object_name.rstrip("/")
+        return prefix + "/" if prefix else ""
+
+    def _has_prefix(self) -> bool:
+        return self.is_dir()
+
+    def _invalidate_metadata(self) -> None:
+        raise NotImplementedError
+
+    def _list_entries(
+        self, prefix: Text, delimiter: bool, *, page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Generator[Tuple[Text, Any], None, None]:
+        raise NotImplementedError
+
+    def _lookup_entry(self, name: Text) -> Optional[Tuple[Text, Any]]:
+        raise NotImplementedError
+
+    def _list_names(self, prefix: Text) -> Generator[Text, None, None]:
+        for name, _ in self._list_entries(prefix, False):
+            yield name
+
+    def _list_dir(self, *, page_size: int) -> Generator[Tuple[Text, Any], None, None]:
+        prefix = self._dir_prefix()
+        hidden = ("",) + self._hidden_names()
+        for name, entry in self._list_entries(prefix, True, page_size=page_size):
+            if entry is not None and name[len(prefix) :] in hidden:
+                continue
+            yield name, entry
+
+    def _delete_batch(self, names: List[Text]) -> None:
+        raise NotImplementedError
+
+    def _copy(
+        self,
+        target: Union[Text, "URL", "ObjectStorePath"],
+        *,
+        delete_source: bool,
+        max_workers: int,
+    ) -> "ObjectStorePath":
+        if not isinstance(target, Path):
+            target = self._new_path(target)
+        if not isinstance(target, type(self)):
+            raise ValueError(f"Expected {type(self).__name__}, got {type(target)}")
+
+        if not self._urlpath.endswith("/"):
+            try:
+                self._copy_object(
+                    self._object_name, target, delete_source=delete_source
+                )
+                if delete_source:
+                    self._invalidate_metadata()
+                return target
+            except FileNotFoundError:
+                if not self._has_prefix():
+                    raise
+        elif not self._has_prefix():
+            raise FileNotFoundError(f"No such file or directory: {self}")
+
+        target_dir = target
+        if not target._urlpath.endswith("/"):
+            target_dir = target._new_path(target._with_path(target._urlpath + "/"))
+
+        prefix = self._dir_prefix()
+        target_prefix = target_dir._dir_prefix()
+        if target_dir._host == self._host and (
+            target_prefix.startswith(prefix) or prefix.startswith(target_prefix)
+        ):
+            raise ValueError(f"Cannot copy {self} into itself: {target_dir}")
+
+        def copy(name: Text) -> None:
+            target_path = target_dir._new_path(
+                target_dir._with_path("/" + target_prefix + name[len(prefix) :])
+            )
+            self._copy_object(name, target_path, delete_source=delete_source)
+
+        run_bounded(copy, self._list_names(prefix), max_workers=max_workers)
+        return target_dir
+
+    def _copy_object(
+        self, name: Text, target: "ObjectStorePath", *, delete_source: bool
+    ) -> None:
+        raise NotImplementedError
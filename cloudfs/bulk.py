@@ -0,0 +1,185 @@
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Text,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from cloudfs.base import Path, as_path
+from cloudfs.metrics import wrap_context
+
+T = TypeVar("T")
+
+DEFAULT_MAX_WORKERS = 32
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class ReadResult(NamedTuple):
+    path: Path
+    data: Optional[bytes]
+    error: Optional[Exception]
+
+
+class WriteResult(NamedTuple):
+    path: Path
+    size: int
+    error: Optional[Exception]
+
+
+def read_many(
+    paths: Iterable[Union[Text, Path]],
+    *,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    ordered: bool = True,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> Generator[ReadResult, None, None]:
+    items = iter(paths)
+    exhausted = False
+    pending: Dict[Future, Tuple[int, Path]] = {}
+    ready: Dict[int, ReadResult] = {}
+    buffered = 0
+    submitted = 0
+    next_index = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            while True:
+                # Results waiting to be consumed count against the byte budget
+                while (
+                    not exhausted
+                    and len(pending) + len(ready) < max_workers * 2
+                    and buffered < max_bytes
+                ):
+                    try:
+                        path = as_path(next(items))
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    path._reserve_connections(max_workers)
+                    future = executor.submit(wrap_context(path.read_bytes))
+                    pending[future] = (submitted, path)
+                    submitted += 1
+
+                if ordered:
+                    while next_index in ready:
+                        result = ready.pop(next_index)
+                        buffered -= len(result.data or b"")
+                        next_index += 1
+                        yield result
+                else:
+                    for index in list(ready):
+                        result = ready.pop(index)
+                        buffered -= len(result.data or b"")
+                        yield result
+
+                if not pending:
+                    if exhausted and not ready:
+                        return
+                    continue
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, path = pending.pop(future)
+                    try:
+                        result = ReadResult(path, future.result(), None)
+                    except Exception as e:
+                        result = ReadResult(path, None, e)
+                    ready[index] = result
+                    buffered += len(result.data or b"")
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _dispatch(
+    paths: Iterable[Union[Text, Path]], method: Text, max_workers: int
+) -> List[Any]:
+    paths = [as_path(path) for path in paths]
+    groups: Dict[Type[Path], List[int]] = {}
+    for index, path in enumerate(paths):
+        groups.setdefault(type(path), []).append(index)
+    results: List[Any] = [None] * len(paths)
+    for cls, indices in groups.items():
+        values = getattr(cls, method)(
+            [paths[index] for index in indices], max_workers=max_workers
+        )
+        for index, value in zip(indices, values):
+            results[index] = value
+    return results
+
+
+def stat_many(
+    paths: Iterable[Union[Text, Path]], *, max_workers: int = DEFAULT_MAX_WORKERS
+) -> List[Optional[Dict[Text, Union[int, float]]]]:
+    return _dispatch(paths, "_stat_many", max_workers)
+
+
+def exists_many(
+    paths: Iterable[Union[Text, Path]], *, max_workers: int = DEFAULT_MAX_WORKERS
+) -> List[bool]:
+    return _dispatch(paths, "_exists_many", max_workers)
+
+
+def write_many(
+    items: Iterable[Tuple[Union[Text, Path], bytes]],
+    *,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> List[WriteResult]:
+    pending: Dict[Future, Tuple[int, Path, int]] = {}
+    results: Dict[int, WriteResult] = {}
+    in_flight = 0
+
+    def collect(futures: Iterable[Future]) -> None:
+        nonlocal in_flight
+        for future in futures:
+            index, path, size = pending.pop(future)
+            in_flight -= size
+            try:
+                future.result()
+                results[index] = WriteResult(path, size, None)
+            except Exception as e:
+                results[index] = WriteResult(path, size, e)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        count = 0
+        for count, (path, data) in enumerate(items, 1):
+            path = as_path(path)
+            path._reserve_connections(max_workers)
+            while pending and (
+                len(pending) >= max_workers * 2 or in_flight + len(data) > max_bytes
+            ):
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            future = executor.submit(wrap_context(path.write_bytes), data)
+            pending[future] = (count - 1, path, len(data))
+            in_flight += len(data)
+        collect(list(pending))
+    return [results[index] for index in range(count)]
+
+
+def process_map(
+    func: Callable[[Path], T],
+    paths: Iterable[Union[Text, Path]],
+    *,
+    max_workers: Optional[int] = None,
+    chunksize: int = 1,
+) -> Generator[T, None, None]:
+    # Paths pickle to a URL and a client reference, workers attach their own
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        yield from executor.map(func, map(as_path, paths), chunksize=chunksize)
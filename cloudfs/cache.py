@@ -0,0 +1,230 @@
+import contextlib
+import hashlib
+import io
+import mmap
+import os
+import tempfile
+import threading
+import warnings
+from typing import IO, TYPE_CHECKING, Dict, Generator, Optional, Text, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+if TYPE_CHECKING:
+    from cloudfs.base import Path
+
+DEFAULT_CACHE_CHUNK_SIZE = 8 * 1024 * 1024
+LOCK_STRIPES = 256
+
+
+@contextlib.contextmanager
+def file_lock(path: Text) -> Generator[None, None, None]:
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        elif msvcrt is not None:  # pragma: no cover
+            # Locks the first byte, LK_LOCK gives up after ten seconds
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:  # pragma: no cover
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class ReadCache:
+    def __init__(
+        self,
+        directory: Union[Text, os.PathLike],
+        max_size: int,
+        *,
+        key_by: Text = "version",
+        chunk_size: int = DEFAULT_CACHE_CHUNK_SIZE,
+    ):
+        if key_by not in ("version", "md5"):
+            raise ValueError(f"Invalid key_by: {key_by}, expected 'version' or 'md5'")
+        self.directory = os.path.abspath(os.fspath(directory))
+        self.max_size = max_size
+        self.key_by = key_by
+        self.chunk_size = chunk_size
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        for name in ("objects", "locks", "tmp"):
+            os.makedirs(os.path.join(self.directory, name), exist_ok=True)
+        if fcntl is None and msvcrt is None:
+            warnings.warn(
+                f"No file locking available, {self!r} is not safe to share "
+                "between processes"
+            )
+
+    def __repr__(self) -> Text:
+        return f"ReadCache({self.directory!r}, max_size={self.max_size})"
+
+    def open(self, path: "Path") -> IO[bytes]:
+        key = self._lookup_key(path)
+        if key is None:
+            return path.open("rb")
+        f = self._open_entry(key)
+        if f is not None:
+            self._count("hits")
+            return f
+        self._count("misses")
+        return self._fill(path, key)
+
+    def read_bytes(self, path: "Path") -> bytes:
+        with self.open(path) as f:
+            return f.read()
+
+    @contextlib.contextmanager
+    def open_mmap(self, path: "Path") -> Generator[Union[mmap.mmap, bytes], None, None]:
+        with self.open(path) as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield b""
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+
+    def stats(self) -> Dict[Text, int]:
+        count, size = 0, 0
+        for _, stat in self._scan():
+            count += 1
+            size += stat.st_size
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "count": count,
+            "size": size,
+        }
+
+    def clear(self) -> None:
+        with file_lock(self._global_lock_path()):
+            for filename, _ in self._scan():
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(filename)
+        with self._lock:
+            self.hits = self.misses = self.evictions = 0
+
+    def _lookup_key(self, path: "Path") -> Optional[Text]:
+        if self.key_by == "md5":
+            try:
+                return f"md5:{path.md5()}"
+            except ValueError:
+                pass
+        return path._cache_key()
+
+    def _open_entry(self, key: Text) -> Optional[IO[bytes]]:
+        filename = self._entry_path(key)
+        try:
+            f = open(filename, "rb")
+        except FileNotFoundError:
+            return None
+        # Bump the mtime so that eviction sees this entry as recently used
+        with contextlib.suppress(OSError):
+            os.utime(filename)
+        return f
+
+    def _fill(self, path: "Path", key: Text) -> IO[bytes]:
+        raw = path.open("rb", buffering=0, chunk_size=self.chunk_size)
+        try:
+            if raw.size > self.max_size:
+                return io.BufferedReader(raw)
+
+            if key.startswith("md5:"):
+                # The content decides the key, concurrent fills write the same bytes
+                filename, digest = self._download(raw)
+                f = self._commit(filename, f"md5:{digest}")
+            else:
+                # Key by the version the reader is pinned to, it may be newer
+                key = raw.cache_key or key
+                with file_lock(self._stripe_lock_path(key)):
+                    f = self._open_entry(key)
+                    if f is None:
+                        filename, _ = self._download(raw)
+                        f = self._commit(filename, key)
+        except BaseException:
+            raw.close()
+            raise
+        raw.close()
+        self._evict()
+        return f
+
+    def _download(self, raw: IO[bytes]) -> Tuple[Text, Text]:
+        md5 = hashlib.md5()
+        fd, filename = tempfile.mkstemp(dir=os.path.join(self.directory, "tmp"))
+        try:
+            with io.open(fd, "wb") as tmp:
+                while True:
+                    chunk = raw.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    md5.update(chunk)
+                    tmp.write(chunk)
+        except BaseException:
+            os.unlink(filename)
+            raise
+        return filename, md5.hexdigest()
+
+    def _commit(self, filename: Text, key: Text) -> IO[bytes]:
+        target = self._entry_path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(filename, target)
+        return open(target, "rb")
+
+    def _evict(self) -> None:
+        with file_lock(self._global_lock_path()):
+            entries = sorted(self._scan(), key=lambda entry: entry[1].st_mtime)
+            total = sum(stat.st_size for _, stat in entries)
+            for filename, stat in entries:
+                if total <= self.max_size:
+                    break
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(filename)
+                    self._count("evictions")
+                total -= stat.st_size
+
+    def _scan(self) -> Generator[Tuple[Text, os.stat_result], None, None]:
+        root = os.path.join(self.directory, "objects")
+        for shard in os.scandir(root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                try:
+                    yield entry.path, entry.stat()
+                except FileNotFoundError:
+                    continue
+
+    def _count(self, name: Text) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _entry_path(self, key: Text) -> Text:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.directory, "objects", digest[:2], digest)
+
+    def _stripe_lock_path(self, key: Text) -> Text:
+        stripe = int(hashlib.sha256(key.encode()).hexdigest(), 16) % LOCK_STRIPES
+        return os.path.join(self.directory, "locks", f"{stripe:03d}.lock")
+
+    def _global_lock_path(self) -> Text:
+        return os.path.join(self.directory, "locks", "cache.lock")
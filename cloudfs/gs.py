@@ -1,22 +1,73 @@
 import base64
-import fnmatch
+import contextlib
+import functools
+import hashlib
 import io
 import json
+import mmap
 import os
+import socket
+import threading
+import time
+import uuid
 import warnings
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path as _Path
-from typing import Dict, Generator, Optional, Set, Text, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Hashable,
+    List,
+    Optional,
+    Text,
+    Tuple,
+    Union,
+)
 
 from yarl import URL
 
-from cloudfs.base import Path
+from cloudfs.base import (
+    CHECKSUM_ALGORITHMS,
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_PAGE_SIZE,
+    EMPTY_FILENAME,
+    FileInfo,
+    LocalPath,
+    MemoryWriter,
+    ObjectStorePath,
+    Path,
+    RangeReader,
+    readinto_full,
+    remember_checksum,
+    run_bounded,
+)
+from cloudfs.cache import ReadCache
+from cloudfs.manifest import MANIFEST_FILENAME, Manifest, ManifestEntry
+from cloudfs.metrics import instrument, record_http_request
+from cloudfs.retry import RetryPolicy
 
 try:
-    from google.auth.credentials import Credentials
+    import google_crc32c
+    from google.api_core.exceptions import NotFound, PreconditionFailed
+    from google.auth.credentials import AnonymousCredentials, Credentials
+    from google.cloud.storage._http import Connection
     from google.cloud.storage.blob import Blob
     from google.cloud.storage.bucket import Bucket
     from google.cloud.storage.client import Client
+    from google.cloud.storage.fileio import BlobWriter
+    from google.cloud.storage.retry import (
+        DEFAULT_RETRY,
+        ConditionalRetryPolicy,
+        is_generation_specified,
+    )
     from google.oauth2 import service_account
+    from requests.adapters import HTTPAdapter
+    from urllib3.connection import HTTPConnection
 
     service_account
 except ImportError:
@@ -26,10 +77,481 @@ except ImportError:
     )
     storage = None
 
-EMPTY_FILENAME = "__empty__"
+DEFAULT_SLICE_SIZE = 32 * 1024 * 1024
+DEFAULT_SLICED_THRESHOLD = 64 * 1024 * 1024
+CHECKSUM_CHUNK_SIZE = 8 * 1024 * 1024
+DEFAULT_COMPOSITE_PART_SIZE = 32 * 1024 * 1024
+DEFAULT_COMPOSITE_THRESHOLD = 128 * 1024 * 1024
+MAX_COMPOSE_SOURCES = 32
+COMPOSITE_TMP_PREFIX = ".cloudfs-tmp/"
+COMPOSITE_MD5_METADATA = "cloudfs-md5"
+MAX_BATCH_SIZE = 100
+LISTING_FIELDS = (
+    "items(name,size,updated,timeCreated,generation,md5Hash,crc32c),"
+    "prefixes,nextPageToken"
+)
+
+
+def _rfc3339(timestamp: float) -> Text:
+    updated = datetime.fromtimestamp(timestamp, timezone.utc)
+    return updated.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def verify_checksum(blob: "Blob", view: memoryview, checksum: Text) -> None:
+    if checksum == "crc32c" and not blob.crc32c:
+        checksum = "md5"
+    if checksum == "md5" and not blob.md5_hash:
+        checksum = "crc32c" if blob.crc32c else None
+
+    if checksum == "crc32c":
+        hasher = google_crc32c.Checksum()
+        for i in range(0, len(view), CHECKSUM_CHUNK_SIZE):
+            hasher.update(bytes(view[i : i + CHECKSUM_CHUNK_SIZE]))
+        expected = blob.crc32c
+    elif checksum == "md5":
+        hasher = hashlib.md5(view)
+        expected = blob.md5_hash
+    else:
+        return
+    actual = base64.b64encode(hasher.digest()).decode()
+    if actual != expected:
+        raise OSError(
+            f"Checksum mismatch for gs://{blob.bucket.name}/{blob.name}: "
+            f"{checksum} expected {expected}, got {actual}"
+        )
+
+
+def blob_checksum(blob: "Blob", algo: Text) -> Text:
+    if algo == "crc32c" and blob.crc32c:
+        return base64.b64decode(blob.crc32c).hex()
+    if algo == "md5" and blob.md5_hash:
+        return base64.b64decode(blob.md5_hash).hex()
+    # Composed objects only carry crc32c, upload_from() records the md5
+    if algo == "md5" and blob.metadata and COMPOSITE_MD5_METADATA in blob.metadata:
+        return blob.metadata[COMPOSITE_MD5_METADATA]
+    raise ValueError(f"{algo} is not available for gs://{blob.bucket.name}/{blob.name}")
+
+
+def blob_stat(blob: "Blob") -> Dict[Text, Union[int, float]]:
+    return {
+        "size": blob.size,
+        "mtime": blob.updated.timestamp(),
+        "ctime": blob.time_created.timestamp(),
+    }
+
+
+def remember_blob_checksums(filename: Union[Text, os.PathLike], blob: "Blob") -> None:
+    # The local copy was verified against the object, so its hashes are known
+    for algo in CHECKSUM_ALGORITHMS:
+        with contextlib.suppress(ValueError):
+            remember_checksum(filename, algo, blob_checksum(blob, algo))
+
+
+def md5_hexdigest(view: memoryview) -> Text:
+    md5 = hashlib.md5()
+    for i in range(0, len(view), CHECKSUM_CHUNK_SIZE):
+        md5.update(view[i : i + CHECKSUM_CHUNK_SIZE])
+    return md5.hexdigest()
+
+
+@functools.lru_cache(maxsize=64)
+def google_retry(policy: RetryPolicy, conditional: bool = False) -> Any:
+    retry = DEFAULT_RETRY.with_delay(
+        initial=policy.initial_backoff,
+        maximum=policy.max_backoff,
+        multiplier=policy.multiplier,
+    ).with_timeout(policy.deadline)
+    if conditional:
+        # Mutations are only retried when a precondition makes them idempotent
+        return ConditionalRetryPolicy(retry, is_generation_specified, ["query_params"])
+    return retry
+
+
+def retry_options(
+    policy: Optional[RetryPolicy], conditional: bool = False
+) -> Dict[Text, Any]:
+    if policy is None:
+        return {}
+    return {"retry": google_retry(policy, conditional), "timeout": policy.timeout}
+
+
+class GSRawReader(RangeReader):
+    def __init__(
+        self,
+        blob: "Blob",
+        client: "Client",
+        *,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        read_ahead: bool = True,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
+        try:
+            blob.reload(client=client, **retry_options(retry_policy))
+        except NotFound:
+            raise FileNotFoundError(f"No such file or directory: {blob.name}")
+        super().__init__(blob.size or 0, chunk_size=chunk_size, read_ahead=read_ahead)
+
+        self._blob = blob
+        self._client = client
+        self._generation: Optional[int] = blob.generation
+        self._retry_policy = retry_policy
+
+    @property
+    def name(self) -> Text:
+        return f"gs://{self._blob.bucket.name}/{self._blob.name}"
+
+    @property
+    def cache_key(self) -> Text:
+        return f"{self.name}#{self._generation}"
+
+    def _read_range(self, start: int, end: int) -> bytes:
+        def download() -> bytes:
+            return self._blob.download_as_bytes(
+                client=self._client,
+                start=start,
+                end=end,
+                checksum=None,
+                if_generation_match=self._generation,
+                **retry_options(self._retry_policy),
+            )
+
+        if self._retry_policy is None:
+            return download()
+        return self._retry_policy.hedge(download)
+
+
+class GSPoolAdapter(HTTPAdapter):
+    def __init__(self, *, keep_alive: Optional[int] = None, **kwargs):
+        self._keep_alive = keep_alive
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self._keep_alive:
+            socket_options: List[Tuple[int, int, int]] = list(
+                HTTPConnection.default_socket_options
+            )
+            socket_options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+            for option_name, value in (
+                ("TCP_KEEPIDLE", self._keep_alive),
+                ("TCP_KEEPINTVL", max(1, self._keep_alive // 4)),
+                ("TCP_KEEPCNT", 4),
+            ):
+                if hasattr(socket, option_name):
+                    socket_options.append(
+                        (socket.IPPROTO_TCP, getattr(socket, option_name), value)
+                    )
+            kwargs["socket_options"] = socket_options
+        super().init_poolmanager(*args, **kwargs)
+
+
+class ClientRegistry:
+    def __init__(
+        self,
+        *,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        keep_alive: Optional[int] = None,
+    ):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+
+        self._clients: Dict[Hashable, "Client"] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def configure(
+        self,
+        *,
+        pool_connections: Optional[int] = None,
+        pool_maxsize: Optional[int] = None,
+        keep_alive: Optional[int] = None,
+    ) -> None:
+        with self._lock:
+            if pool_connections is not None:
+                self.pool_connections = pool_connections
+            if pool_maxsize is not None:
+                self.pool_maxsize = pool_maxsize
+            if keep_alive is not None:
+                self.keep_alive = keep_alive
+            self._clients.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clients.clear()
+
+    def reset(self) -> None:
+        # Clients inherited through fork share their sockets with the parent
+        self._lock = threading.Lock()
+        self._clients = {}
+
+    def get_client(
+        self,
+        credentials: Optional[Union["Credentials", Text, Dict]] = None,
+        credentials_path: Optional[Union[Text, _Path]] = None,
+        project: Optional[Text] = None,
+        *,
+        api_endpoint: Optional[Text] = None,
+        anonymous: bool = False,
+    ) -> "Client":
+        key = (
+            project,
+            api_endpoint,
+            anonymous,
+            self._credentials_key(credentials, credentials_path),
+        )
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._create_client(
+                    credentials=(
+                        AnonymousCredentials()
+                        if anonymous
+                        else load_credentials(credentials, credentials_path)
+                    ),
+                    project=project,
+                    api_endpoint=api_endpoint,
+                )
+                spec = dict(
+                    credentials=credentials,
+                    credentials_path=credentials_path,
+                    project=project,
+                    api_endpoint=api_endpoint,
+                    anonymous=anonymous,
+                )
+                client.__dict__["_cloudfs_spec"] = {
+                    name: value for name, value in spec.items() if value
+                }
+                self._clients[key] = client
+        return client
+
+    def _create_client(
+        self,
+        credentials: Optional["Credentials"],
+        project: Optional[Text],
+        api_endpoint: Optional[Text] = None,
+    ) -> "Client":
+        options: Dict[Text, Any] = {"credentials": credentials}
+        if project:
+            options["project"] = project
+        elif isinstance(credentials, AnonymousCredentials):
+            # Same placeholder as Client.create_anonymous_client()
+            options["project"] = "<none>"
+        if api_endpoint:
+            options["client_options"] = {"api_endpoint": api_endpoint}
+        client = Client(**options)
+        if client.project == "<none>":
+            client.project = None
+
+        adapter = GSPoolAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            keep_alive=self.keep_alive,
+        )
+        client._http.mount("https://", adapter)
+        client._http.mount("http://", adapter)
+        return client
+
+    @staticmethod
+    def _credentials_key(
+        credentials: Optional[Union["Credentials", Text, Dict]] = None,
+        credentials_path: Optional[Union[Text, _Path]] = None,
+    ) -> Tuple[Text, Any]:
+        if isinstance(credentials, Text):
+            return ("info", hashlib.sha256(credentials.encode()).hexdigest())
+        elif isinstance(credentials, Dict):
+            info = json.dumps(credentials, sort_keys=True)
+            return ("info", hashlib.sha256(info.encode()).hexdigest())
+        elif credentials:
+            return ("object", id(credentials))
+        elif credentials_path:
+            return ("file", os.path.abspath(credentials_path))
+        elif "GOOGLE_APPLICATION_CREDENTIALS" in os.environ:
+            env_credentials = os.environ["GOOGLE_APPLICATION_CREDENTIALS"]
+            if env_credentials.endswith(".json"):
+                return ("file", os.path.abspath(env_credentials))
+            return ("info", hashlib.sha256(env_credentials.encode()).hexdigest())
+        return ("default", None)
+
+
+client_registry = ClientRegistry()
+bucket_lock = threading.Lock()
 
 
-class GSPath(Path):
+def client_spec(client: "Client") -> Dict[Text, Any]:
+    spec = client.__dict__.get("_cloudfs_spec")
+    if spec is not None:
+        return spec
+    # Clients built by the caller carry no credentials reference, rebuilding one
+    # from the default credentials could switch identity or project
+    if not isinstance(client._credentials, AnonymousCredentials):
+        raise TypeError(
+            "Can't pickle a GSPath on a caller's storage_client, "
+            "pass credentials or credentials_path instead"
+        )
+    spec = {"project": client.project} if client.project else {}
+    spec["anonymous"] = True
+    if client._connection.API_BASE_URL != Connection.DEFAULT_API_ENDPOINT:
+        spec["api_endpoint"] = client._connection.API_BASE_URL
+    return spec
+
+
+def restore_path(
+    path: Text, spec: Dict[Text, Any], options: Dict[Text, Any]
+) -> "GSPath":
+    return GSPath(path, storage_client=client_registry.get_client(**spec), **options)
+
+
+def reset_after_fork() -> None:
+    global bucket_lock
+    bucket_lock = threading.Lock()
+    client_registry.reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_after_fork)
+
+
+def get_bucket(client: "Client", bucket_name: Text) -> "Bucket":
+    # Handles live on the client so they are collected together with it
+    buckets: Optional[Dict[Text, "Bucket"]] = getattr(client, "_cloudfs_buckets", None)
+    if buckets is None:
+        with bucket_lock:
+            buckets = client.__dict__.setdefault("_cloudfs_buckets", {})
+    bucket = buckets.get(bucket_name)
+    if bucket is None:
+        bucket = buckets.setdefault(bucket_name, client.bucket(bucket_name))
+    return bucket
+
+
+def ensure_pool_size(client: "Client", size: int) -> None:
+    # Bulk workers beyond the pool size would open throwaway connections
+    session = client._http
+    for prefix in ("https://", "http://"):
+        adapter = session.get_adapter(prefix)
+        if getattr(adapter, "_pool_maxsize", size) >= size:
+            continue
+        with bucket_lock:
+            adapter = session.get_adapter(prefix)
+            if adapter._pool_maxsize < size:
+                session.mount(
+                    prefix,
+                    GSPoolAdapter(
+                        pool_connections=adapter._pool_connections,
+                        pool_maxsize=size,
+                        keep_alive=getattr(adapter, "_keep_alive", None),
+                    ),
+                )
+
+
+def batch_responses(batch: Any, count: int) -> List[Any]:
+    # Every queued request must be matched, a short list would hide failures
+    responses = batch._responses
+    assert len(responses) == count, f"Expected {count} responses, got {len(responses)}"
+    return responses
+
+
+class MetadataCache:
+    def __init__(self, maxsize: int = 10_000, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: "OrderedDict[Tuple[Text, Text], Tuple[float, Any]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: Tuple[Text, Text]) -> Tuple[bool, Optional["Blob"]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def set(self, key: Tuple[Text, Text], blob: Optional["Blob"]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, blob)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Tuple[Text, Text]) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[Text, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+
+def load_credentials(
+    credentials: Optional[Union["Credentials", Text, Dict]] = None,
+    credentials_path: Optional[Union[Text, _Path]] = None,
+) -> Optional["Credentials"]:
+    if isinstance(credentials, Text):
+        credentials = service_account.Credentials.from_service_account_info(
+            json.loads(credentials)
+        )
+    elif isinstance(credentials, Dict):
+        credentials = service_account.Credentials.from_service_account_info(credentials)
+    elif not credentials and credentials_path:
+        credentials = service_account.Credentials.from_service_account_file(
+            credentials_path
+        )
+    elif not credentials and "GOOGLE_APPLICATION_CREDENTIALS" in os.environ:
+        if os.environ["GOOGLE_APPLICATION_CREDENTIALS"].endswith(".json"):
+            credentials = service_account.Credentials.from_service_account_file(
+                os.environ["GOOGLE_APPLICATION_CREDENTIALS"]
+            )
+        else:
+            credentials = service_account.Credentials.from_service_account_info(
+                json.loads(os.environ["GOOGLE_APPLICATION_CREDENTIALS"])
+            )
+    return credentials
+
+
+class GSPath(ObjectStorePath):
+    __slots__ = (
+        "_storage_client",
+        "empty_filename",
+        "metadata_cache",
+        "read_cache",
+        "composite_threshold",
+        "manifest",
+        "retry_policy",
+        "_listed_blob",
+    )
+
+    delete_batch_size = MAX_BATCH_SIZE
+
     def __init__(
         self,
         path: Union[Text, URL],
@@ -38,14 +560,19 @@ class GSPath(Path):
         credentials: Optional[Union["Credentials", Text, Dict]] = None,
         credentials_path: Optional[Union[Text, _Path]] = None,
         empty_filename: Text = EMPTY_FILENAME,
+        metadata_cache: Optional[MetadataCache] = None,
+        read_cache: Optional[ReadCache] = None,
+        composite_threshold: Optional[int] = None,
+        manifest: Optional[Manifest] = None,
+        retry_policy: Optional[RetryPolicy] = None,
         **kwargs,
     ):
         super().__init__(path, **kwargs)
 
-        if self._url.scheme != "gs":
-            raise ValueError(f"Unsupported scheme: gs, got {self._url.scheme}")
+        if self._scheme != "gs":
+            raise ValueError(f"Unsupported scheme: gs, got {self._scheme}")
         if not self.bucket_name:
-            raise ValueError(f"Missing bucket name in {self._url}")
+            raise ValueError(f"Missing bucket name in {self}")
 
         self._storage_client = self._init_client(
             storage_client=storage_client,
@@ -55,6 +582,12 @@ class GSPath(Path):
         )
 
         self.empty_filename = empty_filename
+        self.metadata_cache = metadata_cache
+        self.read_cache = read_cache
+        self.composite_threshold = composite_threshold
+        self.manifest = manifest
+        self.retry_policy = retry_policy
+        self._listed_blob: Optional["Blob"] = None
 
     @property
     def client(self) -> "Client":
@@ -62,11 +595,11 @@ class GSPath(Path):
 
     @property
     def bucket(self) -> "Bucket":
-        return self._storage_client.bucket(self.bucket_name)
+        return get_bucket(self._storage_client, self.bucket_name)
 
     @property
     def bucket_name(self) -> Text:
-        return self._url.host
+        return self._host
 
     @property
     def blob(self) -> "Blob":
@@ -74,118 +607,312 @@ class GSPath(Path):
 
     @property
     def blob_name(self) -> Text:
-        return self._url.path.lstrip("/")
+        return self._urlpath.lstrip("/")
 
     def __eq__(self, other_path: "GSPath") -> bool:
         if not isinstance(other_path, GSPath):
             return False
-        return self._url == other_path._url
+        return (self._host, self._urlpath) == (other_path._host, other_path._urlpath)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # Caches and manifests are left behind, they belong to this process
+        options: Dict[Text, Any] = {}
+        if self.empty_filename != EMPTY_FILENAME:
+            options["empty_filename"] = self.empty_filename
+        if self.composite_threshold is not None:
+            options["composite_threshold"] = self.composite_threshold
+        if self.retry_policy is not None:
+            options["retry_policy"] = self.retry_policy
+        return (restore_path, (self._str, client_spec(self.client), options))
 
     def __truediv__(self, name: Text) -> "Path":
         if not isinstance(name, Text):
             raise ValueError(f"Expected str, got {type(name)}")
-        return GSPath(self._url / name, storage_client=self.client)
+        return self._new_path(self._join(name))
 
+    @instrument("ping")
     def ping(self) -> bool:
-        return self.bucket.exists()
+        return self.bucket.exists(**self._retry_options())
 
+    @instrument("samefile")
     def samefile(self, other_path: Union[Text, "GSPath"]) -> bool:
         if isinstance(other_path, Text):
-            other_path = GSPath(other_path, storage_client=self.client)
-        if not isinstance(other_path, GSPath):
+            other_path = Path(other_path, storage_client=self.client)
+        if not isinstance(other_path, Path):
             return False
-        return self.md5() == other_path.md5()
+        if other_path == self:
+            return True
+        return self._same_content(other_path)
+
+    @instrument("list_files")
+    def list_files(
+        self, *, page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Generator[FileInfo, None, None]:
+        prefix = self._dir_prefix()
+        hidden = self._hidden_names()
+        for name, blob in self._list_entries(prefix, False, page_size=page_size):
+            relative = name[len(prefix) :]
+            if blob is None or relative.rpartition("/")[2] in hidden + ("",):
+                continue
+            yield FileInfo(
+                relative,
+                blob.size or 0,
+                blob.updated.timestamp(),
+                str(blob.generation),
+                base64.b64decode(blob.md5_hash).hex() if blob.md5_hash else None,
+            )
 
-    def glob(
+    @instrument("stat")
+    def stat(self) -> Dict[Text, Union[int, float]]:
+        return blob_stat(self._load_blob(strict=True))
+
+    @instrument("owner")
+    def owner(self) -> Text:
+        return self._load_blob(strict=True).owner
+
+    @instrument("group")
+    def group(self) -> Text:
+        return self._load_blob(strict=True).owner
+
+    @instrument("open")
+    def open(
         self,
-        pattern: Text,
+        mode: Text = "r",
+        buffering: int = -1,
+        encoding: Optional[Text] = None,
+        errors: Optional[Text] = None,
+        newline: Optional[Text] = None,
         *,
-        return_file: bool = True,
-        return_dir: bool = True,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        read_ahead: bool = True,
         **kwargs,
-    ) -> Generator["GSPath", None, None]:
-        pattern = "/" + (
-            pattern.strip()
-            .lstrip(f"{self._url.scheme}://{self.bucket_name}")
-            .lstrip("/")
+    ) -> io.IOBase:
+        if set(mode) - set("rwbt") or len(set(mode) & set("rw")) != 1:
+            raise ValueError(f"Invalid mode: {mode}")
+        if "b" in mode and "t" in mode:
+            raise ValueError(f"Invalid mode: {mode}")
+        if self._urlpath.endswith("/"):
+            raise IsADirectoryError(f"Is a directory: {self}")
+
+        stream: io.IOBase
+        if "r" in mode and self.read_cache is not None and buffering != 0:
+            stream = self.read_cache.open(self)
+        elif "r" in mode:
+            raw = GSRawReader(
+                self.blob,
+                self.client,
+                chunk_size=chunk_size,
+                read_ahead=read_ahead,
+                retry_policy=self.retry_policy,
+            )
+            if buffering == 0:
+                if "b" not in mode:
+                    raise ValueError("Can't have unbuffered text I/O")
+                return raw
+            stream = io.BufferedReader(
+                raw, buffer_size=buffering if buffering > 1 else io.DEFAULT_BUFFER_SIZE
+            )
+        else:
+            self._invalidate_metadata()
+            stream = BlobWriter(
+                self.blob,
+                chunk_size=chunk_size,
+                ignore_flush=True,
+                **self._write_options(),
+            )
+
+        if "b" in mode:
+            return stream
+        return io.TextIOWrapper(
+            stream, encoding=encoding, errors=errors, newline=newline
         )
-        prefix = pattern.split("*")[0]
-        blobs = self.client.list_blobs(self.bucket_name, prefix=prefix, delimiter="/")
 
-        paths: Set[Text] = set()
+    @instrument("read_bytes", io="read")
+    def read_bytes(self) -> bytes:
+        if self.read_cache is not None:
+            return self.read_cache.read_bytes(self)
+        return self._hedged(
+            lambda: self.blob.download_as_bytes(
+                client=self.client, **self._retry_options()
+            )
+        )
 
-        for page in blobs.pages:
-            if page.prefixes and return_dir:
-                matched_dirs = {d for d in page.prefixes if fnmatch.fnmatch(d, pattern)}
-                for matched_dir in matched_dirs:
-                    if matched_dir in paths:
-                        continue
-                    paths.add(matched_dir)
-                    yield GSPath(
-                        self._url.with_path(matched_dir.strip(" /") + "/"),
-                        storage_client=self.client,
-                    )
-            for blob in page:
-                if return_file and fnmatch.fnmatch(blob.name, pattern):
-                    if blob.name in paths:
-                        continue
-                    paths.add(blob.name)
-                    yield GSPath(
-                        self._url.with_path(matched_dir.strip(" /") + "/"),
-                        storage_client=self.client,
-                    )
+    @instrument("read_text", io="read")
+    def read_text(self, encoding=None, errors=None) -> Text:
+        if self.read_cache is not None:
+            data = self.read_cache.read_bytes(self)
+            return data.decode(encoding or "utf-8", errors or "strict")
+        return self._hedged(
+            lambda: self.blob.download_as_text(
+                client=self.client, **self._retry_options()
+            )
+        )
 
-    def stat(self) -> Dict[Text, Union[int, float]]:
-        blob = self.blob
-        blob.reload(client=self.client)
-        return {
-            "size": blob.size,
-            "mtime": blob.updated.timestamp(),
-            "ctime": blob.time_created.timestamp(),
-        }
+    @instrument("read_into", io="read")
+    def read_into(self, buffer, offset: int = 0) -> int:
+        view = memoryview(buffer).cast("B")
+        if self.read_cache is not None:
+            with self.read_cache.open(self) as f:
+                f.seek(offset)
+                return readinto_full(f, view)
+        return self._retry_stale(lambda blob: self._download_range(blob, view, offset))
 
-    def owner(self) -> Text:
-        blob = self.blob
-        blob.reload(client=self.client)
-        return blob.owner
+    @instrument("read_memoryview", io="read")
+    def read_memoryview(self) -> memoryview:
+        if self.read_cache is not None:
+            return memoryview(self.read_cache.read_bytes(self))
 
-    def group(self) -> Text:
-        blob = self.blob
-        blob.reload(client=self.client)
-        return blob.owner
+        def download(blob: "Blob") -> memoryview:
+            buffer = bytearray(blob.size or 0)
+            size = self._download_range(blob, memoryview(buffer), 0)
+            return memoryview(buffer)[:size]
 
-    def open(self, **kwargs) -> io.IOBase:
-        raise NotImplementedError
+        return self._retry_stale(download)
 
-    def read_bytes(self) -> bytes:
-        return self.blob.download_as_bytes(client=self.client)
+    @instrument("download_to", io="read")
+    def download_to(
+        self,
+        target: Union[Text, os.PathLike, LocalPath, bytearray, memoryview],
+        *,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        slice_size: int = DEFAULT_SLICE_SIZE,
+        threshold: int = DEFAULT_SLICED_THRESHOLD,
+        checksum: Optional[Text] = "crc32c",
+    ) -> int:
+        if checksum not in ("crc32c", "md5", None):
+            raise ValueError(f"Invalid checksum: {checksum}")
+        options = dict(
+            max_workers=max_workers,
+            slice_size=slice_size,
+            threshold=threshold,
+            checksum=checksum,
+        )
 
-    def read_text(self, encoding=None, errors=None) -> Text:
-        return self.blob.download_as_text(client=self.client)
+        if not isinstance(target, (Text, os.PathLike, LocalPath)):
+            view = memoryview(target).cast("B")
+
+            def download(blob: "Blob") -> int:
+                if len(view) < (blob.size or 0):
+                    raise ValueError(f"Buffer too small, needs {blob.size} bytes")
+                return self._download_range(blob, view, 0, **options)
+
+            return self._retry_stale(download)
+
+        if isinstance(target, Text) and target.startswith("file://"):
+            target = LocalPath(target)
+        if isinstance(target, LocalPath):
+            target = target._path
+        filename = os.fspath(target)
+        partname = f"{filename}.{uuid.uuid4().hex[:8]}.part"
+        downloaded: List["Blob"] = []
 
+        def download_file(blob: "Blob") -> int:
+            downloaded.append(blob)
+            size = blob.size or 0
+            fd = os.open(partname, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o666)
+            with io.open(fd, "r+b") as f:
+                f.truncate(size)
+                if not size:
+                    return 0
+                with mmap.mmap(f.fileno(), size) as mapped:
+                    with memoryview(mapped) as view:
+                        return self._download_range(blob, view, 0, **options)
+
+        try:
+            size = self._retry_stale(download_file)
+            os.replace(partname, filename)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(partname)
+            raise
+        if checksum is not None:
+            remember_blob_checksums(filename, downloaded[-1])
+        return size
+
+    @instrument("upload_from", io="write")
+    def upload_from(
+        self,
+        source: Union[Text, os.PathLike, LocalPath, bytes, bytearray, memoryview],
+        *,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        part_size: int = DEFAULT_COMPOSITE_PART_SIZE,
+        threshold: int = DEFAULT_COMPOSITE_THRESHOLD,
+    ) -> int:
+        if not isinstance(source, (Text, os.PathLike, LocalPath)):
+            with memoryview(source).cast("B") as view:
+                size = len(view)
+                if size > threshold:
+                    self._composite_upload(
+                        view, max_workers=max_workers, part_size=part_size
+                    )
+                    return size
+            data = source if isinstance(source, bytes) else bytes(source)
+            self.blob.upload_from_string(
+                data, client=self.client, **self._write_options()
+            )
+            self._invalidate_metadata()
+            return size
+
+        if isinstance(source, Text) and source.startswith("file://"):
+            source = LocalPath(source)
+        if isinstance(source, LocalPath):
+            source = source._path
+        with open(source, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size <= threshold:
+                blob = self.blob
+                blob.upload_from_file(
+                    f,
+                    size=size,
+                    client=self.client,
+                    checksum="crc32c",
+                    **self._write_options(),
+                )
+                self._invalidate_metadata()
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    with memoryview(mapped) as view:
+                        blob = self._composite_upload(
+                            view, max_workers=max_workers, part_size=part_size
+                        )
+        remember_blob_checksums(source, blob)
+        return size
+
+    @instrument("write_bytes", io="write")
     def write_bytes(self, data: bytes) -> int:
-        self.blob.upload_from_string(data, client=self.client)
+        if self.composite_threshold is not None:
+            return self.upload_from(data, threshold=self.composite_threshold)
+        self.blob.upload_from_string(data, client=self.client, **self._write_options())
+        self._invalidate_metadata()
         return len(data)
 
+    @instrument("write_text", io="write")
     def write_text(self, data, encoding=None, errors=None) -> int:
-        self.blob.upload_from_string(data, client=self.client)
+        if self.composite_threshold is not None:
+            self.write_bytes(data.encode(encoding or "utf-8", errors or "strict"))
+            return len(data)
+        self.blob.upload_from_string(data, client=self.client, **self._write_options())
+        self._invalidate_metadata()
         return len(data)
 
+    @instrument("touch")
     def touch(self, mode=None, exist_ok=True) -> None:
-        if self._url.path.endswith("/"):
+        if self._urlpath.endswith("/"):
             raise IsADirectoryError(f"Is a directory: {self}")
         if self.is_file():
             if not exist_ok:
                 raise FileExistsError(f"File already exists: {self}")
             return
         else:
-            self.blob.upload_from_string(b"", client=self.client)
+            self.blob.upload_from_string(
+                b"", client=self.client, **self._write_options(0)
+            )
+            self._invalidate_metadata()
 
+    @instrument("mkdir")
     def mkdir(self, mode=None, parents: bool = False, exist_ok: bool = False) -> None:
-        if not self._url.path.endswith("/"):
-            path = GSPath(
-                self._url.with_path(self._url.path + "/"), storage_client=self.client
-            )
+        if not self._urlpath.endswith("/"):
+            path = self._new_path(self._with_path(self._urlpath + "/"))
         else:
             path = self
 
@@ -195,68 +922,674 @@ class GSPath(Path):
             return
         else:
             (path / self.empty_filename).touch()
+            self._invalidate_metadata()
 
+    @instrument("unlink")
     def unlink(self, missing_ok=False) -> None:
-        blob = self.blob
-        try:
-            blob.reload(client=self.client)
-        except Exception:
+        blob = self._load_blob()
+        if blob is None:
             if missing_ok:
                 return
             raise FileNotFoundError(f"No such file or directory: {self}")
         if blob.name.endswith("/"):
             raise IsADirectoryError(f"Is a directory: {self}")
-        self.blob.delete(client=self.client)
+        try:
+            self.blob.delete(client=self.client, **self._write_options(blob.generation))
+        except NotFound:
+            if not missing_ok:
+                raise FileNotFoundError(f"No such file or directory: {self}")
+        finally:
+            self._invalidate_metadata()
 
+    @instrument("rmdir")
     def rmdir(self) -> None:
-        path = self
-        if not path.is_dir():
+        prefix = self._dir_prefix()
+        blobs = list(
+            self.client.list_blobs(
+                self.bucket_name,
+                prefix=prefix,
+                max_results=3,
+                fields="items(name),nextPageToken",
+                **self._retry_options(),
+            )
+        )
+        if not blobs:
             raise FileNotFoundError(f"No such file or directory: {self}")
-
-        path_empty: Optional["GSPath"] = None
-        for inner_path in path.glob(
-            path._url.path + "*", return_file=True, return_dir=True
+        if any(
+            blob.name not in (prefix, prefix + self.empty_filename) for blob in blobs
         ):
-            if inner_path._url.name == path.empty_filename:
-                path_empty = inner_path
-                continue
             raise OSError(f"Directory not empty: {self}")
 
-        if path_empty:
-            path_empty.unlink()
-
-    def rename(self, target) -> "Path":
-        raise NotImplementedError
-
-    def replace(self, target) -> "Path":
-        raise NotImplementedError
+        for blob in blobs:
+            try:
+                blob.delete(client=self.client, **self._retry_options(conditional=True))
+            except NotFound:
+                pass
+            if self.metadata_cache is not None:
+                self.metadata_cache.invalidate((self.bucket_name, blob.name))
 
+    @instrument("exists")
     def exists(self) -> bool:
-        if self._url.path.endswith("/"):
+        if self._urlpath.endswith("/"):
             return self.is_dir()
         return self.is_file()
 
+    @classmethod
+    def _stat_many(
+        cls, paths: List[Path], *, max_workers: int
+    ) -> List[Optional[Dict[Text, Union[int, float]]]]:
+        blobs = cls._load_blobs(paths, max_workers=max_workers)
+        return [None if blob is None else blob_stat(blob) for blob in blobs]
+
+    @classmethod
+    def _exists_many(cls, paths: List[Path], *, max_workers: int) -> List[bool]:
+        files = [i for i, path in enumerate(paths) if not path._urlpath.endswith("/")]
+        dirs = [i for i, path in enumerate(paths) if path._urlpath.endswith("/")]
+        results = [False] * len(paths)
+        blobs = cls._load_blobs([paths[i] for i in files], max_workers=max_workers)
+        for index, blob in zip(files, blobs):
+            results[index] = blob is not None
+
+        groups: Dict[Tuple[int, Text], List[int]] = {}
+        for index in dirs:
+            path = paths[index]
+            manifest = path._covering_manifest(path._dir_prefix())
+            if manifest is not None:
+                results[index] = manifest.has_prefix(path._dir_prefix())
+            else:
+                groups.setdefault((id(path.client), path.bucket_name), []).append(index)
+        tasks = []
+        for indices in groups.values():
+            prefixes = sorted({paths[i]._dir_prefix() for i in indices})
+            for i in range(0, len(prefixes), MAX_BATCH_SIZE):
+                chunk = prefixes[i : i + MAX_BATCH_SIZE]
+                tasks.append((indices, paths[indices[0]], chunk))
+
+        def check(task: Tuple[List[int], "GSPath", List[Text]]) -> None:
+            indices, root, prefixes = task
+            found = root._batch_has_prefix(prefixes)
+            for index in indices:
+                results[index] = found.get(paths[index]._dir_prefix(), results[index])
+
+        run_bounded(check, tasks, max_workers=max_workers)
+        return results
+
+    @classmethod
+    def _load_blobs(
+        cls, paths: List["GSPath"], *, max_workers: int
+    ) -> List[Optional["Blob"]]:
+        results: List[Optional["Blob"]] = [None] * len(paths)
+        groups: Dict[Tuple[int, Text], List[int]] = {}
+        for index, path in enumerate(paths):
+            if not path.blob_name or path._urlpath.endswith("/"):
+                continue
+            if path._listed_blob is not None:
+                results[index] = path._listed_blob
+                continue
+            manifest = path._covering_manifest(path.blob_name)
+            if manifest is not None:
+                entry = manifest.get(path.blob_name)
+                if entry is not None:
+                    results[index] = path._manifest_blob(entry)
+                continue
+            if path.metadata_cache is not None:
+                found, blob = path.metadata_cache.get(
+                    (path.bucket_name, path.blob_name)
+                )
+                if found:
+                    results[index] = blob
+                    continue
+            groups.setdefault((id(path.client), path.bucket_name), []).append(index)
+
+        found: Dict[Tuple[int, Text], Dict[Text, Optional["Blob"]]] = {}
+        tasks = []
+        for key, indices in groups.items():
+            found[key] = {}
+            root = paths[indices[0]]
+            for task in root._lookup_tasks([paths[i].blob_name for i in indices]):
+                tasks.append((key, task))
+        run_bounded(
+            lambda item: found[item[0]].update(item[1]()),
+            tasks,
+            max_workers=max_workers,
+        )
+
+        for key, indices in groups.items():
+            for index in indices:
+                path = paths[index]
+                blob = found[key].get(path.blob_name)
+                if path.metadata_cache is not None:
+                    path.metadata_cache.set((path.bucket_name, path.blob_name), blob)
+                results[index] = blob
+        return results
+
+    @instrument("is_dir")
     def is_dir(self) -> bool:
-        if (self / self.empty_filename).is_file():
-            return True
-        pattern = self._url.path
-        if not pattern.endswith("/"):
-            pattern += "/"
-        pattern += "*"
-        for _ in self.glob(pattern, return_file=True, return_dir=True):
-            return True
-        return False
+        manifest = self._covering_manifest(self._dir_prefix())
+        if manifest is not None:
+            return manifest.has_prefix(self._dir_prefix())
+        return self._has_prefix()
 
+    @instrument("is_file")
     def is_file(self) -> bool:
-        if self._url.path.endswith("/"):
+        if self._urlpath.endswith("/"):
             return False
-        return self.blob.exists(client=self.client)
+        manifest = self._covering_manifest(self.blob_name)
+        if manifest is not None:
+            return manifest.get(self.blob_name) is not None
+        return self._load_blob() is not None
 
+    @instrument("md5")
     def md5(self) -> Text:
-        blob = self.blob
-        blob.reload(client=self._storage_client)
-        md5_hash_base64 = blob.md5_hash
-        return base64.b64decode(md5_hash_base64).hex()
+        return self.checksum("md5")
+
+    @instrument("checksum")
+    def checksum(self, algo: Text = "md5") -> Text:
+        if algo not in CHECKSUM_ALGORITHMS:
+            raise ValueError(f"Invalid checksum: {algo}")
+        return blob_checksum(self._load_blob(strict=True), algo)
+
+    @instrument("build_manifest")
+    def build_manifest(self, *, page_size: int = DEFAULT_PAGE_SIZE) -> Manifest:
+        manifest = Manifest(
+            self.bucket_name,
+            self._dir_prefix(),
+            self._list_manifest_entries(page_size=page_size),
+        )
+        self._save_manifest(manifest)
+        return manifest
+
+    @instrument("load_manifest")
+    def load_manifest(self) -> Manifest:
+        blob = self.bucket.blob(self._dir_prefix() + MANIFEST_FILENAME)
+        try:
+            data = blob.download_as_bytes(client=self.client, **self._retry_options())
+            return Manifest.from_bytes(data)
+        except NotFound:
+            raise FileNotFoundError(f"No manifest under: {self}")
+
+    @instrument("refresh_manifest")
+    def refresh_manifest(
+        self,
+        manifest: Optional[Manifest] = None,
+        *,
+        full: bool = False,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> Manifest:
+        manifest = manifest or self.manifest or self.load_manifest()
+        if full or manifest.last_name is None:
+            entries = list(self._list_manifest_entries(page_size=page_size))
+            refreshed = manifest.merge(entries, replace=True)
+        else:
+            # Only names sorting after the last indexed one are listed
+            last_name = manifest.last_name
+            entries = [
+                entry
+                for entry in self._list_manifest_entries(
+                    page_size=page_size, start_offset=last_name
+                )
+                if entry.name != last_name
+            ]
+            if not entries:
+                return manifest
+            refreshed = manifest.merge(entries)
+        self._save_manifest(refreshed)
+        return refreshed
+
+    def _new_path(
+        self, path: Union[Text, URL], blob: Optional["Blob"] = None
+    ) -> "GSPath":
+        new_path = GSPath(
+            path,
+            storage_client=self.client,
+            empty_filename=self.empty_filename,
+            metadata_cache=self.metadata_cache,
+            read_cache=self.read_cache,
+            composite_threshold=self.composite_threshold,
+            manifest=self.manifest,
+            retry_policy=self.retry_policy,
+        )
+        new_path._listed_blob = blob
+        return new_path
+
+    def _reserve_connections(self, count: int) -> None:
+        ensure_pool_size(self.client, count)
+
+    def _instrument_transport(self) -> None:
+        hooks = self.client._http.hooks.setdefault("response", [])
+        if record_http_request not in hooks:
+            with bucket_lock:
+                if record_http_request not in hooks:
+                    hooks.append(record_http_request)
+
+    def _retry_options(self, conditional: bool = False) -> Dict[Text, Any]:
+        return retry_options(self.retry_policy, conditional)
+
+    def _write_options(self, generation: Optional[int] = None) -> Dict[Text, Any]:
+        options = self._retry_options(conditional=True)
+        if self.retry_policy is not None and self.retry_policy.precondition_writes:
+            if generation is None:
+                self._invalidate_metadata()
+                blob = self._load_blob()
+                generation = blob.generation if blob is not None else 0
+            options["if_generation_match"] = generation
+        return options
+
+    def _hedged(self, func: Callable[[], Any]) -> Any:
+        if self.retry_policy is None:
+            return func()
+        return self.retry_policy.hedge(func)
+
+    def _cache_key(self) -> Text:
+        generation = self._load_blob(strict=True).generation
+        return f"gs://{self.bucket_name}/{self.blob_name}#{generation}"
+
+    def _load_blob(self, strict: bool = False) -> Optional["Blob"]:
+        if self._listed_blob is not None:
+            return self._listed_blob
+
+        key = (self.bucket_name, self.blob_name)
+        found = False
+        if self.metadata_cache is not None:
+            found, blob = self.metadata_cache.get(key)
+        if not found:
+            blob = self.blob
+            try:
+                blob.reload(client=self.client, **self._retry_options())
+            except NotFound:
+                blob = None
+            if self.metadata_cache is not None:
+                self.metadata_cache.set(key, blob)
+        if blob is None and strict:
+            raise FileNotFoundError(f"No such file or directory: {self}")
+        return blob
+
+    def _retry_stale(self, func: Callable[["Blob"], Any]) -> Any:
+        try:
+            return func(self._load_blob(strict=True))
+        except PreconditionFailed:
+            # The cached metadata is stale, size and generation must be reloaded
+            self._invalidate_metadata()
+            return func(self._load_blob(strict=True))
+
+    def _download_range(
+        self,
+        blob: "Blob",
+        buffer: memoryview,
+        start: int,
+        *,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        slice_size: int = DEFAULT_SLICE_SIZE,
+        threshold: int = DEFAULT_SLICED_THRESHOLD,
+        checksum: Optional[Text] = "crc32c",
+    ) -> int:
+        size = blob.size or 0
+        end = min(start + len(buffer), size)
+        if end <= start:
+            return 0
+        whole = start == 0 and end == size
+        hedging = self.retry_policy is not None and self.retry_policy.hedging
+
+        def fetch(part: memoryview, **kwargs) -> None:
+            kwargs.update(
+                client=self.client,
+                if_generation_match=blob.generation,
+                **self._retry_options(),
+            )
+            if not hedging:
+                self.blob.download_to_file(MemoryWriter(part), **kwargs)
+                return
+            # A hedged request must not write into the caller's buffer, only
+            # the winner's bytes are copied
+            data = self.retry_policy.hedge(
+                lambda: self.blob.download_as_bytes(**kwargs)
+            )
+            part[: len(data)] = data
+
+        def download(slice_start: int) -> None:
+            slice_end = min(slice_start + slice_size, end)
+            with buffer[slice_start - start : slice_end - start] as part:
+                fetch(part, start=slice_start, end=slice_end - 1, checksum=None)
+
+        if end - start <= threshold:
+            with buffer[: end - start] as view:
+                fetch(
+                    view,
+                    start=None if whole else start,
+                    end=None if whole else end - 1,
+                    checksum=checksum if whole else None,
+                )
+            return end - start
+
+        run_bounded(download, range(start, end, slice_size), max_workers=max_workers)
+        if whole and checksum is not None:
+            with buffer[:size] as view:
+                verify_checksum(blob, view, checksum)
+        return end - start
+
+    def _composite_upload(
+        self, view: memoryview, *, max_workers: int, part_size: int
+    ) -> "Blob":
+        prefix = f"{COMPOSITE_TMP_PREFIX}{uuid.uuid4().hex}/"
+        temporary: List[Text] = []
+
+        def upload(index: int) -> None:
+            name = f"{prefix}part-{index:06d}"
+            temporary.append(name)
+            with view[index * part_size : (index + 1) * part_size] as part:
+                # Parts have unique names, so the upload is always safe to retry
+                self.bucket.blob(name).upload_from_string(
+                    bytes(part),
+                    client=self.client,
+                    checksum="crc32c",
+                    if_generation_match=0,
+                    **self._retry_options(conditional=True),
+                )
+
+        def compose(item: Tuple[Text, List[Text]]) -> None:
+            name, sources = item
+            temporary.append(name)
+            self.bucket.blob(name).compose(
+                [self.bucket.blob(source) for source in sources],
+                client=self.client,
+                if_generation_match=0,
+                **self._retry_options(conditional=True),
+            )
+
+        succeeded = False
+        try:
+            with ThreadPoolExecutor(max_workers=1) as hasher:
+                md5 = hasher.submit(md5_hexdigest, view)
+                count = -(-len(view) // part_size)
+                run_bounded(upload, range(count), max_workers=max_workers)
+                names = [f"{prefix}part-{index:06d}" for index in range(count)]
+                md5 = md5.result()
+
+            level = 0
+            while len(names) > MAX_COMPOSE_SOURCES:
+                groups = [
+                    names[i : i + MAX_COMPOSE_SOURCES]
+                    for i in range(0, len(names), MAX_COMPOSE_SOURCES)
+                ]
+                names = [f"{prefix}compose-{level}-{i:06d}" for i in range(len(groups))]
+                run_bounded(compose, zip(names, groups), max_workers=max_workers)
+                level += 1
+
+            blob = self.blob
+            blob.metadata = {COMPOSITE_MD5_METADATA: md5}
+            blob.compose(
+                [self.bucket.blob(name) for name in names],
+                client=self.client,
+                **self._retry_options(conditional=True),
+            )
+            succeeded = True
+        finally:
+            self._invalidate_metadata()
+            try:
+                for i in range(0, len(temporary), MAX_BATCH_SIZE):
+                    self._delete_batch(temporary[i : i + MAX_BATCH_SIZE])
+            except Exception:
+                if succeeded:
+                    raise
+        return blob
+
+    def _copy_object(
+        self, blob_name: Text, target: "GSPath", *, delete_source: bool
+    ) -> None:
+        source_blob = self.bucket.blob(blob_name)
+        target_blob = target.blob
+        try:
+            options = target._retry_options(conditional=True)
+            token, _, _ = target_blob.rewrite(
+                source_blob, client=target.client, **options
+            )
+            while token is not None:
+                token, _, _ = target_blob.rewrite(
+                    source_blob, token=token, client=target.client, **options
+                )
+            if delete_source:
+                source_blob.delete(
+                    client=self.client, **self._retry_options(conditional=True)
+                )
+        except NotFound:
+            raise FileNotFoundError(
+                f"No such file or directory: gs://{self.bucket_name}/{blob_name}"
+            )
+        finally:
+            target._invalidate_metadata()
+            if delete_source and self.metadata_cache is not None:
+                self.metadata_cache.invalidate((self.bucket_name, blob_name))
+
+    def _list_entries(
+        self, prefix: Text, delimiter: bool, *, page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Generator[Tuple[Text, Optional["Blob"]], None, None]:
+        manifest = self._covering_manifest(prefix)
+        if manifest is not None:
+            for name, entry in manifest.list_entries(prefix, delimiter):
+                yield name, None if entry is None else self._manifest_blob(entry)
+            return
+
+        blobs = self.client.list_blobs(
+            self.bucket_name,
+            prefix=prefix,
+            delimiter="/" if delimiter else None,
+            fields=LISTING_FIELDS,
+            page_size=page_size,
+            **self._retry_options(),
+        )
+        for page in blobs.pages:
+            for dirname in sorted(page.prefixes):
+                yield dirname, None
+            for blob in page:
+                yield blob.name, blob
+
+    def _lookup_entry(self, name: Text) -> Optional[Tuple[Text, Optional["Blob"]]]:
+        manifest = self._covering_manifest(name)
+        if manifest is not None:
+            entry = manifest.get(name) if name and not name.endswith("/") else None
+            if entry is not None:
+                return name, self._manifest_blob(entry)
+            prefix = name.rstrip("/") + "/" if name else ""
+            return (prefix, None) if manifest.has_prefix(prefix) else None
+
+        path = self._new_path(self._with_path("/" + name))
+        blob = path._load_blob() if name and not name.endswith("/") else None
+        if blob is not None:
+            return name, blob
+        if path._has_prefix():
+            return path._dir_prefix(), None
+        return None
+
+    def _lookup_tasks(
+        self, names: List[Text]
+    ) -> List[Callable[[], Dict[Text, Optional["Blob"]]]]:
+        siblings: Dict[Text, List[Text]] = {}
+        for name in sorted(set(names)):
+            siblings.setdefault(name.rpartition("/")[0], []).append(name)
+
+        tasks: List[Callable[[], Dict[Text, Optional["Blob"]]]] = []
+        batched: List[Text] = []
+        for parent, children in siblings.items():
+            # A listing only pays off when the siblings need several batches
+            if len(children) > MAX_BATCH_SIZE:
+                prefix = parent + "/" if parent else ""
+                tasks.append(functools.partial(self._list_lookup, prefix, children))
+            else:
+                batched.extend(children)
+        for i in range(0, len(batched), MAX_BATCH_SIZE):
+            chunk = batched[i : i + MAX_BATCH_SIZE]
+            tasks.append(functools.partial(self._batch_lookup, chunk))
+        return tasks
+
+    def _list_lookup(
+        self, prefix: Text, names: List[Text]
+    ) -> Dict[Text, Optional["Blob"]]:
+        max_pages = -(-len(names) // MAX_BATCH_SIZE) - 1
+        blobs = self.client.list_blobs(
+            self.bucket_name,
+            prefix=prefix,
+            delimiter="/",
+            start_offset=names[0],
+            fields=LISTING_FIELDS,
+            page_size=DEFAULT_PAGE_SIZE,
+            **self._retry_options(),
+        )
+        listed: Dict[Text, "Blob"] = {}
+        covered: Optional[Text] = None
+        for page_number, page in enumerate(blobs.pages, 1):
+            for blob in page:
+                listed[blob.name] = blob
+                covered = blob.name
+            if covered is not None and covered >= names[-1]:
+                break
+            if page_number >= max_pages and blobs.next_page_token:
+                # The listing is longer than expected, batch the rest
+                rest = [name for name in names if covered is None or name > covered]
+                found = {name: listed.get(name) for name in names if name not in rest}
+                for i in range(0, len(rest), MAX_BATCH_SIZE):
+                    found.update(self._batch_lookup(rest[i : i + MAX_BATCH_SIZE]))
+                return found
+        return {name: listed.get(name) for name in names}
+
+    def _batch_lookup(self, names: List[Text]) -> Dict[Text, Optional["Blob"]]:
+        blobs = [self.bucket.blob(name) for name in names]
+        with self.client.batch(raise_exception=False) as batch:
+            for blob in blobs:
+                blob.reload(client=self.client)
+
+        found: Dict[Text, Optional["Blob"]] = {}
+        for blob, response in zip(blobs, batch_responses(batch, len(blobs))):
+            if 200 <= response.status_code < 300:
+                found[blob.name] = blob
+            elif response.status_code == 404:
+                found[blob.name] = None
+            else:
+                raise OSError(
+                    f"Failed to stat gs://{self.bucket_name}/{blob.name}: "
+                    f"{response.status_code} {response.reason}"
+                )
+        return found
+
+    def _batch_has_prefix(self, prefixes: List[Text]) -> Dict[Text, bool]:
+        with self.client.batch(raise_exception=False) as batch:
+            for prefix in prefixes:
+                self.client._get_resource(
+                    f"/b/{self.bucket_name}/o",
+                    query_params={
+                        "prefix": prefix,
+                        "maxResults": 1,
+                        "fields": "items(name),prefixes",
+                    },
+                )
+
+        found: Dict[Text, bool] = {}
+        for prefix, response in zip(prefixes, batch_responses(batch, len(prefixes))):
+            if not 200 <= response.status_code < 300:
+                raise OSError(
+                    f"Failed to list gs://{self.bucket_name}/{prefix}: "
+                    f"{response.status_code} {response.reason}"
+                )
+            listing = response.json()
+            found[prefix] = bool(listing.get("items") or listing.get("prefixes"))
+        return found
+
+    def _delete_batch(self, names: List[Text]) -> None:
+        with self.client.batch(raise_exception=False) as batch:
+            for name in names:
+                self.bucket.blob(name).delete(client=self.client)
+
+        for name, response in zip(names, batch_responses(batch, len(names))):
+            if self.metadata_cache is not None:
+                self.metadata_cache.invalidate((self.bucket_name, name))
+            if response.status_code == 404 or 200 <= response.status_code < 300:
+                continue
+            raise OSError(
+                f"Failed to delete gs://{self.bucket_name}/{name}: "
+                f"{response.status_code} {response.reason}"
+            )
+
+    def _covering_manifest(self, name: Text) -> Optional[Manifest]:
+        if self.manifest is not None and self.manifest.covers(self.bucket_name, name):
+            return self.manifest
+        return None
+
+    def _manifest_blob(self, entry: ManifestEntry) -> "Blob":
+        resource = {
+            "name": entry.name,
+            "bucket": self.bucket_name,
+            "size": str(entry.size),
+            "generation": str(entry.generation),
+            "updated": _rfc3339(entry.updated),
+            "timeCreated": _rfc3339(entry.created),
+        }
+        if entry.md5 is not None:
+            resource["md5Hash"] = base64.b64encode(entry.md5).decode()
+        blob = Blob(entry.name, bucket=self.bucket)
+        blob._set_properties(resource)
+        return blob
+
+    def _list_manifest_entries(
+        self, *, page_size: int, start_offset: Optional[Text] = None
+    ) -> Generator[ManifestEntry, None, None]:
+        prefix = self._dir_prefix()
+        blobs = self.client.list_blobs(
+            self.bucket_name,
+            prefix=prefix,
+            start_offset=start_offset,
+            fields=LISTING_FIELDS,
+            page_size=page_size,
+            **self._retry_options(),
+        )
+        for blob in blobs:
+            if blob.name == prefix + MANIFEST_FILENAME:
+                continue
+            yield ManifestEntry(
+                blob.name,
+                blob.size or 0,
+                blob.generation or 0,
+                base64.b64decode(blob.md5_hash) if blob.md5_hash else None,
+                blob.updated.timestamp() if blob.updated else 0.0,
+                blob.time_created.timestamp() if blob.time_created else 0.0,
+            )
+
+    def _save_manifest(self, manifest: Manifest) -> None:
+        blob = self.bucket.blob(manifest.prefix + MANIFEST_FILENAME)
+        blob.upload_from_string(
+            manifest.to_bytes(),
+            content_type="application/octet-stream",
+            client=self.client,
+            **self._retry_options(conditional=True),
+        )
+
+    def _hidden_names(self) -> Tuple[Text, ...]:
+        return (self.empty_filename, MANIFEST_FILENAME)
+
+    def _list_names(self, prefix: Text) -> Generator[Text, None, None]:
+        # Names only and never from the manifest, it may lag behind the bucket
+        blobs = self.client.list_blobs(
+            self.bucket_name,
+            prefix=prefix,
+            fields="items(name),nextPageToken",
+            page_size=DEFAULT_PAGE_SIZE,
+            **self._retry_options(),
+        )
+        for blob in blobs:
+            yield blob.name
+
+    def _has_prefix(self) -> bool:
+        blobs = self.client.list_blobs(
+            self.bucket_name,
+            prefix=self._dir_prefix(),
+            max_results=1,
+            fields="items(name),nextPageToken",
+            **self._retry_options(),
+        )
+        return any(True for _ in blobs)
+
+    def _invalidate_metadata(self) -> None:
+        self._listed_blob = None
+        if self.metadata_cache is not None:
+            self.metadata_cache.invalidate((self.bucket_name, self.blob_name))
 
     def _init_client(
         self,
@@ -268,26 +1601,8 @@ class GSPath(Path):
         if isinstance(storage_client, Client):
             return storage_client
 
-        if isinstance(credentials, Text):
-            credentials = service_account.Credentials.from_service_account_info(
-                json.loads(credentials)
-            )
-        elif isinstance(credentials, Dict):
-            credentials = service_account.Credentials.from_service_account_info(
-                credentials
-            )
-        elif not credentials and credentials_path:
-            credentials = service_account.Credentials.from_service_account_file(
-                credentials_path
-            )
-        elif not credentials and "GOOGLE_APPLICATION_CREDENTIALS" in os.environ:
-            if os.environ["GOOGLE_APPLICATION_CREDENTIALS"].endswith(".json"):
-                credentials = service_account.Credentials.from_service_account_file(
-                    os.environ["GOOGLE_APPLICATION_CREDENTIALS"]
-                )
-            else:
-                credentials = service_account.Credentials.from_service_account_info(
-                    json.loads(os.environ["GOOGLE_APPLICATION_CREDENTIALS"])
-                )
-
-        return Client(credentials=credentials)
+        return client_registry.get_client(
+            credentials=credentials,
+            credentials_path=credentials_path,
+            project=kwargs.get("project"),
+        )
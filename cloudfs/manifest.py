@@ -0,0 +1,178 @@
+import array
+import bisect
+import json
+import struct
+import sys
+import time
+import zlib
+from typing import Generator, Iterable, List, NamedTuple, Optional, Text, Tuple
+
+MANIFEST_FILENAME = ".cloudfs-manifest"
+MANIFEST_MAGIC = b"CFSMANIFEST\x01"
+EMPTY_MD5 = bytes(16)
+
+
+class ManifestEntry(NamedTuple):
+    name: Text
+    size: int
+    generation: int
+    md5: Optional[bytes]
+    updated: float
+    created: float
+
+
+class Manifest:
+    def __init__(
+        self,
+        bucket_name: Text,
+        prefix: Text,
+        entries: Iterable[ManifestEntry] = (),
+        *,
+        created: Optional[float] = None,
+    ):
+        self.bucket_name = bucket_name
+        self.prefix = prefix
+        self.created = time.time() if created is None else created
+
+        # Columns indexed in name order, names are relative to the prefix
+        self._names: List[Text] = []
+        self._sizes = array.array("q")
+        self._generations = array.array("q")
+        self._md5s = bytearray()
+        self._updated = array.array("d")
+        self._created = array.array("d")
+        for entry in sorted(entries, key=lambda entry: entry.name):
+            if not entry.name.startswith(prefix):
+                raise ValueError(f"Entry {entry.name} is outside of prefix {prefix}")
+            self._names.append(entry.name[len(prefix) :])
+            self._sizes.append(entry.size)
+            self._generations.append(entry.generation)
+            self._md5s += entry.md5 or EMPTY_MD5
+            self._updated.append(entry.updated)
+            self._created.append(entry.created)
+
+    def __repr__(self) -> Text:
+        return f"Manifest('{self.bucket_name}', '{self.prefix}', {len(self)} entries)"
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __iter__(self) -> Generator[ManifestEntry, None, None]:
+        for index in range(len(self._names)):
+            yield self._entry(index)
+
+    @property
+    def max_generation(self) -> int:
+        return max(self._generations, default=0)
+
+    @property
+    def last_name(self) -> Optional[Text]:
+        return self.prefix + self._names[-1] if self._names else None
+
+    def covers(self, bucket_name: Text, name: Text) -> bool:
+        return bucket_name == self.bucket_name and name.startswith(self.prefix)
+
+    def get(self, name: Text) -> Optional[ManifestEntry]:
+        relative = name[len(self.prefix) :]
+        index = bisect.bisect_left(self._names, relative)
+        if index < len(self._names) and self._names[index] == relative:
+            return self._entry(index)
+        return None
+
+    def has_prefix(self, prefix: Text) -> bool:
+        relative = prefix[len(self.prefix) :]
+        index = bisect.bisect_left(self._names, relative)
+        return index < len(self._names) and self._names[index].startswith(relative)
+
+    def list_entries(
+        self, prefix: Text, delimiter: bool
+    ) -> Generator[Tuple[Text, Optional[ManifestEntry]], None, None]:
+        relative = prefix[len(self.prefix) :]
+        index = bisect.bisect_left(self._names, relative)
+        while index < len(self._names):
+            name = self._names[index]
+            if not name.startswith(relative):
+                break
+            slash = name.find("/", len(relative)) if delimiter else -1
+            if slash >= 0:
+                dirname = name[: slash + 1]
+                yield self.prefix + dirname, None
+                # Skip every name under the collapsed directory
+                index = bisect.bisect_left(self._names, dirname + "\U0010ffff", index)
+                continue
+            yield self.prefix + name, self._entry(index)
+            index += 1
+
+    def merge(
+        self, entries: Iterable[ManifestEntry], *, replace: bool = False
+    ) -> "Manifest":
+        merged = {} if replace else {entry.name: entry for entry in self}
+        merged.update((entry.name, entry) for entry in entries)
+        return Manifest(self.bucket_name, self.prefix, merged.values())
+
+    def to_bytes(self) -> bytes:
+        header = json.dumps(
+            {
+                "bucket": self.bucket_name,
+                "prefix": self.prefix,
+                "created": self.created,
+                "count": len(self),
+            }
+        ).encode()
+        names = "\n".join(self._names).encode()
+        body = [struct.pack("<Q", len(names)), names]
+        for column in (self._sizes, self._generations, self._updated, self._created):
+            body.append(_little_endian(column).tobytes())
+        body.append(bytes(self._md5s))
+        return b"".join(
+            [
+                MANIFEST_MAGIC,
+                struct.pack("<I", len(header)),
+                header,
+                zlib.compress(b"".join(body)),
+            ]
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Manifest":
+        if not data.startswith(MANIFEST_MAGIC):
+            raise ValueError("Invalid manifest, unknown format")
+        offset = len(MANIFEST_MAGIC)
+        (header_size,) = struct.unpack_from("<I", data, offset)
+        offset += 4
+        header = json.loads(data[offset : offset + header_size])
+        body = zlib.decompress(data[offset + header_size :])
+
+        manifest = cls(header["bucket"], header["prefix"], created=header["created"])
+        count = header["count"]
+        (names_size,) = struct.unpack_from("<Q", body, 0)
+        offset = 8 + names_size
+        manifest._names = body[8:offset].decode().split("\n") if count else []
+        for column in ("_sizes", "_generations", "_updated", "_created"):
+            values = getattr(manifest, column)
+            values.frombytes(body[offset : offset + count * values.itemsize])
+            setattr(manifest, column, _little_endian(values))
+            offset += count * values.itemsize
+        manifest._md5s = bytearray(body[offset : offset + count * 16])
+        if len(manifest._names) != count or len(manifest._md5s) != count * 16:
+            raise ValueError("Invalid manifest, truncated data")
+        return manifest
+
+    def _entry(self, index: int) -> ManifestEntry:
+        md5 = bytes(self._md5s[index * 16 : index * 16 + 16])
+        return ManifestEntry(
+            self.prefix + self._names[index],
+            self._sizes[index],
+            self._generations[index],
+            None if md5 == EMPTY_MD5 else md5,
+            self._updated[index],
+            self._created[index],
+        )
+
+
+def _little_endian(values: array.array) -> array.array:
+    if sys.byteorder == "little":
+        return values
+    swapped = array.array(values.typecode, values)
+    swapped.byteswap()
+    return swapped
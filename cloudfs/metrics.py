@@ -0,0 +1,262 @@
+import bisect
+import contextvars
+import functools
+import inspect
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Text, Tuple
+
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    float("inf"),
+)
+
+logger = logging.getLogger("cloudfs.metrics")
+
+
+class OperationEvent(NamedTuple):
+    backend: Text
+    operation: Text
+    duration: float
+    http_requests: int
+    bytes_read: int
+    bytes_written: int
+    error: Optional[Text]
+
+
+Sink = Callable[[OperationEvent], Any]
+
+sinks: List[Sink] = []
+_sinks_lock = threading.Lock()
+_current: "contextvars.ContextVar[Optional[_Operation]]" = contextvars.ContextVar(
+    "cloudfs_operation", default=None
+)
+
+
+class _Operation:
+    __slots__ = ("http_requests", "lock")
+
+    def __init__(self):
+        self.http_requests = 0
+        self.lock = threading.Lock()
+
+
+def add_sink(sink: Sink) -> Sink:
+    global sinks
+    with _sinks_lock:
+        # Replace rather than mutate so the hot path reads a stable list
+        sinks = sinks + [sink]
+    return sink
+
+
+def remove_sink(sink: Sink) -> None:
+    global sinks
+    with _sinks_lock:
+        sinks = [s for s in sinks if s is not sink]
+
+
+def is_enabled() -> bool:
+    return bool(sinks)
+
+
+def record_http_request(*args, **kwargs) -> None:
+    operation = _current.get()
+    if operation is not None:
+        with operation.lock:
+            operation.http_requests += 1
+
+
+def _size(value: Any) -> int:
+    if isinstance(value, int):
+        return value
+    if isinstance(value, memoryview):
+        return value.nbytes
+    try:
+        return len(value)
+    except TypeError:
+        return 0
+
+
+def _emit(event: OperationEvent) -> None:
+    for sink in sinks:
+        try:
+            sink(event)
+        except Exception:
+            logger.exception("Metrics sink %r failed", sink)
+
+
+def instrument(operation: Text, io: Optional[Text] = None) -> Callable:
+    def decorator(func: Callable) -> Callable:
+        if inspect.isgeneratorfunction(func):
+            return _instrument_generator(func, operation)
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            # Only the outermost operation is recorded, nested calls add to it
+            if not sinks or _current.get() is not None:
+                return func(self, *args, **kwargs)
+
+            self._instrument_transport()
+            state = _Operation()
+            token = _current.set(state)
+            error, result = None, None
+            start = time.perf_counter()
+            try:
+                result = func(self, *args, **kwargs)
+                return result
+            except BaseException as e:
+                error = type(e).__name__
+                raise
+            finally:
+                duration = time.perf_counter() - start
+                _current.reset(token)
+                size = _size(result) if io and not error else 0
+                _emit(
+                    OperationEvent(
+                        self._scheme,
+                        operation,
+                        duration,
+                        state.http_requests,
+                        size if io == "read" else 0,
+                        size if io == "write" else 0,
+                        error,
+                    )
+                )
+
+        return wrapper
+
+    return decorator
+
+
+def _instrument_generator(func: Callable, operation: Text) -> Callable:
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if not sinks or _current.get() is not None:
+            yield from func(self, *args, **kwargs)
+            return
+
+        self._instrument_transport()
+        state = _Operation()
+        generator = func(self, *args, **kwargs)
+        error, duration = None, 0.0
+        try:
+            while True:
+                # Time and attribute requests to the generator, not the consumer
+                token = _current.set(state)
+                start = time.perf_counter()
+                try:
+                    item = next(generator)
+                except StopIteration:
+                    break
+                finally:
+                    duration += time.perf_counter() - start
+                    _current.reset(token)
+                yield item
+        except GeneratorExit:
+            generator.close()
+            raise
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            _emit(
+                OperationEvent(
+                    self._scheme,
+                    operation,
+                    duration,
+                    state.http_requests,
+                    0,
+                    0,
+                    error,
+                )
+            )
+
+    return wrapper
+
+
+def wrap_context(func: Callable) -> Callable:
+    if _current.get() is None:
+        return func
+    return functools.partial(contextvars.copy_context().run, func)
+
+
+class MemorySink:
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._stats: Dict[Tuple[Text, Text], Dict[Text, Any]] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: OperationEvent) -> None:
+        key = (event.backend, event.operation)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = {
+                    "calls": 0,
+                    "errors": 0,
+                    "http_requests": 0,
+                    "bytes_read": 0,
+                    "bytes_written": 0,
+                    "latency_sum": 0.0,
+                    "latency_buckets": [0] * len(self.buckets),
+                }
+            stats["calls"] += 1
+            stats["errors"] += event.error is not None
+            stats["http_requests"] += event.http_requests
+            stats["bytes_read"] += event.bytes_read
+            stats["bytes_written"] += event.bytes_written
+            stats["latency_sum"] += event.duration
+            index = bisect.bisect_left(self.buckets, event.duration)
+            stats["latency_buckets"][min(index, len(self.buckets) - 1)] += 1
+
+    def snapshot(self) -> Dict[Text, Dict[Text, Dict[Text, Any]]]:
+        result: Dict[Text, Dict[Text, Dict[Text, Any]]] = {}
+        with self._lock:
+            for (backend, operation), stats in sorted(self._stats.items()):
+                # Cumulative counts keyed by upper bound, as Prometheus expects
+                cumulative, histogram = 0, {}
+                for bound, count in zip(self.buckets, stats["latency_buckets"]):
+                    cumulative += count
+                    histogram[bound] = cumulative
+                result.setdefault(backend, {})[operation] = dict(
+                    stats, latency_buckets=histogram
+                )
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+class LoggingSink:
+    def __init__(
+        self, logger: Optional[logging.Logger] = None, level: int = logging.DEBUG
+    ):
+        self.logger = logger or logging.getLogger("cloudfs.metrics")
+        self.level = level
+
+    def __call__(self, event: OperationEvent) -> None:
+        self.logger.log(
+            self.level,
+            "%s.%s %.3fms requests=%d read=%d written=%d error=%s",
+            event.backend,
+            event.operation,
+            event.duration * 1000,
+            event.http_requests,
+            event.bytes_read,
+            event.bytes_written,
+            event.error,
+        )
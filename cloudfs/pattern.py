@@ -0,0 +1,244 @@
+import re
+from typing import (
+    AbstractSet,
+    Any,
+    AsyncGenerator,
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Pattern,
+    Text,
+    Tuple,
+)
+
+MAGIC_CHARS = frozenset("*?[")
+
+
+def has_magic(pattern: Text) -> bool:
+    return any(char in MAGIC_CHARS for char in pattern)
+
+
+def literal_head(segment: Text) -> Text:
+    for i, char in enumerate(segment):
+        if char in MAGIC_CHARS:
+            return segment[:i]
+    return segment
+
+
+def expand_braces(pattern: Text) -> List[Text]:
+    depth = 0
+    start = -1
+    for i, char in enumerate(pattern):
+        if char == "{":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif char == "}" and depth > 0:
+            depth -= 1
+            if depth == 0:
+                options = _split_options(pattern[start + 1 : i])
+                if len(options) < 2:
+                    continue
+                head, tail = pattern[:start], pattern[i + 1 :]
+                expanded: List[Text] = []
+                for option in options:
+                    for item in expand_braces(head + option + tail):
+                        if item not in expanded:
+                            expanded.append(item)
+                return expanded
+    return [pattern]
+
+
+def _split_options(body: Text) -> List[Text]:
+    options: List[Text] = []
+    depth = 0
+    current = ""
+    for char in body:
+        if char == "," and depth == 0:
+            options.append(current)
+            current = ""
+            continue
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+        current += char
+    options.append(current)
+    return options
+
+
+def translate_segment(segment: Text) -> Text:
+    regex = ""
+    i = 0
+    while i < len(segment):
+        char = segment[i]
+        i += 1
+        if char == "*":
+            regex += "[^/]*"
+        elif char == "?":
+            regex += "[^/]"
+        elif char == "[":
+            end = i
+            if end < len(segment) and segment[end] in "!^":
+                end += 1
+            if end < len(segment) and segment[end] == "]":
+                end += 1
+            while end < len(segment) and segment[end] != "]":
+                end += 1
+            if end >= len(segment):
+                regex += re.escape(char)
+                continue
+            body = segment[i:end].replace("\\", "\\\\")
+            i = end + 1
+            if body[:1] in ("!", "^"):
+                body = "^" + body[1:]
+            regex += f"[{body}]"
+        else:
+            regex += re.escape(char)
+    return regex
+
+
+def translate(pattern: Text) -> Text:
+    segments = pattern.split("/")
+    regex = ""
+    for i, segment in enumerate(segments):
+        last = i == len(segments) - 1
+        if segment == "**":
+            regex += ".*" if last else "(?:[^/]+/)*"
+        else:
+            regex += translate_segment(segment) + ("" if last else "/")
+    return regex
+
+
+class GlobPattern:
+    def __init__(self, pattern: Text):
+        self.pattern = pattern
+        self.alternatives = expand_braces(pattern)
+        self.regex: Pattern = re.compile(
+            "(?s:" + "|".join(translate(p) for p in self.alternatives) + r")\Z"
+        )
+
+    def __repr__(self) -> Text:
+        return f"GlobPattern({self.pattern!r})"
+
+    def match(self, name: Text) -> bool:
+        return self.regex.match(name) is not None
+
+    @property
+    def recursive(self) -> bool:
+        return any("**" in p.split("/") for p in self.alternatives)
+
+    @staticmethod
+    def split_literal(pattern: Text) -> Tuple[Text, List[Text]]:
+        segments = pattern.split("/")
+        for i, segment in enumerate(segments):
+            if has_magic(segment):
+                return "/".join(segments[:i]), segments[i:]
+        return pattern, []
+
+
+class GlobStep:
+    def __init__(self, prefix: Text, segments: List[Text]):
+        literal, segments = GlobPattern.split_literal("/".join(segments))
+        if literal:
+            prefix += literal + ("/" if segments else "")
+        self.prefix = prefix
+        self.rest = segments[1:]
+        self.list_prefix: Optional[Text] = None
+        # A recursive remainder is matched whole against each listed name
+        self.pattern = GlobPattern("/".join(segments))
+        self.recursive = self.pattern.recursive
+        if segments:
+            self.list_prefix = prefix + literal_head(segments[0])
+            if not self.recursive:
+                self.pattern = GlobPattern(segments[0])
+
+    def decide(
+        self, name: Text, item: Any, hidden_names: AbstractSet[Text]
+    ) -> List[Tuple[bool, Tuple[Text, Any]]]:
+        # Each action is (recurse, entry), an empty list skips the entry
+        relative = name[len(self.prefix) :]
+        if self.recursive:
+            parts = relative.split("/")
+            actions = [
+                (False, (self.prefix + dirname + "/", None))
+                for dirname in ("/".join(parts[:i]) for i in range(1, len(parts)))
+                if self.pattern.match(dirname)
+            ]
+            if parts[-1] and parts[-1] not in hidden_names:
+                if self.pattern.match(relative):
+                    actions.append((False, (name, item)))
+            return actions
+
+        if item is None:
+            if not self.pattern.match(relative[:-1]):
+                return []
+            return [(bool(self.rest), (name, None))]
+        if self.rest or relative.endswith("/") or relative in hidden_names:
+            return []
+        if relative and self.pattern.match(relative):
+            return [(False, (name, item))]
+        return []
+
+
+def iter_glob(
+    prefix: Text,
+    segments: List[Text],
+    *,
+    list_entries: Callable[[Text, bool], Iterable[Tuple[Text, Any]]],
+    lookup: Callable[[Text], Optional[Tuple[Text, Any]]],
+    hidden_names: AbstractSet[Text] = frozenset(),
+) -> Generator[Tuple[Text, Any], None, None]:
+    step = GlobStep(prefix, segments)
+    if step.list_prefix is None:
+        entry = lookup(step.prefix)
+        if entry is not None:
+            yield entry
+        return
+
+    for name, item in list_entries(step.list_prefix, not step.recursive):
+        for recurse, entry in step.decide(name, item, hidden_names):
+            if recurse:
+                yield from iter_glob(
+                    entry[0],
+                    step.rest,
+                    list_entries=list_entries,
+                    lookup=lookup,
+                    hidden_names=hidden_names,
+                )
+            else:
+                yield entry
+
+
+async def aiter_glob(
+    prefix: Text,
+    segments: List[Text],
+    *,
+    list_entries: Callable[[Text, bool], AsyncIterable[Tuple[Text, Any]]],
+    lookup: Callable[[Text], Awaitable[Optional[Tuple[Text, Any]]]],
+    hidden_names: AbstractSet[Text] = frozenset(),
+) -> AsyncGenerator[Tuple[Text, Any], None]:
+    step = GlobStep(prefix, segments)
+    if step.list_prefix is None:
+        entry = await lookup(step.prefix)
+        if entry is not None:
+            yield entry
+        return
+
+    async for name, item in list_entries(step.list_prefix, not step.recursive):
+        for recurse, entry in step.decide(name, item, hidden_names):
+            if recurse:
+                async for sub_entry in aiter_glob(
+                    entry[0],
+                    step.rest,
+                    list_entries=list_entries,
+                    lookup=lookup,
+                    hidden_names=hidden_names,
+                ):
+                    yield sub_entry
+            else:
+                yield entry
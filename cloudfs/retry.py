@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Optional, Text, TypeVar
+
+from cloudfs.metrics import wrap_context
+
+T = TypeVar("T")
+
+DEFAULT_HEDGE_WINDOW = 256
+DEFAULT_HEDGE_MIN_SAMPLES = 20
+DEFAULT_HEDGE_MAX_WORKERS = 16
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        *,
+        initial_backoff: float = 0.1,
+        max_backoff: float = 10.0,
+        multiplier: float = 2.0,
+        deadline: float = 120.0,
+        timeout: float = 60.0,
+        precondition_writes: bool = False,
+        hedge_percentile: Optional[float] = None,
+        hedge_min_delay: float = 0.01,
+        hedge_min_samples: int = DEFAULT_HEDGE_MIN_SAMPLES,
+        hedge_window: int = DEFAULT_HEDGE_WINDOW,
+        hedge_max_workers: int = DEFAULT_HEDGE_MAX_WORKERS,
+    ):
+        if hedge_percentile is not None and not 0 < hedge_percentile < 1:
+            raise ValueError(f"Invalid hedge_percentile: {hedge_percentile}")
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.multiplier = multiplier
+        self.deadline = deadline
+        self.timeout = timeout
+        self.precondition_writes = precondition_writes
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_max_workers = hedge_max_workers
+
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._latencies: Deque[float] = deque(maxlen=hedge_window)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[Text, Any]:
+        # Latency samples and the hedge pool belong to this process
+        return {
+            "initial_backoff": self.initial_backoff,
+            "max_backoff": self.max_backoff,
+            "multiplier": self.multiplier,
+            "deadline": self.deadline,
+            "timeout": self.timeout,
+            "precondition_writes": self.precondition_writes,
+            "hedge_percentile": self.hedge_percentile,
+            "hedge_min_delay": self.hedge_min_delay,
+            "hedge_min_samples": self.hedge_min_samples,
+            "hedge_window": self._latencies.maxlen,
+            "hedge_max_workers": self.hedge_max_workers,
+        }
+
+    def __setstate__(self, state: Dict[Text, Any]) -> None:
+        self.__init__(**state)
+
+    def __repr__(self) -> Text:
+        return (
+            f"RetryPolicy(deadline={self.deadline}, timeout={self.timeout}, "
+            f"hedge_percentile={self.hedge_percentile})"
+        )
+
+    @property
+    def hedging(self) -> bool:
+        return self.hedge_percentile is not None
+
+    def hedge_delay(self) -> Optional[float]:
+        with self._lock:
+            if len(self._latencies) < self.hedge_min_samples:
+                return None
+            latencies = sorted(self._latencies)
+        index = min(len(latencies) - 1, int(len(latencies) * self.hedge_percentile))
+        return max(self.hedge_min_delay, latencies[index])
+
+    def hedge(self, func: Callable[[], T]) -> T:
+        if not self.hedging:
+            return func()
+        delay = self.hedge_delay()
+        if delay is None:
+            return self._timed(func)
+
+        executor = self._get_executor()
+        first = executor.submit(wrap_context(self._timed), func)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+
+        # The slow request is left to finish in the background, its result dropped
+        self.record_hedge()
+        second = executor.submit(wrap_context(self._timed), func)
+        done, pending = wait([first, second], return_when=FIRST_COMPLETED)
+        succeeded = [f for f in (first, second) if f in done and not f.exception()]
+        winner: Future = succeeded[0] if succeeded else (pending or done).pop()
+        if winner is second:
+            self.record_hedge(won=True)
+        return winner.result()
+
+    def record_latency(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def record_hedge(self, won: bool = False) -> None:
+        with self._lock:
+            if won:
+                self.hedge_wins += 1
+            else:
+                self.hedges += 1
+
+    def _timed(self, func: Callable[[], T]) -> T:
+        start = time.perf_counter()
+        result = func()
+        self.record_latency(time.perf_counter() - start)
+        return result
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.hedge_max_workers,
+                    thread_name_prefix="cloudfs-hedge",
+                )
+            return self._executor
@@ -1,5 +1,710 @@
-from cloudfs.base import Path
+import hashlib
+import io
+import os
+import threading
+import warnings
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Generator, Hashable, List, Optional, Text, Tuple, Union
 
+from yarl import URL
 
-class S3Path(Path):
-    pass
+from cloudfs.base import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_PAGE_SIZE,
+    EMPTY_FILENAME,
+    FileInfo,
+    ObjectStorePath,
+    Path,
+    RangeReader,
+    file_checksum,
+)
+from cloudfs.cache import ReadCache
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.config import Config
+    from botocore.exceptions import ClientError
+except ImportError:
+    warnings.warn(
+        "Required 'boto3' is not installed, please install it with 'pip install boto3'"
+    )
+
+DEFAULT_PART_SIZE = 8 * 1024 * 1024  # S3 requires at least 5 MiB per part
+DEFAULT_MAX_CONCURRENCY = 10
+MAX_DELETE_BATCH_SIZE = 1000
+NOT_FOUND_CODES = ("404", "NoSuchKey", "NotFound", "NoSuchBucket")
+
+
+def is_not_found(error: Exception) -> bool:
+    if not isinstance(error, ClientError):
+        return False
+    return error.response.get("Error", {}).get("Code") in NOT_FOUND_CODES
+
+
+class S3ClientRegistry:
+    def __init__(self, *, pool_maxsize: int = 10, keep_alive: bool = False):
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+
+        self._clients: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def configure(
+        self, *, pool_maxsize: Optional[int] = None, keep_alive: Optional[bool] = None
+    ) -> None:
+        with self._lock:
+            if pool_maxsize is not None:
+                self.pool_maxsize = pool_maxsize
+            if keep_alive is not None:
+                self.keep_alive = keep_alive
+            self._clients.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clients.clear()
+
+    def reset(self) -> None:
+        # Clients inherited through fork share their sockets with the parent
+        self._lock = threading.Lock()
+        self._clients = {}
+
+    def get_client(
+        self,
+        *,
+        aws_access_key_id: Optional[Text] = None,
+        aws_secret_access_key: Optional[Text] = None,
+        aws_session_token: Optional[Text] = None,
+        region_name: Optional[Text] = None,
+        endpoint_url: Optional[Text] = None,
+        profile_name: Optional[Text] = None,
+    ):
+        key = (
+            profile_name,
+            region_name,
+            endpoint_url,
+            aws_access_key_id,
+            hashlib.sha256(
+                f"{aws_secret_access_key}:{aws_session_token}".encode()
+            ).hexdigest(),
+        )
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                session = boto3.session.Session(
+                    aws_access_key_id=aws_access_key_id,
+                    aws_secret_access_key=aws_secret_access_key,
+                    aws_session_token=aws_session_token,
+                    region_name=region_name,
+                    profile_name=profile_name,
+                )
+                client = session.client(
+                    "s3",
+                    endpoint_url=endpoint_url,
+                    config=Config(
+                        max_pool_connections=self.pool_maxsize,
+                        tcp_keepalive=self.keep_alive,
+                    ),
+                )
+                spec = dict(
+                    aws_access_key_id=aws_access_key_id,
+                    aws_secret_access_key=aws_secret_access_key,
+                    aws_session_token=aws_session_token,
+                    region_name=region_name,
+                    endpoint_url=endpoint_url,
+                    profile_name=profile_name,
+                )
+                client.__dict__["_cloudfs_spec"] = {
+                    name: value for name, value in spec.items() if value
+                }
+                self._clients[key] = client
+        return client
+
+
+client_registry = S3ClientRegistry()
+
+
+def client_spec(client) -> Dict[Text, Any]:
+    spec = client.__dict__.get("_cloudfs_spec")
+    if spec is not None:
+        return spec
+    # Clients built by the caller are rebuilt from their region and endpoint
+    return {
+        "region_name": client.meta.region_name,
+        "endpoint_url": client.meta.endpoint_url,
+    }
+
+
+def restore_path(
+    path: Text, spec: Dict[Text, Any], options: Dict[Text, Any]
+) -> "S3Path":
+    return S3Path(path, s3_client=client_registry.get_client(**spec), **options)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=client_registry.reset)
+
+
+class S3RawReader(RangeReader):
+    def __init__(
+        self,
+        client,
+        bucket_name: Text,
+        key: Text,
+        *,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        read_ahead: bool = True,
+    ):
+        try:
+            head = client.head_object(Bucket=bucket_name, Key=key)
+        except ClientError as e:
+            if is_not_found(e):
+                raise FileNotFoundError(f"No such file or directory: {key}")
+            raise
+        super().__init__(
+            head["ContentLength"], chunk_size=chunk_size, read_ahead=read_ahead
+        )
+
+        self._client = client
+        self._bucket_name = bucket_name
+        self._key = key
+        self._etag: Text = head["ETag"]
+
+    @property
+    def name(self) -> Text:
+        return f"s3://{self._bucket_name}/{self._key}"
+
+    @property
+    def cache_key(self) -> Text:
+        etag = self._etag.strip('"')
+        return f"{self.name}#{etag}"
+
+    def _read_range(self, start: int, end: int) -> bytes:
+        response = self._client.get_object(
+            Bucket=self._bucket_name,
+            Key=self._key,
+            Range=f"bytes={start}-{end}",
+            IfMatch=self._etag,
+        )
+        return response["Body"].read()
+
+
+class S3Writer(io.BufferedIOBase):
+    def __init__(
+        self,
+        client,
+        bucket_name: Text,
+        key: Text,
+        *,
+        part_size: int = DEFAULT_PART_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ):
+        self._client = client
+        self._bucket_name = bucket_name
+        self._key = key
+        self._part_size = part_size
+        self._max_concurrency = max_concurrency
+
+        self._buffer = bytearray()
+        self._upload_id: Optional[Text] = None
+        self._parts: Dict[int, Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def name(self) -> Text:
+        return f"s3://{self._bucket_name}/{self._key}"
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._checkClosed()
+        self._buffer += data
+        while len(self._buffer) >= self._part_size:
+            self._submit_part(bytes(self._buffer[: self._part_size]))
+            del self._buffer[: self._part_size]
+        return len(data) if isinstance(data, bytes) else memoryview(data).nbytes
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            if self._upload_id is None:
+                self._client.put_object(
+                    Bucket=self._bucket_name, Key=self._key, Body=bytes(self._buffer)
+                )
+            else:
+                if self._buffer:
+                    self._submit_part(bytes(self._buffer))
+                parts = [
+                    {"PartNumber": number, "ETag": future.result()}
+                    for number, future in sorted(self._parts.items())
+                ]
+                self._client.complete_multipart_upload(
+                    Bucket=self._bucket_name,
+                    Key=self._key,
+                    UploadId=self._upload_id,
+                    MultipartUpload={"Parts": parts},
+                )
+        except BaseException:
+            self._abort()
+            raise
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+            self._buffer = bytearray()
+            super().close()
+
+    def _submit_part(self, data: bytes) -> None:
+        if self._upload_id is None:
+            response = self._client.create_multipart_upload(
+                Bucket=self._bucket_name, Key=self._key
+            )
+            self._upload_id = response["UploadId"]
+            self._executor = ThreadPoolExecutor(max_workers=self._max_concurrency)
+
+        pending = [future for future in self._parts.values() if not future.done()]
+        if len(pending) >= self._max_concurrency:
+            wait(pending, return_when=FIRST_COMPLETED)
+
+        number = len(self._parts) + 1
+        self._parts[number] = self._executor.submit(self._upload_part, number, data)
+
+    def _upload_part(self, number: int, data: bytes) -> Text:
+        response = self._client.upload_part(
+            Bucket=self._bucket_name,
+            Key=self._key,
+            UploadId=self._upload_id,
+            PartNumber=number,
+            Body=data,
+        )
+        return response["ETag"]
+
+    def _abort(self) -> None:
+        if self._upload_id is None:
+            return
+        for future in self._parts.values():
+            future.cancel()
+        self._client.abort_multipart_upload(
+            Bucket=self._bucket_name, Key=self._key, UploadId=self._upload_id
+        )
+
+
+class S3Path(ObjectStorePath):
+    __slots__ = (
+        "_s3_client",
+        "empty_filename",
+        "part_size",
+        "max_concurrency",
+        "read_cache",
+        "_listed_object",
+    )
+
+    delete_batch_size = MAX_DELETE_BATCH_SIZE
+
+    def __init__(
+        self,
+        path: Union[Text, URL],
+        *,
+        s3_client=None,
+        aws_access_key_id: Optional[Text] = None,
+        aws_secret_access_key: Optional[Text] = None,
+        aws_session_token: Optional[Text] = None,
+        region_name: Optional[Text] = None,
+        endpoint_url: Optional[Text] = None,
+        profile_name: Optional[Text] = None,
+        empty_filename: Text = EMPTY_FILENAME,
+        part_size: int = DEFAULT_PART_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        read_cache: Optional[ReadCache] = None,
+        **kwargs,
+    ):
+        super().__init__(path, **kwargs)
+
+        if self._scheme != "s3":
+            raise ValueError(f"Unsupported scheme: s3, got {self._scheme}")
+        if not self.bucket_name:
+            raise ValueError(f"Missing bucket name in {self}")
+
+        if s3_client is None:
+            s3_client = client_registry.get_client(
+                aws_access_key_id=aws_access_key_id,
+                aws_secret_access_key=aws_secret_access_key,
+                aws_session_token=aws_session_token,
+                region_name=region_name,
+                endpoint_url=endpoint_url,
+                profile_name=profile_name,
+            )
+        self._s3_client = s3_client
+
+        self.empty_filename = empty_filename
+        self.part_size = part_size
+        self.max_concurrency = max_concurrency
+        self.read_cache = read_cache
+        self._listed_object: Optional[Dict[Text, Any]] = None
+
+    @property
+    def client(self):
+        return self._s3_client
+
+    @property
+    def bucket_name(self) -> Text:
+        return self._host
+
+    @property
+    def key(self) -> Text:
+        return self._urlpath.lstrip("/")
+
+    @property
+    def transfer_config(self) -> "TransferConfig":
+        return TransferConfig(
+            multipart_threshold=self.part_size,
+            multipart_chunksize=self.part_size,
+            max_concurrency=self.max_concurrency,
+        )
+
+    def __eq__(self, other_path: "S3Path") -> bool:
+        if not isinstance(other_path, S3Path):
+            return False
+        return (self._host, self._urlpath) == (other_path._host, other_path._urlpath)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        options = {
+            "empty_filename": self.empty_filename,
+            "part_size": self.part_size,
+            "max_concurrency": self.max_concurrency,
+        }
+        return (restore_path, (self._str, client_spec(self.client), options))
+
+    def __truediv__(self, name: Text) -> "S3Path":
+        if not isinstance(name, Text):
+            raise ValueError(f"Expected str, got {type(name)}")
+        return self._new_path(self._join(name))
+
+    def ping(self) -> bool:
+        try:
+            self.client.head_bucket(Bucket=self.bucket_name)
+        except ClientError as e:
+            if is_not_found(e):
+                return False
+            raise
+        return True
+
+    def samefile(self, other_path: Union[Text, "S3Path"]) -> bool:
+        if isinstance(other_path, Text):
+            other_path = self._new_path(other_path)
+        if isinstance(other_path, S3Path):
+            if self == other_path:
+                return True
+            info = self._load_object(strict=True)
+            other_info = other_path._load_object(strict=True)
+            if info["size"] != other_info["size"]:
+                return False
+            if info["etag"] == other_info["etag"]:
+                return True
+            # Multipart ETags depend on the part size, not only on the content
+            if "-" not in info["etag"] and "-" not in other_info["etag"]:
+                return False
+            return self.checksum() == other_path.checksum()
+        if isinstance(other_path, Path):
+            return self._same_content(other_path)
+        return False
+
+    def list_files(
+        self, *, page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Generator[FileInfo, None, None]:
+        prefix = self._dir_prefix()
+        for name, info in self._list_entries(prefix, False, page_size=page_size):
+            relative = name[len(prefix) :]
+            if info is None or relative.rpartition("/")[2] in ("", self.empty_filename):
+                continue
+            etag = info["etag"]
+            md5 = None if "-" in etag else etag
+            yield FileInfo(relative, info["size"], info["mtime"], etag, md5)
+
+    def stat(self) -> Dict[Text, Union[int, float]]:
+        info = self._load_object(strict=True)
+        return {
+            "size": info["size"],
+            "mtime": info["mtime"],
+            "ctime": info["mtime"],
+        }
+
+    def owner(self) -> Text:
+        try:
+            acl = self.client.get_object_acl(Bucket=self.bucket_name, Key=self.key)
+        except ClientError as e:
+            if is_not_found(e):
+                raise FileNotFoundError(f"No such file or directory: {self}")
+            raise
+        return acl["Owner"].get("DisplayName") or acl["Owner"].get("ID")
+
+    def group(self) -> Text:
+        return self.owner()
+
+    def open(
+        self,
+        mode: Text = "r",
+        buffering: int = -1,
+        encoding: Optional[Text] = None,
+        errors: Optional[Text] = None,
+        newline: Optional[Text] = None,
+        *,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        read_ahead: bool = True,
+        **kwargs,
+    ) -> io.IOBase:
+        if set(mode) - set("rwbt") or len(set(mode) & set("rw")) != 1:
+            raise ValueError(f"Invalid mode: {mode}")
+        if "b" in mode and "t" in mode:
+            raise ValueError(f"Invalid mode: {mode}")
+        if self._urlpath.endswith("/"):
+            raise IsADirectoryError(f"Is a directory: {self}")
+
+        stream: io.IOBase
+        if "r" in mode and self.read_cache is not None and buffering != 0:
+            stream = self.read_cache.open(self)
+        elif "r" in mode:
+            raw = S3RawReader(
+                self.client,
+                self.bucket_name,
+                self.key,
+                chunk_size=chunk_size,
+                read_ahead=read_ahead,
+            )
+            if buffering == 0:
+                if "b" not in mode:
+                    raise ValueError("Can't have unbuffered text I/O")
+                return raw
+            stream = io.BufferedReader(
+                raw, buffer_size=buffering if buffering > 1 else io.DEFAULT_BUFFER_SIZE
+            )
+        else:
+            self._invalidate_metadata()
+            stream = S3Writer(
+                self.client,
+                self.bucket_name,
+                self.key,
+                part_size=self.part_size,
+                max_concurrency=self.max_concurrency,
+            )
+
+        if "b" in mode:
+            return stream
+        return io.TextIOWrapper(
+            stream, encoding=encoding, errors=errors, newline=newline
+        )
+
+    def read_bytes(self) -> bytes:
+        if self.read_cache is not None:
+            return self.read_cache.read_bytes(self)
+        buffer = io.BytesIO()
+        try:
+            self.client.download_fileobj(
+                self.bucket_name, self.key, buffer, Config=self.transfer_config
+            )
+        except ClientError as e:
+            if is_not_found(e):
+                raise FileNotFoundError(f"No such file or directory: {self}")
+            raise
+        return buffer.getvalue()
+
+    def read_text(self, encoding=None, errors=None) -> Text:
+        return self.read_bytes().decode(encoding or "utf-8", errors or "strict")
+
+    def write_bytes(self, data: bytes) -> int:
+        self.client.upload_fileobj(
+            io.BytesIO(data), self.bucket_name, self.key, Config=self.transfer_config
+        )
+        self._invalidate_metadata()
+        return len(data)
+
+    def write_text(self, data, encoding=None, errors=None) -> int:
+        self.write_bytes(data.encode(encoding or "utf-8", errors or "strict"))
+        return len(data)
+
+    def touch(self, mode=None, exist_ok=True) -> None:
+        if self._urlpath.endswith("/"):
+            raise IsADirectoryError(f"Is a directory: {self}")
+        if self.is_file():
+            if not exist_ok:
+                raise FileExistsError(f"File already exists: {self}")
+            return
+        self.client.put_object(Bucket=self.bucket_name, Key=self.key, Body=b"")
+        self._invalidate_metadata()
+
+    def mkdir(self, mode=None, parents: bool = False, exist_ok: bool = False) -> None:
+        if not self._urlpath.endswith("/"):
+            path = self._new_path(self._with_path(self._urlpath + "/"))
+        else:
+            path = self
+
+        if path.is_dir():
+            if not exist_ok:
+                raise FileExistsError(f"Directory already exists: {path}")
+            return
+        (path / self.empty_filename).touch()
+
+    def unlink(self, missing_ok=False) -> None:
+        if self._urlpath.endswith("/"):
+            raise IsADirectoryError(f"Is a directory: {self}")
+        if self._load_object() is None:
+            if missing_ok:
+                return
+            raise FileNotFoundError(f"No such file or directory: {self}")
+        self.client.delete_object(Bucket=self.bucket_name, Key=self.key)
+        self._invalidate_metadata()
+
+    def rmdir(self) -> None:
+        prefix = self._dir_prefix()
+        response = self.client.list_objects_v2(
+            Bucket=self.bucket_name, Prefix=prefix, MaxKeys=3
+        )
+        keys = [item["Key"] for item in response.get("Contents", [])]
+        if not keys:
+            raise FileNotFoundError(f"No such file or directory: {self}")
+        if any(key not in (prefix, prefix + self.empty_filename) for key in keys):
+            raise OSError(f"Directory not empty: {self}")
+        self._delete_batch(keys)
+
+    def exists(self) -> bool:
+        if self._urlpath.endswith("/"):
+            return self.is_dir()
+        return self.is_file()
+
+    def is_dir(self) -> bool:
+        response = self.client.list_objects_v2(
+            Bucket=self.bucket_name, Prefix=self._dir_prefix(), MaxKeys=1
+        )
+        return response.get("KeyCount", 0) > 0
+
+    def is_file(self) -> bool:
+        if self._urlpath.endswith("/"):
+            return False
+        return self._load_object() is not None
+
+    def md5(self) -> Text:
+        return self.checksum("md5")
+
+    def checksum(self, algo: Text = "md5") -> Text:
+        if algo != "md5":
+            raise ValueError(f"Unsupported checksum for S3: {algo}")
+        etag = self._load_object(strict=True)["etag"]
+        if "-" not in etag:
+            return etag
+        # Multipart ETags are not an MD5 of the content, hash the object itself
+        with self.open("rb") as f:
+            return file_checksum(f, "md5")
+
+    def _new_path(
+        self, path: Union[Text, URL], info: Optional[Dict[Text, Any]] = None
+    ) -> "S3Path":
+        new_path = S3Path(
+            path,
+            s3_client=self.client,
+            empty_filename=self.empty_filename,
+            part_size=self.part_size,
+            max_concurrency=self.max_concurrency,
+            read_cache=self.read_cache,
+        )
+        new_path._listed_object = info
+        return new_path
+
+    def _invalidate_metadata(self) -> None:
+        self._listed_object = None
+
+    def _cache_key(self) -> Text:
+        etag = self._load_object(strict=True)["etag"]
+        return f"s3://{self.bucket_name}/{self.key}#{etag}"
+
+    def _load_object(self, strict: bool = False) -> Optional[Dict[Text, Any]]:
+        if self._listed_object is not None:
+            return self._listed_object
+
+        try:
+            head = self.client.head_object(Bucket=self.bucket_name, Key=self.key)
+        except ClientError as e:
+            if not is_not_found(e):
+                raise
+            if strict:
+                raise FileNotFoundError(f"No such file or directory: {self}")
+            return None
+        return {
+            "size": head["ContentLength"],
+            "mtime": head["LastModified"].timestamp(),
+            "etag": head["ETag"].strip('"'),
+        }
+
+    def _list_entries(
+        self, prefix: Text, delimiter: bool, *, page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Generator[Tuple[Text, Optional[Dict[Text, Any]]], None, None]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        kwargs = {"Bucket": self.bucket_name, "Prefix": prefix}
+        if delimiter:
+            kwargs["Delimiter"] = "/"
+        for page in paginator.paginate(
+            **kwargs, PaginationConfig={"PageSize": page_size}
+        ):
+            for common_prefix in page.get("CommonPrefixes", []):
+                yield common_prefix["Prefix"], None
+            for item in page.get("Contents", []):
+                yield item["Key"], {
+                    "size": item["Size"],
+                    "mtime": item["LastModified"].timestamp(),
+                    "etag": item["ETag"].strip('"'),
+                }
+
+    def _lookup_entry(
+        self, name: Text
+    ) -> Optional[Tuple[Text, Optional[Dict[Text, Any]]]]:
+        path = self._new_path(self._with_path("/" + name))
+        info = path._load_object() if name and not name.endswith("/") else None
+        if info is not None:
+            return name, info
+        if path.is_dir():
+            return path._dir_prefix(), None
+        return None
+
+    def _delete_batch(self, keys: List[Text]) -> None:
+        response = self.client.delete_objects(
+            Bucket=self.bucket_name,
+            Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True},
+        )
+        for error in response.get("Errors", []):
+            if error.get("Code") in NOT_FOUND_CODES:
+                continue
+            raise OSError(
+                f"Failed to delete s3://{self.bucket_name}/{error['Key']}: "
+                f"{error.get('Code')} {error.get('Message')}"
+            )
+
+    def _copy_object(self, key: Text, target: "S3Path", *, delete_source: bool) -> None:
+        try:
+            target.client.copy(
+                {"Bucket": self.bucket_name, "Key": key},
+                target.bucket_name,
+                target.key,
+                SourceClient=self.client,
+                Config=target.transfer_config,
+            )
+            if delete_source:
+                self.client.delete_object(Bucket=self.bucket_name, Key=key)
+        except ClientError as e:
+            if is_not_found(e):
+                raise FileNotFoundError(
+                    f"No such file or directory: s3://{self.bucket_name}/{key}"
+                )
+            raise
+        finally:
+            target._invalidate_metadata()
@@ -0,0 +1,176 @@
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Optional, Text, Tuple, Union
+
+from cloudfs.base import (
+    DEFAULT_CHUNK_SIZE,
+    FileInfo,
+    LocalPath,
+    Path,
+    as_path,
+    run_bounded,
+)
+from cloudfs.metrics import wrap_context
+from cloudfs.transfer import (
+    DEFAULT_MAX_WORKERS,
+    CopyProgress,
+    ProgressCallback,
+    copy_file,
+)
+
+Signature = Tuple[int, float, Optional[Text], Optional[Text]]
+
+
+class SyncResult(NamedTuple):
+    copied: List[Text]
+    deleted: List[Text]
+    unchanged: int
+
+
+class SyncState:
+    def __init__(self, filename: Union[Text, os.PathLike]):
+        self.filename = os.fspath(filename)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.filename, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "pair TEXT NOT NULL, name TEXT NOT NULL, "
+                "src_size INTEGER, src_mtime REAL, src_version TEXT, src_md5 TEXT, "
+                "dst_size INTEGER, dst_mtime REAL, dst_version TEXT, dst_md5 TEXT, "
+                "PRIMARY KEY (pair, name))"
+            )
+
+    def __repr__(self) -> Text:
+        return f"SyncState({self.filename!r})"
+
+    def load(self, pair: Text) -> Dict[Text, Tuple[Signature, Signature]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, src_size, src_mtime, src_version, src_md5, "
+                "dst_size, dst_mtime, dst_version, dst_md5 "
+                "FROM entries WHERE pair = ?",
+                (pair,),
+            ).fetchall()
+        return {row[0]: (tuple(row[1:5]), tuple(row[5:9])) for row in rows}
+
+    def save(
+        self, pair: Text, entries: Iterable[Tuple[Text, Signature, Signature]]
+    ) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries WHERE pair = ?", (pair,))
+            self._conn.executemany(
+                "INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ((pair, name, *src, *dst) for name, src, dst in entries),
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _signature(info: FileInfo) -> Signature:
+    return (info.size, info.mtime, info.version, info.md5)
+
+
+def _list(path: Path) -> Dict[Text, FileInfo]:
+    return {info.name: info for info in path.list_files()}
+
+
+def _md5(root: Path, info: FileInfo) -> Optional[Text]:
+    if info.md5 is None and isinstance(root, LocalPath):
+        # Local hashes are cached by inode, size and mtime
+        return (root / info.name).checksum("md5")
+    return info.md5
+
+
+def _same_content(
+    source: Path, target: Path, src_info: FileInfo, dst_info: FileInfo
+) -> bool:
+    if src_info.size != dst_info.size:
+        return False
+    src_md5 = _md5(source, src_info)
+    if src_md5 is None:
+        return False
+    return src_md5 == _md5(target, dst_info)
+
+
+def sync(
+    source: Union[Text, Path],
+    target: Union[Text, Path],
+    *,
+    state: Optional[Union[Text, os.PathLike, SyncState]] = None,
+    delete: bool = False,
+    dry_run: bool = False,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[ProgressCallback] = None,
+) -> SyncResult:
+    source, target = as_path(source), as_path(target)
+    store = state
+    if state is not None and not isinstance(state, SyncState):
+        store = SyncState(state)
+    pair = f"{source}\n{target}"
+
+    try:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            target_future = executor.submit(wrap_context(_list), target)
+            src_files = _list(source)
+            dst_files = target_future.result()
+        known = store.load(pair) if store is not None else {}
+
+        copies: List[Text] = []
+        unchanged = 0
+        for name, src_info in sorted(src_files.items()):
+            dst_info = dst_files.get(name)
+            if dst_info is not None:
+                # Unchanged on both sides since the last sync, nothing to fetch
+                if known.get(name) == (_signature(src_info), _signature(dst_info)):
+                    unchanged += 1
+                    continue
+                if _same_content(source, target, src_info, dst_info):
+                    unchanged += 1
+                    continue
+            copies.append(name)
+        deletes = sorted(set(dst_files) - set(src_files)) if delete else []
+        if dry_run:
+            return SyncResult(copies, deletes, unchanged)
+
+        lock = threading.Lock()
+        files_copied, bytes_copied = 0, 0
+
+        def copy(name: Text) -> None:
+            nonlocal files_copied, bytes_copied
+            src, dst = source / name, target / name
+            size = copy_file(src, dst, chunk_size=chunk_size)
+            with lock:
+                files_copied += 1
+                bytes_copied += size or 0
+                event = CopyProgress(src, dst, size, files_copied, bytes_copied)
+            if progress is not None:
+                progress(event)
+
+        run_bounded(copy, copies, max_workers=max_workers)
+        run_bounded(
+            lambda name: (target / name).unlink(missing_ok=True),
+            deletes,
+            max_workers=max_workers,
+        )
+
+        if store is not None:
+            if copies:
+                # One more listing picks up the versions the copies created
+                dst_files = _list(target)
+            store.save(
+                pair,
+                (
+                    (name, _signature(info), _signature(dst_files[name]))
+                    for name, info in src_files.items()
+                    if name in dst_files
+                ),
+            )
+        return SyncResult(copies, deletes, unchanged)
+    finally:
+        if store is not None and store is not state:
+            store.close()
@@ -0,0 +1,127 @@
+import shutil
+import threading
+from typing import Any, Callable, Generator, NamedTuple, Optional, Text, Tuple, Union
+
+from cloudfs.base import DEFAULT_CHUNK_SIZE, LocalPath, Path, as_path, run_bounded
+
+DEFAULT_MAX_WORKERS = 16
+# Resumable uploads only accept chunks in whole multiples of this
+UPLOAD_CHUNK_MULTIPLE = 256 * 1024
+
+
+class CopyProgress(NamedTuple):
+    source: Path
+    target: Path
+    size: Optional[int]
+    files_copied: int
+    bytes_copied: int
+
+
+ProgressCallback = Callable[[CopyProgress], Any]
+
+
+def _open(path: Path, mode: Text, chunk_size: int) -> Any:
+    if isinstance(path, LocalPath):
+        return path.open(mode=mode)
+    return path.open(mode=mode, chunk_size=chunk_size)
+
+
+def _stream(source: Path, target: Path, chunk_size: int) -> int:
+    total = 0
+    buffer = bytearray(chunk_size)
+    with _open(source, "rb", chunk_size) as src, _open(
+        target, "wb", chunk_size
+    ) as dst, memoryview(buffer) as view:
+        while True:
+            size = src.readinto(view)
+            if not size:
+                break
+            dst.write(view[:size])
+            total += size
+    return total
+
+
+def copy_file(
+    source: Union[Text, Path],
+    target: Union[Text, Path],
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Optional[int]:
+    if chunk_size <= 0:
+        raise ValueError(f"Invalid chunk_size: {chunk_size}")
+    source, target = as_path(source), as_path(target)
+    if isinstance(target, LocalPath):
+        target._path.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(source, LocalPath) and isinstance(target, LocalPath):
+        shutil.copyfile(source._path, target._path)
+        return target._path.stat().st_size
+    if type(source) is type(target):
+        # Same backend, the data never leaves the server
+        source.copy(target)
+        return None
+    chunk_size = -(-chunk_size // UPLOAD_CHUNK_MULTIPLE) * UPLOAD_CHUNK_MULTIPLE
+    return _stream(source, target, chunk_size)
+
+
+def copytree(
+    source: Union[Text, Path],
+    target: Union[Text, Path],
+    *,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[ProgressCallback] = None,
+) -> int:
+    source, target = as_path(source), as_path(target)
+    if not source.is_dir():
+        raise NotADirectoryError(f"Not a directory: {source}")
+    root = source._urlpath.rstrip("/") + "/"
+    lock = threading.Lock()
+    files_copied, bytes_copied = 0, 0
+
+    def files() -> Generator[Tuple[Path, Path], None, None]:
+        # Listing runs lazily, so transfers start with the first directory
+        for dirpath, dirnames, filenames in source.walk():
+            relative = (dirpath._urlpath.rstrip("/") + "/")[len(root) :]
+            target_dir = target / relative if relative else target
+            if isinstance(target, LocalPath) or not (dirnames or filenames):
+                target_dir.mkdir(parents=True, exist_ok=True)
+            for filename in filenames:
+                yield dirpath / filename, target_dir / filename
+
+    def copy(item: Tuple[Path, Path]) -> None:
+        nonlocal files_copied, bytes_copied
+        src, dst = item
+        size = copy_file(src, dst, chunk_size=chunk_size)
+        with lock:
+            files_copied += 1
+            bytes_copied += size or 0
+            event = CopyProgress(src, dst, size, files_copied, bytes_copied)
+        if progress is not None:
+            progress(event)
+
+    return run_bounded(copy, files(), max_workers=max_workers)
+
+
+def copy_path(
+    source: Union[Text, Path],
+    target: Union[Text, Path],
+    *,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[ProgressCallback] = None,
+) -> Path:
+    source, target = as_path(source), as_path(target)
+    # Most copies are single files, so a prefix listing is only a fallback
+    if source._urlpath.endswith("/") or (not source.is_file() and source.is_dir()):
+        copytree(
+            source,
+            target,
+            max_workers=max_workers,
+            chunk_size=chunk_size,
+            progress=progress,
+        )
+        return target
+    size = copy_file(source, target, chunk_size=chunk_size)
+    if progress is not None:
+        progress(CopyProgress(source, target, size, 1, size or 0))
+    return target
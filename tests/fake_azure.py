@@ -0,0 +1,276 @@
+import base64
+import hashlib
+import re
+import threading
+import time
+from email.utils import formatdate
+from typing import Dict, List, Optional, Text, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+import requests
+from azure.core.pipeline.transport import HttpTransport, RequestsTransportResponse
+from azure.storage.blob import BlobServiceClient
+
+ACCOUNT_NAME = "devstoreaccount1"
+ACCOUNT_KEY = base64.b64encode(b"cloudfs-test-key").decode()
+
+
+class FakeAzureTransport(HttpTransport):
+    """In-memory stand-in for the Blob service REST API used by AzurePath."""
+
+    def __init__(self, containers: Tuple[Text, ...] = ()):
+        self.containers: Dict[Text, Dict[Text, Dict]] = {
+            name: {} for name in containers
+        }
+        self.blocks: Dict[Tuple[Text, Text], Dict[Text, bytes]] = {}
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._counter = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send(self, request, **kwargs):
+        with self._lock:
+            self.request_count += 1
+            status, headers, body = self._handle(
+                request.method, request.url, request.headers, _read_body(request.body)
+            )
+        response = requests.Response()
+        response.status_code = status
+        response.reason = {200: "OK", 201: "Created", 202: "Accepted"}.get(
+            status, "Error"
+        )
+        response.headers.update(headers)
+        response.headers.setdefault("Content-Length", str(len(body)))
+        response.headers["x-ms-request-id"] = "fake"
+        response.headers["x-ms-version"] = request.headers.get("x-ms-version", "")
+        response._content = body
+        response._content_consumed = True
+        response.url = request.url
+        return RequestsTransportResponse(request, response)
+
+    def _handle(self, method: Text, url: Text, headers, body: bytes):
+        parts = urlsplit(url)
+        query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        container_name, _, blob_name = unquote(parts.path).lstrip("/").partition("/")
+        container = self.containers.get(container_name)
+        if container is None:
+            return _error(404, "ContainerNotFound")
+
+        if query.get("comp") == "batch":
+            return self._batch(body)
+        if query.get("restype") == "container":
+            if query.get("comp") == "list":
+                return self._list(container_name, container, query)
+            return 200, {"ETag": '"container"', "Last-Modified": _httpdate()}, b""
+
+        key = (container_name, blob_name)
+        blob = container.get(blob_name)
+        if method == "PUT" and query.get("comp") == "block":
+            self.blocks.setdefault(key, {})[query["blockid"]] = body
+            return 201, {}, b""
+        if method == "PUT" and query.get("comp") == "blocklist":
+            staged = self.blocks.pop(key, {})
+            block_ids = [node.text for node in ElementTree.fromstring(body)]
+            data = b"".join(staged[block_id] for block_id in block_ids)
+            content_md5 = headers.get("x-ms-blob-content-md5")
+            return self._put(container, blob_name, data, content_md5)
+        if method == "PUT" and "x-ms-copy-source" in headers:
+            source = urlsplit(headers["x-ms-copy-source"])
+            source_container, _, source_name = (
+                unquote(source.path).lstrip("/").partition("/")
+            )
+            source_blob = self.containers.get(source_container, {}).get(source_name)
+            if source_blob is None:
+                return _error(404, "CannotVerifyCopySource")
+            status, response_headers, _ = self._put(
+                container, blob_name, source_blob["data"], source_blob["md5"]
+            )
+            response_headers.update(
+                {"x-ms-copy-id": "copy", "x-ms-copy-status": "success"}
+            )
+            return 202, response_headers, b""
+        if method == "PUT":
+            md5 = base64.b64encode(hashlib.md5(body).digest()).decode()
+            return self._put(container, blob_name, body, md5)
+
+        if blob is None:
+            return _error(404, "BlobNotFound")
+        if headers.get("If-Match") not in (None, "*", blob["etag"]):
+            return _error(412, "ConditionNotMet")
+        if method == "DELETE":
+            del container[blob_name]
+            return 202, {}, b""
+        if method == "HEAD":
+            return 200, _blob_headers(blob), b""
+        if method == "GET":
+            data = blob["data"]
+            match = re.match(r"bytes=(\d+)-(\d*)", headers.get("x-ms-range", ""))
+            if match is None:
+                return 200, _blob_headers(blob), data
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else len(data) - 1
+            if start >= len(data):
+                return _error(416, "InvalidRange")
+            end = min(end, len(data) - 1)
+            response_headers = _blob_headers(blob)
+            response_headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+            response_headers["Content-Length"] = str(end - start + 1)
+            return 206, response_headers, data[start : end + 1]
+        return _error(400, "UnsupportedOperation")
+
+    def _put(self, container: Dict, blob_name: Text, data: bytes, md5: Optional[Text]):
+        self._counter += 1
+        now = time.time()
+        previous = container.get(blob_name)
+        container[blob_name] = {
+            "data": data,
+            "md5": md5,
+            "etag": f'"0x{self._counter:016X}"',
+            "mtime": now,
+            "ctime": previous["ctime"] if previous else now,
+        }
+        headers = {
+            "ETag": container[blob_name]["etag"],
+            "Last-Modified": _httpdate(now),
+        }
+        if md5:
+            headers["Content-MD5"] = md5
+        return 201, headers, b""
+
+    def _list(self, container_name: Text, container: Dict, query: Dict):
+        prefix = query.get("prefix", "")
+        delimiter = query.get("delimiter")
+        max_results = int(query.get("maxresults", 5000))
+        marker = query.get("marker", "")
+
+        entries: List[Tuple[Text, Optional[Dict]]] = []
+        for name in sorted(container):
+            if not name.startswith(prefix):
+                continue
+            if delimiter and delimiter in name[len(prefix) :]:
+                index = name.index(delimiter, len(prefix))
+                entry = name[: index + 1]
+                if not entries or entries[-1][0] != entry:
+                    entries.append((entry, None))
+            else:
+                entries.append((name, container[name]))
+        entries = [entry for entry in entries if entry[0] > marker]
+
+        page, rest = entries[:max_results], entries[max_results:]
+        items = []
+        for name, blob in page:
+            if blob is None:
+                items.append(f"<BlobPrefix><Name>{escape(name)}</Name></BlobPrefix>")
+                continue
+            md5 = f"<Content-MD5>{blob['md5']}</Content-MD5>" if blob["md5"] else ""
+            items.append(
+                f"<Blob><Name>{escape(name)}</Name><Properties>"
+                f"<Creation-Time>{_httpdate(blob['ctime'])}</Creation-Time>"
+                f"<Last-Modified>{_httpdate(blob['mtime'])}</Last-Modified>"
+                f"<Etag>{blob['etag']}</Etag>"
+                f"<Content-Length>{len(blob['data'])}</Content-Length>"
+                f"<Content-Type>application/octet-stream</Content-Type>{md5}"
+                f"<BlobType>BlockBlob</BlobType></Properties></Blob>"
+            )
+        next_marker = page[-1][0] if rest else ""
+        body = (
+            '<?xml version="1.0" encoding="utf-8"?>'
+            f'<EnumerationResults ServiceEndpoint="https://{ACCOUNT_NAME}'
+            f'.blob.core.windows.net/" ContainerName="{container_name}">'
+            f"<Prefix>{escape(prefix)}</Prefix><MaxResults>{max_results}</MaxResults>"
+            + (f"<Delimiter>{delimiter}</Delimiter>" if delimiter else "")
+            + f"<Blobs>{''.join(items)}</Blobs>"
+            f"<NextMarker>{escape(next_marker)}</NextMarker></EnumerationResults>"
+        )
+        return 200, {"Content-Type": "application/xml"}, body.encode()
+
+    def _batch(self, body: bytes):
+        boundary = "batchresponse_fake"
+        parts = []
+        for index, path in enumerate(
+            re.findall(rb"^DELETE (\S+) HTTP/1.1", body, re.MULTILINE)
+        ):
+            container_name, _, blob_name = (
+                unquote(urlsplit(path.decode()).path).lstrip("/").partition("/")
+            )
+            container = self.containers.get(container_name, {})
+            if container.pop(blob_name, None) is None:
+                status = "404 The specified blob does not exist."
+                extra = "x-ms-error-code: BlobNotFound\r\n"
+            else:
+                status = "202 Accepted"
+                extra = "x-ms-delete-type-permanent: true\r\n"
+            parts.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\n"
+                f"Content-ID: {index}\r\n\r\nHTTP/1.1 {status}\r\n{extra}"
+                f"x-ms-request-id: fake\r\nx-ms-version: 2021-12-02\r\n"
+                f"Content-Length: 0\r\n\r\n"
+            )
+        response = "".join(parts) + f"--{boundary}--\r\n"
+        return (
+            202,
+            {"Content-Type": f"multipart/mixed; boundary={boundary}"},
+            response.encode(),
+        )
+
+
+def make_client(transport: FakeAzureTransport, **kwargs) -> BlobServiceClient:
+    return BlobServiceClient(
+        f"https://{ACCOUNT_NAME}.blob.core.windows.net",
+        credential={"account_name": ACCOUNT_NAME, "account_key": ACCOUNT_KEY},
+        transport=transport,
+        **kwargs,
+    )
+
+
+def _read_body(body) -> bytes:
+    if body is None:
+        return b""
+    if isinstance(body, (bytes, bytearray)):
+        return bytes(body)
+    if isinstance(body, str):
+        return body.encode()
+    if hasattr(body, "read"):
+        return body.read()
+    return b"".join(body)
+
+
+def _httpdate(timestamp: Optional[float] = None) -> Text:
+    return formatdate(timestamp if timestamp is not None else time.time(), usegmt=True)
+
+
+def _blob_headers(blob: Dict) -> Dict[Text, Text]:
+    headers = {
+        "ETag": blob["etag"],
+        "Last-Modified": _httpdate(blob["mtime"]),
+        "x-ms-creation-time": _httpdate(blob["ctime"]),
+        "x-ms-blob-type": "BlockBlob",
+        "Content-Type": "application/octet-stream",
+        "Content-Length": str(len(blob["data"])),
+        "Accept-Ranges": "bytes",
+    }
+    if blob["md5"]:
+        headers["Content-MD5"] = blob["md5"]
+    return headers
+
+
+def _error(status: int, code: Text):
+    body = f"<?xml version='1.0'?><Error><Code>{code}</Code><Message>{code}</Message>"
+    return (
+        status,
+        {"x-ms-error-code": code, "Content-Type": "application/xml"},
+        (body + "</Error>").encode(),
+    )
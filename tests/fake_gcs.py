@@ -0,0 +1,444 @@
+import base64
+import bisect
+import hashlib
+import json
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Text, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import google_crc32c
+from google.auth.credentials import AnonymousCredentials
+from google.cloud.storage import Client
+
+
+def _now() -> Text:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+class FakeGCSServer:
+    """In-process stand-in for the GCS JSON API used by GSPath."""
+
+    def __init__(self, host: Text = "127.0.0.1", port: int = 0):
+        self.buckets: Dict[Text, Dict[Text, Tuple[bytes, Dict]]] = {}
+        self.uploads: Dict[Text, Dict] = {}
+        self.lock = threading.RLock()
+        self.request_count = 0
+        self.generation = 1
+        self.version = 0
+        self._names: Dict[Text, Tuple[int, List[Text]]] = {}
+        self.max_rewrite_bytes: Optional[int] = None
+        # Fault injection, the next N requests fail with 503 or are delayed
+        self.fail_requests = 0
+        self.slow_requests = 0
+        self.slow_delay = 1.0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _handle(self):
+                with server.lock:
+                    server.request_count += 1
+                    fail = server.fail_requests > 0
+                    server.fail_requests -= fail
+                    slow = server.slow_requests > 0
+                    server.slow_requests -= slow
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                if slow:
+                    time.sleep(server.slow_delay)
+                if fail:
+                    status, headers, payload = server._error(503, "Backend Error")
+                else:
+                    status, headers, payload = server.dispatch(
+                        self.command, self.path, dict(self.headers), body
+                    )
+                self.send_response(status)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PUT = do_DELETE = do_PATCH = _handle
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> Text:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeGCSServer":
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def create_bucket(self, name: Text) -> None:
+        self.buckets.setdefault(name, {})
+
+    def put_object(self, bucket: Text, name: Text, data: bytes) -> None:
+        self._store(bucket, name, data, {})
+
+    def _resource(self, bucket: Text, name: Text, meta: Dict) -> Dict:
+        return dict(meta, bucket=bucket, name=name, kind="storage#object")
+
+    def _store(self, bucket: Text, name: Text, data: bytes, extra: Dict) -> Dict:
+        with self.lock:
+            self.generation += 1
+            self.version += 1
+            now = _now()
+            crc = google_crc32c.value(data).to_bytes(4, "big")
+            meta = {
+                "size": str(len(data)),
+                "generation": str(self.generation),
+                "metageneration": "1",
+                "md5Hash": base64.b64encode(hashlib.md5(data).digest()).decode(),
+                "crc32c": base64.b64encode(crc).decode(),
+                "updated": now,
+                "timeCreated": now,
+                "contentType": extra.get("contentType") or "application/octet-stream",
+                "etag": str(self.generation),
+                "owner": {"entity": "user-fake"},
+            }
+            if extra.get("metadata"):
+                meta["metadata"] = extra["metadata"]
+            if extra.get("_no_md5"):
+                meta.pop("md5Hash")
+            self.buckets.setdefault(bucket, {})[name] = (data, meta)
+            return self._resource(bucket, name, meta)
+
+    def _json(self, status: int, obj) -> Tuple[int, Dict, bytes]:
+        return status, {"Content-Type": "application/json"}, json.dumps(obj).encode()
+
+    def _error(self, status: int, message: Text) -> Tuple[int, Dict, bytes]:
+        return self._json(
+            status, {"error": {"code": status, "message": message, "errors": []}}
+        )
+
+    def _check_precondition(self, bucket, name, query) -> Optional[Tuple]:
+        match = query.get("ifGenerationMatch")
+        if match is None:
+            return None
+        current = self.buckets.get(bucket, {}).get(name)
+        current_gen = current[1]["generation"] if current else "0"
+        if str(match) != str(current_gen):
+            return self._error(412, "Precondition Failed")
+        return None
+
+    def dispatch(self, method, raw_path, headers, body):
+        parts = urlsplit(raw_path)
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        path = parts.path
+        if path.startswith("/batch/storage/v1"):
+            return self._batch(headers, body)
+        m = re.match(r"^/upload/storage/v1/b/([^/]+)/o$", path)
+        if m:
+            return self._upload(method, m.group(1), query, headers, body)
+        if path.startswith("/upload/resumable/"):
+            return self._resumable_put(path.rsplit("/", 1)[-1], headers, body)
+        m = re.match(r"^/storage/v1/b/([^/]+)/o/(.+)/rewriteTo/b/([^/]+)/o/(.+)$", path)
+        if m and method == "POST":
+            return self._rewrite(
+                m.group(1), unquote(m.group(2)), m.group(3), unquote(m.group(4)), query
+            )
+        m = re.match(r"^/storage/v1/b/([^/]+)/o/(.+)/compose$", path)
+        if m and method == "POST":
+            return self._compose(m.group(1), unquote(m.group(2)), query, body)
+        m = re.match(r"^(/download)?/storage/v1/b/([^/]+)/o/(.+)$", path)
+        if m:
+            return self._object(
+                method, m.group(2), unquote(m.group(3)), query, headers, body
+            )
+        m = re.match(r"^/storage/v1/b/([^/]+)/o$", path)
+        if m and method == "GET":
+            return self._list(m.group(1), query)
+        m = re.match(r"^/storage/v1/b/([^/]+)$", path)
+        if m and method == "GET":
+            if m.group(1) not in self.buckets:
+                return self._error(404, "No such bucket")
+            return self._json(200, {"kind": "storage#bucket", "name": m.group(1)})
+        return self._error(404, f"Unknown endpoint {method} {path}")
+
+    def _object(self, method, bucket, name, query, headers, body):
+        with self.lock:
+            entry = self.buckets.get(bucket, {}).get(name)
+        if method == "DELETE":
+            if entry is None:
+                return self._error(404, "No such object")
+            with self.lock:
+                self.buckets[bucket].pop(name, None)
+                self.version += 1
+            return 204, {}, b""
+        if method == "PATCH":
+            if entry is None:
+                return self._error(404, "No such object")
+            patch = json.loads(body or b"{}")
+            data, meta = entry
+            if "metadata" in patch:
+                meta = dict(meta, metadata=patch["metadata"])
+                self.buckets[bucket][name] = (data, meta)
+            return self._json(200, self._resource(bucket, name, meta))
+        if entry is None:
+            return self._error(404, "No such object")
+        data, meta = entry
+        if query.get("alt") == "media":
+            status = 200
+            out_headers = {
+                "Content-Type": meta["contentType"],
+                "x-goog-generation": meta["generation"],
+                "x-goog-hash": f"crc32c={meta['crc32c']}"
+                + (f",md5={meta['md5Hash']}" if "md5Hash" in meta else ""),
+            }
+            rng = headers.get("Range") or headers.get("range")
+            if rng:
+                m = re.match(r"bytes=(\d*)-(\d*)", rng)
+                start = int(m.group(1)) if m.group(1) else 0
+                end = int(m.group(2)) if m.group(2) else len(data) - 1
+                if start >= len(data) and len(data) > 0:
+                    return 416, {}, b""
+                end = min(end, len(data) - 1)
+                status = 206
+                out_headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+                data = data[start : end + 1]
+                out_headers.pop("x-goog-hash")
+            return status, out_headers, data
+        return self._json(200, self._resource(bucket, name, meta))
+
+    def _list(self, bucket, query):
+        if bucket not in self.buckets:
+            return self._error(404, "No such bucket")
+        prefix = query.get("prefix", "")
+        delimiter = query.get("delimiter")
+        max_results = int(query.get("maxResults", 1000))
+        names = self._sorted_names(bucket)
+
+        i = bisect.bisect_left(names, max(prefix, query.get("startOffset") or ""))
+        if query.get("pageToken"):
+            i = max(i, bisect.bisect_right(names, query["pageToken"]))
+        items, prefixes = [], []
+        last, next_token = None, None
+        while i < len(names) and names[i].startswith(prefix):
+            name = names[i]
+            if len(items) + len(prefixes) >= max_results:
+                next_token = last
+                break
+            index = name.find(delimiter, len(prefix)) if delimiter else -1
+            if index >= 0:
+                prefixes.append(name[: index + len(delimiter)])
+                # Skip every name under the collapsed prefix
+                last = prefixes[-1] + "\U0010ffff"
+                i = bisect.bisect_left(names, last, i)
+                continue
+            entry = self.buckets[bucket].get(name)
+            if entry is not None:
+                items.append(self._resource(bucket, name, entry[1]))
+            last = name
+            i += 1
+
+        response = {"kind": "storage#objects"}
+        if items:
+            response["items"] = items
+        if prefixes:
+            response["prefixes"] = prefixes
+        if next_token:
+            response["nextPageToken"] = next_token
+        return self._json(200, response)
+
+    def _sorted_names(self, bucket: Text) -> List[Text]:
+        with self.lock:
+            cached = self._names.get(bucket)
+            if cached is None or cached[0] != self.version:
+                cached = (self.version, sorted(self.buckets[bucket]))
+                self._names[bucket] = cached
+            return cached[1]
+
+    def _upload(self, method, bucket, query, headers, body):
+        upload_type = query.get("uploadType")
+        if upload_type == "multipart":
+            ctype = headers.get("content-type") or headers.get("Content-Type")
+            msg = BytesParser().parsebytes(
+                b"Content-Type: " + ctype.encode() + b"\r\n\r\n" + body
+            )
+            parts = msg.get_payload()
+            meta = json.loads(parts[0].get_payload(decode=True))
+            data = parts[1].get_payload(decode=True)
+            name = meta["name"]
+            pre = self._check_precondition(bucket, name, query)
+            if pre:
+                return pre
+            return self._json(200, self._store(bucket, name, data, meta))
+        if upload_type == "media":
+            name = query["name"]
+            return self._json(200, self._store(bucket, name, body, {}))
+        if upload_type == "resumable":
+            meta = json.loads(body or b"{}")
+            name = meta.get("name") or query.get("name")
+            pre = self._check_precondition(bucket, name, query)
+            if pre:
+                return pre
+            upload_id = uuid.uuid4().hex
+            self.uploads[upload_id] = {
+                "bucket": bucket,
+                "name": name,
+                "meta": meta,
+                "data": bytearray(),
+            }
+            return (
+                200,
+                {"Location": f"{self.url}/upload/resumable/{upload_id}"},
+                b"",
+            )
+        return self._error(400, "bad upload")
+
+    def _resumable_put(self, upload_id, headers, body):
+        upload = self.uploads.get(upload_id)
+        if upload is None:
+            return self._error(404, "no upload")
+        crange = headers.get("content-range") or headers.get("Content-Range") or ""
+        m = re.match(r"bytes (\*|(\d+)-(\d+))/(\*|\d+)", crange)
+        if m and m.group(2) is not None:
+            upload["data"][int(m.group(2)) :] = b""
+            upload["data"] += body
+        total = m.group(4) if m else "*"
+        if total != "*" and len(upload["data"]) >= int(total):
+            self.uploads.pop(upload_id)
+            res = self._store(
+                upload["bucket"], upload["name"], bytes(upload["data"]), upload["meta"]
+            )
+            return self._json(200, res)
+        return (
+            308,
+            {"Range": f"bytes=0-{len(upload['data']) - 1}"} if upload["data"] else {},
+            b"",
+        )
+
+    def _rewrite(self, sbucket, sname, dbucket, dname, query):
+        with self.lock:
+            entry = self.buckets.get(sbucket, {}).get(sname)
+        if entry is None:
+            return self._error(404, "No such object")
+        pre = self._check_precondition(dbucket, dname, query)
+        if pre:
+            return pre
+        data, meta = entry
+        done_bytes = int(query.get("rewriteToken") or 0)
+        step = self.max_rewrite_bytes or len(data) or 1
+        done_bytes = min(len(data), done_bytes + step)
+        if done_bytes < len(data):
+            return self._json(
+                200,
+                {
+                    "kind": "storage#rewriteResponse",
+                    "totalBytesRewritten": str(done_bytes),
+                    "objectSize": str(len(data)),
+                    "done": False,
+                    "rewriteToken": str(done_bytes),
+                },
+            )
+        res = self._store(
+            dbucket,
+            dname,
+            data,
+            {"contentType": meta["contentType"], "metadata": meta.get("metadata")},
+        )
+        return self._json(
+            200,
+            {
+                "kind": "storage#rewriteResponse",
+                "totalBytesRewritten": str(len(data)),
+                "objectSize": str(len(data)),
+                "done": True,
+                "resource": res,
+            },
+        )
+
+    def _compose(self, bucket, name, query, body):
+        req = json.loads(body)
+        chunks = []
+        for src in req["sourceObjects"]:
+            entry = self.buckets.get(bucket, {}).get(src["name"])
+            if entry is None:
+                return self._error(404, "No such object")
+            chunks.append(entry[0])
+        if len(chunks) > 32:
+            return self._error(400, "too many components")
+        dest = req.get("destination") or {}
+        return self._json(
+            200,
+            self._store(
+                bucket,
+                name,
+                b"".join(chunks),
+                {
+                    "contentType": dest.get("contentType"),
+                    "metadata": dest.get("metadata"),
+                    "_no_md5": True,
+                },
+            ),
+        )
+
+    def _batch(self, headers, body):
+        ctype = headers.get("content-type") or headers.get("Content-Type")
+        msg = BytesParser().parsebytes(
+            b"Content-Type: " + ctype.encode() + b"\r\n\r\n" + body
+        )
+        out = []
+        boundary = "batch_fake_boundary"
+        for i, part in enumerate(msg.get_payload()):
+            raw = part.get_payload(decode=True)
+            if raw is None:
+                raw = part.get_payload().encode()
+            head, _, sub_body = raw.partition(b"\r\n\r\n")
+            if not _:
+                head, _, sub_body = raw.partition(b"\n\n")
+            lines = head.decode().splitlines()
+            method, url = lines[0].split(" ")[:2]
+            sub_headers = {}
+            for line in lines[1:]:
+                if ":" in line:
+                    k, v = line.split(":", 1)
+                    sub_headers[k.strip()] = v.strip()
+            url_parts = urlsplit(url)
+            path = url_parts.path
+            if url_parts.query:
+                path += "?" + url_parts.query
+            status, _h, payload = self.dispatch(method, path, sub_headers, sub_body)
+            out.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\n"
+                f"Content-ID: <response-{i + 1}>\r\n\r\n"
+                f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n\r\n".encode() + payload + b"\r\n"
+            )
+        payload = (
+            b"".join((o if isinstance(o, bytes) else o.encode()) for o in out)
+            + f"--{boundary}--\r\n".encode()
+        )
+        return (
+            200,
+            {"Content-Type": f"multipart/mixed; boundary={boundary}"},
+            payload,
+        )
+
+
+def make_client(server: FakeGCSServer) -> Client:
+    return Client(
+        project="test",
+        credentials=AnonymousCredentials(),
+        client_options={"api_endpoint": server.url},
+    )
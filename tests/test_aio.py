@@ -0,0 +1,163 @@
+import asyncio
+import pathlib
+import time
+
+import pytest
+
+from cloudfs import Path
+from cloudfs.aio import AsyncGSPath, AsyncLocalPath, AsyncPath
+from cloudfs.retry import RetryPolicy
+from tests.fake_gcs import FakeGCSServer, make_client
+
+
+def test_async_gs_path():
+    server = FakeGCSServer().start()
+    server.create_bucket("cloudfs-test")
+    client = make_client(server)
+
+    async def main():
+        async with AsyncPath("gs://cloudfs-test/aio", storage_client=client) as root:
+            assert isinstance(root, AsyncGSPath)
+            assert (
+                AsyncPath(Path("gs://cloudfs-test/aio", storage_client=client)) == root
+            )
+
+            # test many concurrent object operations over one pooled session
+            files = [root / "many" / str(i) for i in range(300)]
+            await asyncio.gather(*(f.write_bytes(str(f).encode()) for f in files))
+            data = await asyncio.gather(*(f.read_bytes() for f in files))
+            assert data == [str(f).encode() for f in files]
+
+            assert await (root / "many").is_dir()
+            assert await files[0].exists() and await files[0].is_file()
+            assert (await files[1].stat())["size"] == len(str(files[1]))
+            names = sorted([str(p) async for p in (root / "many").iterdir()])
+            assert names == sorted(str(f) for f in files)
+
+            # test glob and mkdir, the placeholder object stays hidden
+            await (root / "dir").mkdir()
+            await (root / "dir" / "a.txt").write_text("a")
+            globbed = sorted([str(p) async for p in root.glob("*/1?")])
+            assert globbed == [f"gs://cloudfs-test/aio/many/{i}" for i in range(10, 20)]
+            assert [str(p) async for p in root.glob("dir/*")] == [
+                "gs://cloudfs-test/aio/dir/a.txt"
+            ]
+            assert await (root / "dir" / "a.txt").read_text() == "a"
+
+            # test streaming open, written in resumable chunks and read by range
+            payload = bytes(range(256)) * 2400
+            async with (root / "stream").open("wb", chunk_size=256 * 1024) as f:
+                for i in range(0, len(payload), 100_000):
+                    await f.write(payload[i : i + 100_000])
+            async with (root / "stream").open("rb", chunk_size=100_000) as f:
+                assert await f.read(10) == payload[:10]
+                await f.seek(300_000)
+                assert await f.read(1000) == payload[300_000:301_000]
+                await f.seek(0)
+                assert await f.read() == payload
+
+            await files[0].unlink()
+            assert not await files[0].exists()
+            with pytest.raises(FileNotFoundError):
+                await files[0].read_bytes()
+            await files[0].unlink(missing_ok=True)
+
+            # nested paths share the pooled session, the outermost one closes it
+            session = root.session
+            async with root / "many" as nested:
+                assert nested.session is session
+            assert not session._session.closed
+        assert session._session.closed and session.users == 0
+
+    try:
+        asyncio.run(main())
+    finally:
+        server.stop()
+
+
+def test_async_gs_retry_policy():
+    server = FakeGCSServer().start()
+    server.create_bucket("cloudfs-test")
+    client = make_client(server)
+
+    def open_path(policy: RetryPolicy) -> AsyncPath:
+        return AsyncPath(
+            Path(
+                "gs://cloudfs-test/retry/a", storage_client=client, retry_policy=policy
+            )
+        )
+
+    async def main():
+        policy = RetryPolicy(initial_backoff=0.01, max_backoff=0.05, deadline=10)
+        async with open_path(policy) as path:
+            assert path.session.retry_policy is policy
+
+            # transient errors are retried within the path's deadline, unguarded
+            # writes are not
+            server.fail_requests = 1
+            with pytest.raises(OSError):
+                await path.write_bytes(b"data")
+            await path.write_bytes(b"data")
+            server.fail_requests = 2
+            assert await path.read_bytes() == b"data"
+
+            # a zero deadline gives up on the first failure, the timeout is honored
+            strict = RetryPolicy(deadline=0, timeout=0.2)
+            async with open_path(strict) as strict_path:
+                assert strict_path.session is not path.session
+                server.fail_requests = 1
+                with pytest.raises(OSError):
+                    await strict_path.read_bytes()
+                server.slow_requests = 1
+                with pytest.raises(asyncio.TimeoutError):
+                    await strict_path.read_bytes()
+
+            # writes guarded by generation preconditions are retried
+            async with open_path(RetryPolicy(precondition_writes=True)) as guarded:
+                server.fail_requests = 2
+                await guarded.write_bytes(b"new")
+            assert await path.read_bytes() == b"new"
+
+        # slow requests are hedged once enough latencies are recorded
+        hedged = RetryPolicy(hedge_percentile=0.9, hedge_min_samples=5)
+        async with open_path(hedged) as path:
+            for _ in range(5):
+                assert await path.read_bytes() == b"new"
+            server.slow_delay = 2.0
+            server.slow_requests = 1
+            start = time.perf_counter()
+            assert await path.read_bytes() == b"new"
+            assert time.perf_counter() - start < 1.5
+            assert hedged.hedges == hedged.hedge_wins == 1
+
+    try:
+        asyncio.run(main())
+    finally:
+        server.stop()
+
+
+def test_async_local_path(tmp_path: pathlib.Path):
+    async def main():
+        root = AsyncPath(tmp_path.as_uri())
+        assert isinstance(root, AsyncLocalPath)
+        files = [root / "many" / str(i) for i in range(300)]
+        await (root / "many").mkdir()
+        await asyncio.gather(*(f.write_text(str(i)) for i, f in enumerate(files)))
+        data = await asyncio.gather(*(f.read_text() for f in files))
+        assert data == [str(i) for i in range(300)]
+        assert (await files[10].stat())["st_size"] == 2
+
+        assert len([p async for p in (root / "many").iterdir()]) == 300
+        globbed = sorted([str(p) async for p in root.glob("many/1?")])
+        assert globbed == sorted(str(root / "many" / str(i)) for i in range(10, 20))
+
+        async with (root / "stream").open("wb") as f:
+            await f.write(b"hello world")
+        async with (root / "stream").open("rb") as f:
+            await f.seek(6)
+            assert await f.read() == b"world"
+
+        await files[0].unlink()
+        assert not await files[0].exists()
+
+    asyncio.run(main())
@@ -0,0 +1,163 @@
+import hashlib
+import os
+
+import pytest
+
+from cloudfs import Path
+from cloudfs.azure import AzurePath, client_registry
+from tests.fake_azure import FakeAzureTransport, make_client
+
+test_container_name = "cloudfs-test"
+
+
+@pytest.fixture(scope="module")
+def transport():
+    return FakeAzureTransport(containers=(test_container_name,))
+
+
+@pytest.fixture(scope="module")
+def test_dir(transport: "FakeAzureTransport"):
+    client = make_client(
+        transport, max_single_get_size=1024 * 1024, max_chunk_get_size=1024 * 1024
+    )
+    return Path(f"azure://{test_container_name}/test", blob_service_client=client)
+
+
+def test_azure_client_registry(monkeypatch):
+    monkeypatch.delenv("AZURE_STORAGE_CONNECTION_STRING", raising=False)
+    monkeypatch.delenv("AZURE_STORAGE_ACCOUNT_URL", raising=False)
+    client_registry.clear()
+    account_url = "https://devstoreaccount1.blob.core.windows.net"
+    client = client_registry.get_client(account_url=account_url)
+    assert client_registry.get_client(account_url=account_url) is client
+    assert client_registry.get_client(account_url=account_url, credential="key")
+    assert len(client_registry) == 2
+    path = Path(f"azure://{test_container_name}/test", account_url=account_url)
+    assert path.client is client
+    client_registry.clear()
+    with pytest.raises(ValueError):
+        Path(f"azure://{test_container_name}/test")
+
+
+def test_azure_path_basic_operations(
+    test_dir: "AzurePath", transport: "FakeAzureTransport"
+):
+    path = test_dir
+    assert type(path) == AzurePath
+    assert path.ping()
+
+    # test create file and directory
+    filepath = path / "test_create_file"
+    filepath.touch()
+    assert filepath.exists()
+    assert filepath.is_file()
+    dirpath = path / "test_create_dir"
+    dirpath.mkdir()
+    assert dirpath.is_dir()
+    assert not dirpath.is_file()
+
+    # test write and read
+    filepath = path / "test_bytes"
+    assert filepath.write_bytes(b"test")
+    assert filepath.read_bytes() == b"test"
+    assert filepath.stat()["size"] == 4
+    assert filepath.md5() == "098f6bcd4621d373cade4e832627b4f6"
+    assert filepath.samefile(str(filepath))
+    filepath = path / "test_text"
+    assert filepath.write_text("test")
+    assert filepath.read_text() == "test"
+
+    # test block upload, chunked download and ranged reads
+    data = os.urandom(5 * 1024 * 1024 + 123)
+    filepath = AzurePath(
+        str(path / "test_blocks"),
+        blob_service_client=path.client,
+        block_size=1024 * 1024,
+        max_concurrency=4,
+    )
+    filepath.write_bytes(data)
+    assert filepath.read_bytes() == data
+    assert filepath.md5() == hashlib.md5(data).hexdigest()
+    with filepath.open("wb") as f:
+        for i in range(0, len(data), 1024 * 1024):
+            f.write(data[i : i + 1024 * 1024])
+    with filepath.open("rb", chunk_size=1024 * 1024) as f:
+        assert f.read(10) == data[:10]
+        f.seek(3 * 1024 * 1024)
+        assert f.read(10) == data[3 * 1024 * 1024 : 3 * 1024 * 1024 + 10]
+        f.seek(0)
+        assert f.read() == data
+
+    # test distinct blobs with equal content compare by content
+    twin = path / "test_blocks_twin"
+    twin.write_bytes(data)
+    assert twin.samefile(filepath) and filepath.samefile(twin)
+    other = path / "test_blocks_other"
+    other.write_bytes(data[:-1] + b"!")
+    assert not other.samefile(filepath)
+    with (path / "test_open_text").open("w") as f:
+        f.write("line1\nline2\n")
+    with (path / "test_open_text").open() as f:
+        assert f.readlines() == ["line1\n", "line2\n"]
+
+    # test remove file and directory
+    filepath = path / "test_remove"
+    filepath.touch()
+    filepath.unlink()
+    assert not filepath.exists()
+    filepath.unlink(missing_ok=True)
+    with pytest.raises(FileNotFoundError):
+        filepath.unlink()
+    dirpath = path / "test_remove_dir"
+    dirpath.mkdir()
+    dirpath.rmdir()
+    assert not dirpath.is_dir()
+
+    # test touch on a path that carries a listed blob
+    filepath = path / "test_touch_listed"
+    filepath.write_bytes(b"test")
+    listed = next(p for p in path.iterdir() if p == filepath)
+    listed.unlink()
+    listed.touch()
+    assert listed.stat()["size"] == 0
+
+    # test copy, rename and replace
+    filepath = path / "test_copy"
+    filepath.write_bytes(b"copy")
+    copied = filepath.copy(path / "test_copy_new")
+    assert copied.read_bytes() == b"copy"
+    renamed = copied.rename(path / "test_rename_new")
+    assert not copied.exists()
+    assert renamed.replace(filepath) == filepath
+    assert not renamed.exists()
+
+    # test glob, iterdir and walk
+    dirpath = path / "test_glob"
+    for i in range(10):
+        (dirpath / f"test_glob_{i}").touch()
+        (dirpath / "test_glob_nested" / f"test_glob_nested_{i}").touch()
+    (dirpath / "test_glob_empty").mkdir()
+    assert len(list(dirpath.glob("*"))) == 12
+    assert len(list(dirpath.glob("*", return_file=False))) == 2
+    assert len(list(dirpath.glob("**/*"))) == 22
+    assert len(list(dirpath.glob("test_glob_{1,2,nested}"))) == 3
+    assert len(list(dirpath.glob("test_glob_nested/test_*_[0-4]"))) == 5
+    assert len(list(dirpath.iterdir())) == 12
+    walked = list(dirpath.walk())
+    assert walked[0][1] == ["test_glob_empty", "test_glob_nested"]
+    assert len(walked[2][2]) == 10
+
+    # test one delimited listing per iterdir, with metadata kept on the entries
+    count = transport.request_count
+    sizes = [p.stat()["size"] for p in dirpath.iterdir(page_size=5) if p.is_file()]
+    assert sizes == [0] * 10
+    assert transport.request_count - count == 3
+
+    # test moving a directory and rmtree
+    moved = dirpath.rename(path / "test_glob_moved", max_workers=4)
+    assert not dirpath.is_dir()
+    assert len(list(moved.glob("**/*"))) == 22
+    moved.rmtree()
+    assert not moved.is_dir()
+    with pytest.raises(FileNotFoundError):
+        moved.rmtree()
@@ -0,0 +1,175 @@
+import json
+import os
+import pathlib
+import pickle
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from google.cloud.storage import Client
+
+from cloudfs import Path
+from cloudfs.gs import client_registry
+from cloudfs.retry import RetryPolicy
+from tests.fake_gcs import FakeGCSServer, make_client
+
+
+def test_read_write_many(tmp_path: pathlib.Path):
+    server = FakeGCSServer().start()
+    server.create_bucket("cloudfs-test")
+    client = make_client(server)
+    gs_dir = Path("gs://cloudfs-test/bulk", storage_client=client)
+    local_dir = Path(tmp_path.as_uri())
+
+    try:
+        for root in (gs_dir, local_dir):
+            items = [(root / f"{i}.json", b'{"i": %d}' % i) for i in range(200)]
+            results = Path.write_many(items, max_workers=8, max_bytes=64)
+            assert [r.path for r in results] == [path for path, _ in items]
+            assert all(r.error is None for r in results)
+            assert sum(r.size for r in results) == sum(len(d) for _, d in items)
+
+            # test ordered results and per-item error capture
+            paths = [path for path, _ in items] + [root / "missing"]
+            results = list(Path.read_many(paths, max_workers=8, max_bytes=64))
+            assert [r.path for r in results] == paths
+            assert [r.data for r in results[:-1]] == [data for _, data in items]
+            assert results[-1].data is None
+            assert isinstance(results[-1].error, Exception)
+
+            # test as-completed results cover every path exactly once
+            results = Path.read_many(iter(paths), ordered=False)
+            data = {str(r.path): r.data for r in results}
+            assert data == {str(path): d for path, d in items + [(paths[-1], None)]}
+
+        # test the shared client pool grows to the worker count
+        assert client._http.get_adapter("https://")._pool_maxsize == 32
+    finally:
+        server.stop()
+
+
+def test_stat_exists_many(tmp_path: pathlib.Path):
+    server = FakeGCSServer().start()
+    server.create_bucket("cloudfs-test")
+    gs_dir = Path("gs://cloudfs-test/bulk", storage_client=make_client(server))
+    for i in range(250):
+        server.put_object("cloudfs-test", f"bulk/many/{i:03d}", b"x" * i)
+    for i in range(5):
+        server.put_object("cloudfs-test", f"bulk/few/{i}", b"y")
+    for i in range(20):
+        (tmp_path / f"{i}").write_bytes(b"z" * i)
+
+    try:
+        # test siblings are answered by a listing and the rest by one batch
+        many = [gs_dir / "many" / f"{i:03d}" for i in range(0, 250, 2)]
+        few = [gs_dir / "few" / str(i) for i in range(6)]
+        count = server.request_count
+        stats = Path.stat_many(many + few + [gs_dir / "missing"])
+        assert server.request_count - count == 2
+        assert [s["size"] for s in stats[: len(many)]] == list(range(0, 250, 2))
+        assert [s is not None for s in stats[len(many) :]] == [True] * 5 + [False] * 2
+
+        count = server.request_count
+        paths = [gs_dir / "few" / "1", gs_dir / "few/", gs_dir / "nope/", gs_dir / "x"]
+        assert Path.exists_many(paths) == [True, True, False, False]
+        assert server.request_count - count == 2
+
+        # test local paths, siblings are checked with one directory scan
+        local = Path(tmp_path.as_uri())
+        paths = [local / str(i) for i in range(25)] + [local / "0" / "x"]
+        assert Path.exists_many(paths) == [True] * 20 + [False] * 6
+        stats = Path.stat_many(paths)
+        assert [s and s["st_size"] for s in stats] == list(range(20)) + [None] * 6
+    finally:
+        server.stop()
+
+
+def read_length(path: "Path") -> "tuple":
+    return os.getpid(), len(path.read_bytes())
+
+
+def test_process_map(tmp_path: pathlib.Path):
+    server = FakeGCSServer().start()
+    server.create_bucket("cloudfs-test")
+    policy = RetryPolicy(deadline=5.0, hedge_percentile=0.9)
+    gs_dir = Path(
+        "gs://cloudfs-test/bulk",
+        storage_client=make_client(server),
+        empty_filename="_keep",
+        retry_policy=policy,
+    )
+    for i in range(20):
+        server.put_object("cloudfs-test", f"bulk/{i}", b"x" * i)
+        (tmp_path / str(i)).write_bytes(b"y" * i)
+
+    try:
+        # test paths pickle to a URL and a client reference
+        path = pickle.loads(pickle.dumps(gs_dir / "3"))
+        assert path == gs_dir / "3" and path.client is not gs_dir.client
+        assert path.empty_filename == "_keep"
+        assert path.retry_policy.deadline == 5.0 and path.retry_policy.hedging
+        assert path.read_bytes() == b"xxx"
+        assert pickle.loads(pickle.dumps(gs_dir / "4")).client is path.client
+        local = Path(tmp_path.as_uri())
+        assert pickle.loads(pickle.dumps(local / "5")).read_bytes() == b"yyyyy"
+
+        # test a process pool reads through per-process clients
+        paths = [gs_dir / str(i) for i in range(20)] + [local / "7"]
+        results = list(Path.process_map(read_length, paths, max_workers=2))
+        assert [size for _, size in results] == list(range(20)) + [7]
+        assert os.getpid() not in {pid for pid, _ in results}
+    finally:
+        server.stop()
+
+
+def test_pickle_gs_credentials():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    info = {
+        "type": "service_account",
+        "project_id": "test",
+        "private_key_id": "1",
+        "private_key": key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ).decode(),
+        "client_email": "worker@test.iam.gserviceaccount.com",
+        "token_uri": "https://oauth2.googleapis.com/token",
+    }
+    path = Path("gs://cloudfs-test/a", credentials=json.dumps(info), project="test")
+
+    # test registry clients carry their credentials to the unpickling process
+    data = pickle.dumps(path)
+    client_registry.clear()
+    restored = pickle.loads(data)
+    assert restored == path and restored.client is not path.client
+    credentials = restored.client._credentials
+    assert credentials.service_account_email == info["client_email"]
+    assert restored.client.project == "test"
+
+    # test a caller's client with real credentials refuses to pickle
+    caller = Path(
+        "gs://cloudfs-test/a",
+        storage_client=Client(project="test", credentials=credentials),
+    )
+    with pytest.raises(TypeError):
+        pickle.dumps(caller)
+
+
+def test_pickle_s3_azure_paths():
+    s3_path = Path(
+        "s3://cloudfs-test/a",
+        endpoint_url="http://127.0.0.1:1",
+        aws_access_key_id="testing",
+        aws_secret_access_key="testing",
+        region_name="us-east-1",
+        part_size=6 * 1024 * 1024,
+    )
+    restored = pickle.loads(pickle.dumps(s3_path))
+    assert restored == s3_path and restored.client is s3_path.client
+    assert restored.part_size == 6 * 1024 * 1024
+
+    account_url = "https://devstoreaccount1.blob.core.windows.net"
+    azure_path = Path("azure://cloudfs-test/a", account_url=account_url)
+    restored = pickle.loads(pickle.dumps(azure_path))
+    assert restored == azure_path and restored.client is azure_path.client
@@ -0,0 +1,85 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from cloudfs import Path
+from cloudfs.cache import ReadCache
+from tests.fake_azure import FakeAzureTransport, make_client
+
+test_container_name = "cloudfs-test"
+
+
+@pytest.fixture()
+def transport():
+    return FakeAzureTransport(containers=(test_container_name,))
+
+
+@pytest.fixture()
+def test_dir(transport: "FakeAzureTransport"):
+    client = make_client(transport)
+    return Path(f"azure://{test_container_name}/test", blob_service_client=client)
+
+
+def test_read_cache_without_file_locks(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr("cloudfs.cache.fcntl", None)
+    monkeypatch.setattr("cloudfs.cache.msvcrt", None)
+    with pytest.warns(UserWarning, match="not safe to share between processes"):
+        cache = ReadCache(tmp_path / "cache", max_size=1000)
+    cache.clear()
+
+
+def test_read_cache(test_dir: "Path", transport: "FakeAzureTransport", tmp_path):
+    cache = ReadCache(tmp_path / "cache", max_size=1000)
+    path = Path(str(test_dir), blob_service_client=test_dir.client, read_cache=cache)
+    for name in ("a", "b", "c"):
+        (path / name).write_bytes(name.encode() * 400)
+
+    # test hit and miss, a hit only revalidates the metadata
+    assert (path / "a").read_bytes() == b"a" * 400
+    count = transport.request_count
+    assert (path / "a").read_text() == "a" * 400
+    assert transport.request_count - count == 1
+    with (path / "a").open("rb") as f:
+        assert f.read(3) == b"aaa"
+    with cache.open_mmap(path / "a") as mapped:
+        assert mapped[:3] == b"aaa"
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 1
+
+    # test least recently used eviction under the size limit
+    (path / "b").read_bytes()
+    (path / "a").read_bytes()
+    (path / "c").read_bytes()
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["count"] == 2
+    assert stats["size"] == 800
+    (path / "a").read_bytes()
+    assert cache.stats()["hits"] == 5
+
+    # test a new version is a new key
+    (path / "a").write_bytes(b"new")
+    assert (path / "a").read_bytes() == b"new"
+
+    # test objects larger than the cache are streamed without caching
+    (path / "large").write_bytes(b"x" * 2000)
+    assert (path / "large").read_bytes() == b"x" * 2000
+    assert cache.stats()["size"] <= 1000
+
+    # test concurrent misses download once
+    cache.clear()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: (path / "b").read_bytes(), range(8)))
+    assert results == [b"b" * 400] * 8
+    assert cache.stats()["count"] == 1
+
+
+def test_read_cache_by_md5(test_dir: "Path", tmp_path):
+    cache = ReadCache(tmp_path / "cache", max_size=1000, key_by="md5")
+    path = Path(str(test_dir), blob_service_client=test_dir.client, read_cache=cache)
+    (path / "a").write_bytes(b"same")
+    (path / "b").write_bytes(b"same")
+    assert (path / "a").read_bytes() == b"same"
+    assert (path / "b").read_bytes() == b"same"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["count"] == 1
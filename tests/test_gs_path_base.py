@@ -1,26 +1,274 @@
+import hashlib
 import os
+import pathlib
+import time
+import types
 from datetime import datetime
 
 import pytest
+from google.api_core.exceptions import ServiceUnavailable
+from google.auth.credentials import AnonymousCredentials
 
 from cloudfs import Path
-from cloudfs.gs import GSPath
+from cloudfs.base import LocalPath, checksum_cache, checksum_key
+from cloudfs.gs import ClientRegistry, GSPath, MetadataCache, batch_responses
+from cloudfs.manifest import Manifest
+from cloudfs.retry import RetryPolicy
+from tests.fake_gcs import FakeGCSServer, make_client
 
 test_dirname = f"test-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}"
 
 
 @pytest.fixture(scope="module")
 def test_dir():
-    test_bucket_name = os.environ.get("TEST_GS_BUCKET_NAME", "cloudfs-test")
-    url = f"gs://{test_bucket_name}/{test_dirname}"
-    test_path = Path(url)
-    yield test_path
-    test_path.rmdir()
+    test_bucket_name = os.environ.get("TEST_GS_BUCKET_NAME")
+    if test_bucket_name:
+        test_path = Path(f"gs://{test_bucket_name}/{test_dirname}")
+        yield test_path
+        test_path.rmtree(missing_ok=True)
+        return
 
+    # Run against the in-process stand-in when no bucket is configured
+    server = FakeGCSServer().start()
+    server.create_bucket("cloudfs-test")
+    client = make_client(server)
+    yield Path(f"gs://cloudfs-test/{test_dirname}", storage_client=client)
+    server.stop()
 
-def test_gs_path_basic_operations(test_dir: "GSPath"):
+
+def test_gs_client_registry():
+    registry = ClientRegistry(pool_maxsize=32, keep_alive=30)
+    credentials = AnonymousCredentials()
+    client = registry.get_client(credentials=credentials, project="test")
+    assert registry.get_client(credentials=credentials, project="test") is client
+    assert registry.get_client(credentials=credentials, project="other") is not client
+    assert len(registry) == 2
+    assert (
+        client._http.get_adapter("https://storage.googleapis.com")._pool_maxsize == 32
+    )
+
+    path = Path("gs://bucket/a", credentials=credentials, project="test")
+    assert (path / "b").client is path.client
+    assert Path("gs://bucket/c", credentials=credentials, project="test").client is (
+        path.client
+    )
+    registry.clear()
+    assert len(registry) == 0
+
+
+def test_gs_metadata_cache():
+    cache = MetadataCache(maxsize=2, ttl=60)
+    cache.set(("bucket", "a"), None)
+    cache.set(("bucket", "b"), None)
+    assert cache.get(("bucket", "a")) == (True, None)
+    cache.set(("bucket", "c"), None)
+    assert cache.get(("bucket", "b")) == (False, None)
+    assert len(cache) == 2
+    cache.invalidate(("bucket", "a"))
+    assert cache.get(("bucket", "a")) == (False, None)
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+    expired_cache = MetadataCache(ttl=0)
+    expired_cache.set(("bucket", "a"), None)
+    assert expired_cache.get(("bucket", "a")) == (False, None)
+
+
+def test_gs_batch_responses():
+    batch = types.SimpleNamespace(_responses=[object(), object()])
+    assert batch_responses(batch, 2) == batch._responses
+    # a batch that lost responses must not pass for an empty success
+    with pytest.raises(AssertionError):
+        batch_responses(batch, 3)
+
+
+def test_gs_path_basic_operations(test_dir: "GSPath", tmp_path: "pathlib.Path"):
     # test client and bucket
     assert test_dir.ping()
 
     # Initiation
     test_dir.mkdir(exist_ok=True)
+
+    # test streaming open
+    filepath = test_dir / "test_open"
+    data = b"0123456789" * 100_000
+    with filepath.open("wb", chunk_size=256 * 1024) as f:
+        for i in range(0, len(data), 65536):
+            f.write(data[i : i + 65536])
+    with filepath.open("rb", chunk_size=256 * 1024) as f:
+        assert f.read(10) == data[:10]
+        f.seek(500_000)
+        assert f.read(10) == data[500_000:500_010]
+        f.seek(0)
+        assert f.read() == data
+    buffer = bytearray(10)
+    assert filepath.read_into(buffer, offset=500_000) == 10
+    assert buffer == data[500_000:500_010]
+    assert filepath.read_memoryview() == data
+    buffer = bytearray(len(data))
+    options = dict(slice_size=256 * 1024, threshold=256 * 1024, max_workers=4)
+    assert filepath.download_to(buffer, **options) == len(data)
+    assert buffer == data
+    local_path = LocalPath((tmp_path / "test_download").as_uri())
+    assert filepath.download_to(local_path, checksum="md5", **options) == len(data)
+    assert local_path.read_bytes() == data
+    with pytest.raises(ValueError):
+        filepath.download_to(bytearray(10))
+
+    # test checksums, the download already recorded the local file hashes
+    assert filepath.checksum() == hashlib.md5(data).hexdigest()
+    assert checksum_cache.get(checksum_key(local_path._path.stat(), "crc32c")) == (
+        filepath.checksum("crc32c")
+    )
+    assert filepath.samefile(local_path)
+    assert local_path.samefile(filepath)
+    other_path = LocalPath((tmp_path / "other").as_uri())
+    other_path.write_bytes(data[:-1])
+    assert not filepath.samefile(other_path)
+
+    # test parallel composite uploads, composed in a tree beyond 32 parts
+    composite_path = test_dir / "test_composite"
+    options = dict(part_size=16 * 1024, threshold=16 * 1024, max_workers=8)
+    assert composite_path.upload_from(data[:600_000], **options) == 600_000
+    assert composite_path.read_bytes() == data[:600_000]
+    assert composite_path.md5() == hashlib.md5(data[:600_000]).hexdigest()
+    assert composite_path.upload_from(local_path, **options) == len(data)
+    assert composite_path.read_bytes() == data
+    assert not list(test_dir.glob("/.cloudfs-tmp/**"))
+    composite_path.unlink()
+    text_filepath = test_dir / "test_open_text"
+    with text_filepath.open("w") as f:
+        f.write("line1\nline2\n")
+    with text_filepath.open("r") as f:
+        assert f.readlines() == ["line1\n", "line2\n"]
+    filepath.unlink()
+    text_filepath.unlink()
+
+    # test server-side copy, rename and replace
+    filepath = test_dir / "test_copy"
+    filepath.write_bytes(b"copy")
+    copied = filepath.copy(test_dir / "test_copy_new")
+    assert filepath.exists()
+    assert copied.read_bytes() == b"copy"
+    renamed = copied.rename(test_dir / "test_rename_new")
+    assert not copied.exists()
+    assert renamed.read_bytes() == b"copy"
+    replaced = renamed.replace(filepath)
+    assert not renamed.exists()
+    assert replaced == filepath
+    filepath.unlink()
+
+    # test moving a whole directory
+    dirpath = test_dir / "test_move_dir"
+    for i in range(10):
+        (dirpath / f"test_move_{i}").write_bytes(b"move")
+    moved = dirpath.rename(test_dir / "test_moved_dir", max_workers=4)
+    assert not dirpath.exists()
+    assert (moved / "test_move_3").read_bytes() == b"move"
+    for i in range(10):
+        (moved / f"test_move_{i}").unlink()
+
+    # test rmtree
+    dirpath = test_dir / "test_rmtree"
+    for i in range(150):
+        (dirpath / "nested" / f"test_rmtree_{i}").write_bytes(b"rmtree")
+    (dirpath / "empty").mkdir()
+    dirpath.rmtree()
+    assert not dirpath.exists()
+    dirpath.rmtree(missing_ok=True)
+    with pytest.raises(FileNotFoundError):
+        dirpath.rmtree()
+
+    # test glob
+    dirpath = test_dir / "test_glob"
+    for i in range(10):
+        (dirpath / f"test_glob_{i}").touch()
+        (dirpath / "test_glob_nested" / f"test_glob_nested_{i}").touch()
+    (dirpath / "test_glob_empty").mkdir()
+    assert len(list(dirpath.glob("*"))) == 12
+    assert len(list(dirpath.glob("*", return_file=False))) == 2
+    assert len(list(dirpath.glob("*", return_dir=False))) == 10
+    assert len(list(dirpath.glob("**/*"))) == 22
+    assert len(list(dirpath.glob("test_glob_nested/test_*"))) == 10
+    assert len(list(dirpath.glob("test_glob_{1,2,nested}"))) == 3
+    assert len(list(dirpath.glob("**/test_glob_*_[0-4]"))) == 5
+
+    # test iterdir and walk
+    assert len(list(dirpath.iterdir())) == 12
+    assert all(i.stat()["size"] == 0 for i in dirpath.iterdir() if i.is_file())
+    walked = list(dirpath.walk())
+    assert walked[0][0] == dirpath
+    assert walked[0][1] == ["test_glob_empty", "test_glob_nested"]
+    assert len(walked[0][2]) == 10
+    assert len(walked[2][2]) == 10
+    assert list(dirpath.walk(top_down=False))[-1][0] == dirpath
+
+    # test answering lookups and listings from a manifest
+    manifest = dirpath.build_manifest()
+    assert len(manifest) == 21
+    assert Manifest.from_bytes(manifest.to_bytes()).last_name == manifest.last_name
+    indexed = GSPath(str(dirpath), storage_client=dirpath.client, manifest=manifest)
+    assert dirpath.load_manifest().last_name == manifest.last_name
+    assert len(list(dirpath.glob("*"))) == 12
+    assert len(list(indexed.glob("*"))) == 12
+    assert len(list(indexed.glob("**/*"))) == 22
+    assert len(list(indexed.glob("**/test_glob_*_[0-4]"))) == 5
+    assert list(indexed.walk())[0][1:] == walked[0][1:]
+    assert (indexed / "test_glob_1").is_file()
+    assert (indexed / "test_glob_1").stat()["size"] == 0
+    assert (indexed / "test_glob_nested").is_dir()
+    assert not (indexed / "test_glob_missing").exists()
+    (dirpath / "test_glob_x").touch()
+    assert not (indexed / "test_glob_x").exists()
+    manifest = indexed.refresh_manifest()
+    assert len(manifest) == 22
+    indexed = GSPath(str(dirpath), storage_client=dirpath.client, manifest=manifest)
+    assert (indexed / "test_glob_x").exists()
+    assert len(indexed.refresh_manifest(manifest, full=True)) == 22
+    dirpath.rmtree()
+
+
+def test_gs_retry_policy():
+    server = FakeGCSServer().start()
+    server.create_bucket("cloudfs-test")
+    policy = RetryPolicy(initial_backoff=0.01, max_backoff=0.05, deadline=10)
+    path = Path(
+        "gs://cloudfs-test/retry/a",
+        storage_client=make_client(server),
+        retry_policy=policy,
+    )
+    try:
+        # transient errors are retried with backoff, unguarded writes are not
+        server.fail_requests = 1
+        with pytest.raises(ServiceUnavailable):
+            path.write_bytes(b"data")
+        path.write_bytes(b"data")
+        server.fail_requests = 2
+        assert path.read_bytes() == b"data"
+        assert (path / "b").retry_policy is policy
+
+        # writes guarded by generation preconditions detect concurrent changes
+        guarded = Path(
+            str(path),
+            storage_client=path.client,
+            retry_policy=RetryPolicy(precondition_writes=True),
+        )
+        server.fail_requests = 2
+        guarded.write_bytes(b"new")
+        assert path.read_bytes() == b"new"
+
+        # slow requests are hedged once enough latencies are recorded
+        policy = RetryPolicy(hedge_percentile=0.9, hedge_min_samples=5)
+        path.retry_policy = policy
+        for _ in range(5):
+            assert path.read_bytes() == b"new"
+        server.slow_delay = 2.0
+        server.slow_requests = 1
+        start = time.perf_counter()
+        assert path.read_bytes() == b"new"
+        assert time.perf_counter() - start < 1.5
+        assert policy.hedges == policy.hedge_wins == 1
+        buffer = bytearray(3)
+        assert path.read_into(buffer) == 3 and buffer == b"new"
+    finally:
+        server.stop()
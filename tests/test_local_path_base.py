@@ -1,10 +1,11 @@
+import hashlib
 import pathlib
 import shutil
 from typing import TYPE_CHECKING
 
 import pytest
 
-from cloudfs.base import LocalPath
+from cloudfs.base import LocalPath, checksum_cache, checksum_key
 
 if TYPE_CHECKING:
     from _pytest.tmpdir import TempPathFactory
@@ -25,6 +26,9 @@ def test_local_path_basic_operations(temp_dir: "pathlib.PosixPath"):
     # test samefile
     assert path.samefile(LocalPath(temp_dir.as_uri()))
     assert not path.samefile(LocalPath("file:///tmp"))
+    assert path.samefile(str(temp_dir))
+    assert path.samefile(temp_dir.as_uri())
+    assert not path.samefile("/tmp")
 
     # test create file
     filename = "test_create_file"
@@ -61,6 +65,18 @@ def test_local_path_basic_operations(temp_dir: "pathlib.PosixPath"):
     assert bytes_filepath.write_bytes(data)
     assert bytes_filepath.read_bytes() == data
 
+    # test checksum, cached until the file changes
+    assert bytes_filepath.checksum() == hashlib.md5(data).hexdigest()
+    assert bytes_filepath.checksum("crc32c") == "86a072c0"
+    assert (
+        checksum_cache.get(checksum_key(bytes_filepath._path.stat(), "md5"))
+        == hashlib.md5(data).hexdigest()
+    )
+    bytes_filepath.write_bytes(b"changed")
+    assert bytes_filepath.checksum() == hashlib.md5(b"changed").hexdigest()
+    with pytest.raises(ValueError):
+        bytes_filepath.checksum("sha1")
+
     # test write_text and read_text
     text_filename = "test_text"
     data = "test"
@@ -68,6 +84,17 @@ def test_local_path_basic_operations(temp_dir: "pathlib.PosixPath"):
     assert text_filepath.write_text(data)
     assert text_filepath.read_text() == data
 
+    # test zero-copy reads
+    data = bytes(range(256))
+    bytes_filepath.write_bytes(data)
+    buffer = bytearray(16)
+    assert bytes_filepath.read_into(buffer, offset=8) == 16
+    assert buffer == data[8:24]
+    assert bytes_filepath.read_into(bytearray(16), offset=250) == 6
+    assert bytes_filepath.read_memoryview() == data
+    with bytes_filepath.open_mmap() as mapped:
+        assert mapped[:4] == data[:4]
+
     # test remove file and directory
     filename = "test_remove"
     filepath = path / filename
@@ -81,6 +108,15 @@ def test_local_path_basic_operations(temp_dir: "pathlib.PosixPath"):
     assert dirpath.exists()
     dirpath.rmdir()
     assert not dirpath.exists()
+    dirname = "test_rmtree_dir"
+    dirpath = path / dirname
+    (dirpath / "nested").mkdir(parents=True)
+    (dirpath / "nested" / "test_rmtree").touch()
+    dirpath.rmtree()
+    assert not dirpath.exists()
+    dirpath.rmtree(missing_ok=True)
+    with pytest.raises(FileNotFoundError):
+        dirpath.rmtree()
 
     # test rename and replace
     filename = "test_rename"
@@ -124,3 +160,16 @@ def test_local_path_basic_operations(temp_dir: "pathlib.PosixPath"):
     assert len(list(dirname.glob("*", return_dir=False))) == 10
     assert len(list(dirname.glob("**/*"))) == 21
     assert len(list(dirname.glob("test_glob_nested/test_*"))) == 10
+    assert len(list(dirname.glob("test_glob_{1,2,nested}"))) == 3
+    assert len(list(dirname.glob("**/test_glob_[0-4]"))) == 5
+
+    # test iterdir and walk
+    assert len(list(dirname.iterdir())) == 11
+    assert all(i.stat() for i in dirname.iterdir())
+    assert sum(1 for i in dirname.iterdir() if i.is_dir()) == 1
+    walked = list(dirname.walk())
+    assert walked[0][0] == dirname
+    assert walked[0][1] == ["test_glob_nested"]
+    assert len(walked[0][2]) == 10
+    assert len(walked[1][2]) == 10
+    assert list(dirname.walk(top_down=False))[-1][0] == dirname
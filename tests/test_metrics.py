@@ -0,0 +1,68 @@
+import logging
+import pathlib
+
+import pytest
+
+from cloudfs import Path, metrics
+from tests.fake_gcs import FakeGCSServer, make_client
+
+
+@pytest.fixture()
+def sink():
+    sink = metrics.add_sink(metrics.MemorySink())
+    yield sink
+    metrics.remove_sink(sink)
+
+
+def test_metrics_local(sink: "metrics.MemorySink", tmp_path: pathlib.Path, caplog):
+    path = Path(tmp_path.as_uri())
+    (path / "a").write_bytes(b"test")
+    assert (path / "a").read_text() == "test"
+    assert len(list(path.glob("*"))) == 1
+    with pytest.raises(FileNotFoundError):
+        (path / "missing").read_bytes()
+
+    stats = sink.snapshot()["file"]
+    assert stats["write_bytes"]["bytes_written"] == 4
+    assert stats["read_text"]["bytes_read"] == 4
+    assert stats["glob"]["calls"] == 1
+    assert stats["read_bytes"]["errors"] == 1
+    assert stats["read_bytes"]["latency_buckets"][float("inf")] == 1
+
+    # test the logging sink and disabling
+    logging_sink = metrics.add_sink(metrics.LoggingSink(level=logging.INFO))
+    with caplog.at_level(logging.INFO, logger="cloudfs.metrics"):
+        (path / "a").exists()
+    metrics.remove_sink(logging_sink)
+    assert "file.exists" in caplog.text
+    metrics.remove_sink(sink)
+    (path / "a").exists()
+    assert sink.snapshot()["file"]["exists"]["calls"] == 1
+
+
+def test_metrics_gs(sink: "metrics.MemorySink"):
+    server = FakeGCSServer().start()
+    server.create_bucket("cloudfs-test")
+    events = []
+    callback = metrics.add_sink(events.append)
+    try:
+        path = Path("gs://cloudfs-test/test", storage_client=make_client(server))
+        (path / "a").write_bytes(b"x" * 1000)
+        assert (path / "a").is_file()
+        buffer = bytearray(1000)
+        (path / "a").download_to(buffer, slice_size=100, threshold=100)
+    finally:
+        metrics.remove_sink(callback)
+        server.stop()
+
+    stats = sink.snapshot()["gs"]
+    assert stats["write_bytes"]["http_requests"] == 1
+    assert stats["is_file"]["http_requests"] == 1
+    # requests made by the slice download threads belong to the operation
+    assert stats["download_to"]["http_requests"] == 11
+    assert stats["download_to"]["bytes_read"] == 1000
+    assert [event.operation for event in events] == [
+        "write_bytes",
+        "is_file",
+        "download_to",
+    ]
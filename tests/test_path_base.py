@@ -1,8 +1,41 @@
+from google.auth.credentials import AnonymousCredentials
+from google.cloud.storage import Client
+
+from cloudfs.azure import AzurePath
 from cloudfs.base import LocalPath, Path
 from cloudfs.gs import GSPath
+from cloudfs.s3 import S3Path
 
 
 def test_path_initiation():
     assert type(Path("file:///home/user/file.bz2")) == LocalPath
     assert type(Path(path="file:///home/user/file.bz2")) == LocalPath
     assert type(Path("gs://bucket/path/to/file")) == GSPath
+    assert type(Path("s3://bucket/path/to/file")) == S3Path
+    assert (
+        type(
+            Path(
+                "azure://container/path/to/file",
+                account_url="https://account.blob.core.windows.net",
+            )
+        )
+        == AzurePath
+    )
+
+
+def test_path_parsing():
+    path = Path("file:///home/user/dir")
+    assert not hasattr(path, "__dict__")
+    assert path._url_cache is None
+    assert str(path / "file.bz2") == "file:///home/user/dir/file.bz2"
+    assert path / "file.bz2" == Path("file:///home/user/dir/file.bz2")
+    assert str(path / "a b") == "file:///home/user/dir/a%20b"
+    assert (path / "a b")._path == LocalPath("file:///home/user/dir/a%20b")._path
+    assert path._url.path == "/home/user/dir"
+
+    client = Client(project="test", credentials=AnonymousCredentials())
+    path = Path("gs://Bucket/path/to/file", storage_client=client)
+    assert path.bucket_name == "bucket"
+    assert path.blob_name == "path/to/file"
+    assert (path / "..").blob_name == "path/to/"
+    assert path.bucket is Path("gs://bucket/other", storage_client=client).bucket
@@ -0,0 +1,52 @@
+from cloudfs.pattern import GlobPattern, GlobStep, expand_braces
+
+
+def test_expand_braces():
+    assert expand_braces("a/{b,c}/d") == ["a/b/d", "a/c/d"]
+    assert expand_braces("{a,b{c,d}}") == ["a", "bc", "bd"]
+    assert expand_braces("{a}") == ["{a}"]
+
+
+def test_glob_pattern():
+    pattern = GlobPattern("data/{2025,2026}-*/part-[0-9].parquet")
+    assert pattern.match("data/2026-01/part-1.parquet")
+    assert not pattern.match("data/2024-01/part-1.parquet")
+    assert not pattern.match("data/2026-01/nested/part-1.parquet")
+    assert not pattern.recursive
+
+    pattern = GlobPattern("data/**/*.parquet")
+    assert pattern.match("data/a.parquet")
+    assert pattern.match("data/a/b/c.parquet")
+    assert not pattern.match("other/a.parquet")
+    assert pattern.recursive
+
+    assert GlobPattern("part-[!0]?").match("part-12")
+    assert not GlobPattern("part-[!0]?").match("part-01")
+    assert GlobPattern.split_literal("data/2026-*/part-*") == (
+        "data",
+        ["2026-*", "part-*"],
+    )
+    assert GlobPattern.split_literal("data/file") == ("data/file", [])
+
+
+def test_glob_step():
+    step = GlobStep("", "data/2026-*/part-*".split("/"))
+    assert (step.prefix, step.list_prefix, step.rest) == (
+        "data/",
+        "data/2026-",
+        ["part-*"],
+    )
+    assert not step.recursive
+    assert step.decide("data/2026-01/", None, set()) == [
+        (True, ("data/2026-01/", None))
+    ]
+    assert step.decide("data/2026-01", 1, set()) == []
+    assert step.decide("data/2025-01/", None, set()) == []
+
+    step = GlobStep("", "data/**/*.txt".split("/"))
+    assert step.recursive and step.list_prefix == "data/"
+    assert step.decide("data/a/b.txt", 1, set()) == [(False, ("data/a/b.txt", 1))]
+    assert step.decide("data/a/.keep", 1, {".keep"}) == []
+
+    step = GlobStep("", ["data", "file"])
+    assert step.list_prefix is None and step.prefix == "data/file"
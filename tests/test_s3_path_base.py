@@ -0,0 +1,147 @@
+import hashlib
+import os
+
+import boto3
+import pytest
+from moto.server import ThreadedMotoServer
+
+from cloudfs import Path
+from cloudfs.s3 import S3Path
+
+test_bucket_name = "cloudfs-test"
+
+
+@pytest.fixture(scope="module")
+def test_dir():
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    options = dict(
+        endpoint_url=f"http://{host}:{port}",
+        aws_access_key_id="testing",
+        aws_secret_access_key="testing",
+        region_name="us-east-1",
+    )
+    boto3.client("s3", **options).create_bucket(Bucket=test_bucket_name)
+    yield Path(f"s3://{test_bucket_name}/test", **options)
+    server.stop()
+
+
+def test_s3_path_basic_operations(test_dir: "S3Path"):
+    path = test_dir
+    assert type(path) == S3Path
+    assert path.ping()
+
+    # test create file and directory
+    filepath = path / "test_create_file"
+    filepath.touch()
+    assert filepath.exists()
+    assert filepath.is_file()
+    dirpath = path / "test_create_dir"
+    dirpath.mkdir()
+    assert dirpath.is_dir()
+    assert not dirpath.is_file()
+
+    # test write and read
+    filepath = path / "test_bytes"
+    assert filepath.write_bytes(b"test")
+    assert filepath.read_bytes() == b"test"
+    assert filepath.stat()["size"] == 4
+    assert filepath.md5() == "098f6bcd4621d373cade4e832627b4f6"
+    assert filepath.samefile(str(filepath))
+    filepath = path / "test_text"
+    assert filepath.write_text("test")
+    assert filepath.read_text() == "test"
+
+    # test multipart upload and ranged reads
+    data = os.urandom(11 * 1024 * 1024 + 123)
+    filepath = S3Path(
+        str(path / "test_multipart"),
+        s3_client=path.client,
+        part_size=5 * 1024 * 1024,
+        max_concurrency=4,
+    )
+    filepath.write_bytes(data)
+    assert filepath.read_bytes() == data
+    with filepath.open("wb") as f:
+        for i in range(0, len(data), 1024 * 1024):
+            f.write(data[i : i + 1024 * 1024])
+    with filepath.open("rb", chunk_size=1024 * 1024) as f:
+        assert f.read(10) == data[:10]
+        f.seek(6 * 1024 * 1024)
+        assert f.read(10) == data[6 * 1024 * 1024 : 6 * 1024 * 1024 + 10]
+        f.seek(0)
+        assert f.read() == data
+
+    # test content comparison across single-part and multipart uploads
+    single = S3Path(
+        str(path / "test_single"), s3_client=path.client, part_size=16 * 1024 * 1024
+    )
+    single.write_bytes(data)
+    assert "-" in filepath._load_object()["etag"]
+    assert "-" not in single._load_object()["etag"]
+    assert filepath.md5() == single.md5() == hashlib.md5(data).hexdigest()
+    assert filepath.samefile(single) and single.samefile(filepath)
+    other = path / "test_other"
+    other.write_bytes(data[:-1] + b"!")
+    assert not filepath.samefile(other) and not other.samefile(single)
+    with (path / "test_open_text").open("w") as f:
+        f.write("line1\nline2\n")
+    with (path / "test_open_text").open() as f:
+        assert f.readlines() == ["line1\n", "line2\n"]
+
+    # test remove file and directory
+    filepath = path / "test_remove"
+    filepath.touch()
+    filepath.unlink()
+    assert not filepath.exists()
+    filepath.unlink(missing_ok=True)
+    with pytest.raises(FileNotFoundError):
+        filepath.unlink()
+    dirpath = path / "test_remove_dir"
+    dirpath.mkdir()
+    dirpath.rmdir()
+    assert not dirpath.is_dir()
+
+    # test touch on a path that carries a listed object
+    filepath = path / "test_touch_listed"
+    filepath.write_bytes(b"test")
+    listed = next(p for p in path.iterdir() if p == filepath)
+    listed.unlink()
+    listed.touch()
+    assert listed.stat()["size"] == 0
+
+    # test copy, rename and replace
+    filepath = path / "test_copy"
+    filepath.write_bytes(b"copy")
+    copied = filepath.copy(path / "test_copy_new")
+    assert copied.read_bytes() == b"copy"
+    renamed = copied.rename(path / "test_rename_new")
+    assert not copied.exists()
+    assert renamed.replace(filepath) == filepath
+    assert not renamed.exists()
+
+    # test glob, iterdir and walk
+    dirpath = path / "test_glob"
+    for i in range(10):
+        (dirpath / f"test_glob_{i}").touch()
+        (dirpath / "test_glob_nested" / f"test_glob_nested_{i}").touch()
+    (dirpath / "test_glob_empty").mkdir()
+    assert len(list(dirpath.glob("*"))) == 12
+    assert len(list(dirpath.glob("*", return_file=False))) == 2
+    assert len(list(dirpath.glob("**/*"))) == 22
+    assert len(list(dirpath.glob("test_glob_{1,2,nested}"))) == 3
+    assert len(list(dirpath.glob("test_glob_nested/test_*_[0-4]"))) == 5
+    assert len(list(dirpath.iterdir())) == 12
+    walked = list(dirpath.walk())
+    assert walked[0][1] == ["test_glob_empty", "test_glob_nested"]
+    assert len(walked[2][2]) == 10
+
+    # test moving a directory and rmtree
+    moved = dirpath.rename(path / "test_glob_moved", max_workers=4)
+    assert not dirpath.is_dir()
+    assert len(list(moved.glob("**/*"))) == 22
+    moved.rmtree()
+    assert not moved.is_dir()
+    with pytest.raises(FileNotFoundError):
+        moved.rmtree()
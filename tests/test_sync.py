@@ -0,0 +1,51 @@
+import os
+import pathlib
+
+from cloudfs import Path
+from cloudfs.sync import SyncState, sync
+from tests.fake_gcs import FakeGCSServer, make_client
+
+
+def test_sync(tmp_path: pathlib.Path):
+    server = FakeGCSServer().start()
+    server.create_bucket("cloudfs-test")
+    target = Path("gs://cloudfs-test/mirror", storage_client=make_client(server))
+    source_dir = tmp_path / "source"
+    (source_dir / "a").mkdir(parents=True)
+    for name in ("x", "a/y", "a/z"):
+        (source_dir / name).write_bytes(name.encode() * 100)
+    source = Path(source_dir.as_uri())
+    state = tmp_path / "state.db"
+
+    try:
+        result = sync(source, target, state=state)
+        assert sorted(result.copied) == ["a/y", "a/z", "x"]
+        assert (target / "a" / "y").read_bytes() == b"a/y" * 100
+
+        # test an unchanged tree is verified with a single listing request
+        count = server.request_count
+        result = sync(source, target, state=state)
+        assert result.copied == [] and result.unchanged == 3
+        assert server.request_count - count == 1
+
+        # test changes, dry run and delete propagation
+        (source_dir / "x").write_bytes(b"changed")
+        (source_dir / "a" / "z").unlink()
+        server.put_object("cloudfs-test", "mirror/extra", b"extra")
+        result = sync(source, target, state=state, delete=True, dry_run=True)
+        assert result.copied == ["x"]
+        assert result.deleted == ["a/z", "extra"]
+        assert (target / "extra").exists()
+        result = sync(source, target, state=SyncState(state), delete=True)
+        assert result.deleted == ["a/z", "extra"]
+        assert (target / "x").read_bytes() == b"changed"
+        assert not (target / "extra").exists()
+
+        # test without state, matching content is detected from md5 hashes
+        local = tmp_path / "local"
+        assert sync(target, Path(local.as_uri())).copied == ["a/y", "x"]
+        os.utime(local / "x", (0, 0))
+        result = sync(target, Path(local.as_uri()))
+        assert result.copied == [] and result.unchanged == 2
+    finally:
+        server.stop()
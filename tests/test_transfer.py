@@ -0,0 +1,67 @@
+import pathlib
+
+import pytest
+
+from cloudfs import Path
+from cloudfs.transfer import CopyProgress, copy_file
+from tests.fake_gcs import FakeGCSServer, make_client
+
+
+@pytest.fixture()
+def gs_dir():
+    server = FakeGCSServer().start()
+    server.create_bucket("cloudfs-test")
+    yield Path("gs://cloudfs-test/transfer", storage_client=make_client(server))
+    server.stop()
+
+
+def test_copytree(
+    gs_dir: "Path", tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+):
+    source = tmp_path / "source"
+    (source / "a" / "b").mkdir(parents=True)
+    (source / "empty").mkdir()
+    files = {"x": b"x" * 100, "a/y": b"y" * 5000, "a/b/z": b"z" * 600_000}
+    for name, data in files.items():
+        (source / name).write_bytes(data)
+
+    # test local to gs, streamed in small chunks
+    events = []
+    local = Path(source.as_uri())
+    options = dict(chunk_size=256 * 1024, progress=events.append)
+    assert local.copytree(gs_dir / "tree", **options) == 3
+    assert {event.size for event in events} == {100, 5000, 600_000}
+    assert max(event.files_copied for event in events) == 3
+    assert max(event.bytes_copied for event in events) == 605_100
+    for name, data in files.items():
+        assert (gs_dir / "tree" / name).read_bytes() == data
+    assert (gs_dir / "tree" / "empty/").is_dir()
+
+    # test gs to gs uses server-side copy
+    events = []
+    assert (gs_dir / "tree").copytree(gs_dir / "copy", progress=events.append) == 3
+    assert all(isinstance(e, CopyProgress) and e.size is None for e in events)
+    assert (gs_dir / "copy" / "a" / "b" / "z").read_bytes() == files["a/b/z"]
+
+    # test gs to local
+    target = tmp_path / "target"
+    assert (gs_dir / "copy").copytree(Path(target.as_uri()), max_workers=2) == 3
+    for name, data in files.items():
+        assert (target / name).read_bytes() == data
+    assert (target / "empty").is_dir()
+
+    # test single file copies across and within backends, without a listing
+    monkeypatch.setattr(type(gs_dir), "is_dir", None)
+    assert (gs_dir / "copy" / "x").copy(Path((tmp_path / "x").as_uri()))
+    assert (tmp_path / "x").read_bytes() == files["x"]
+    Path((tmp_path / "x").as_uri()).copy(Path((tmp_path / "x2").as_uri()))
+    assert (tmp_path / "x2").read_bytes() == files["x"]
+    monkeypatch.undo()
+    with pytest.raises(NotADirectoryError):
+        (gs_dir / "missing").copytree(Path(target.as_uri()))
+
+    # test chunk sizes are rounded up to what resumable uploads accept
+    assert copy_file(str(source / "a/b/z"), gs_dir / "z", chunk_size=100_000) == 600_000
+    assert (gs_dir / "z").read_bytes() == files["a/b/z"]
+    with pytest.raises(ValueError):
+        copy_file(str(source / "x"), gs_dir / "x", chunk_size=0)